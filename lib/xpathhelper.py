@@ -14,26 +14,467 @@ See the License for the specific language governing permissions and
 limitations under the License.
 
 xpathhelper:
-	This module maintains an XML ElementTree for the registered Python
-	classes, so that XPATH can be used to lookup particular items.
+	This module maintains an index of the registered Python classes by
+	their path, so that XPATH can be used to lookup particular items. The
+	index is either a native trie of the path segments, or an XML
+	ElementTree where lxml is available.
 """
 
-from lxml import etree
 import re
-import uuid
 import sys
+import collections
+import itertools
+import operator
+from xml.sax.saxutils import quoteattr
+
+try:
+  from lxml import etree
+except ImportError:
+  # the etree backend, which supports general XPath expressions, is only
+  # available where lxml is installed.
+  etree = None
 
 class XPathError(Exception):
   pass
 
+class _ResolvedPath(object):
+  """
+    The objects registered at a path, as returned by YANGPathHelper.get(),
+    along with the tag names of the path that were used to resolve it.
+  """
+  __slots__ = ('objects', 'tags', '_values', '_sequences')
+
+  def __init__(self, objects, tags):
+    self.objects = objects
+    self.tags = tags
+    self._values = None
+    self._sequences = None
+
+  def find(self, value):
+    """
+      Return the object at the path (or the element of a leaf-list at the
+      path) that is equal to value, raising KeyError if there is none.
+      Objects are looked up in a dictionary built on the first call, the
+      elements of leaf-lists are searched as they can be changed without
+      being registered again.
+    """
+    if self._values is None:
+      self._values = {}
+      self._sequences = []
+      for obj in self.objects:
+        if isinstance(obj, collections.MutableSequence):
+          self._sequences.append(obj)
+        else:
+          try:
+            self._values.setdefault(obj, obj)
+          except TypeError:
+            self._sequences.append([obj])
+    try:
+      return self._values[value]
+    except TypeError:
+      for obj in self.objects:
+        if obj == value:
+          return obj
+    except KeyError:
+      pass
+    for seq in self._sequences:
+      for element in seq:
+        if element == value:
+          return element
+    raise KeyError, value
+
+class _ParsedPath(object):
+  """
+    A path (relative to a caller) that has been parsed by YANGPathHelper:
+    its steps from the root - a tag name (or ".", "..", "*") and the
+    attributes that it is matched on - and the tag names of the nodes
+    along it. The XPath expression used by the etree backend is encoded
+    the first time that it is needed.
+  """
+  __slots__ = ('path', 'components', 'steps', 'tags', 'general', 'xpath')
+
+  def __init__(self, helper, object_path, caller=False):
+    relative = helper._relative_path_re.match(object_path)
+    if relative and caller:
+      self.path = caller + "/" + object_path
+      self.components = helper._path_component_re.findall(self.path)
+    else:
+      # a relative path without a caller is resolved from the root,
+      # ignoring its first component.
+      self.path = object_path
+      self.components = helper._path_component_re.findall(object_path)
+      if relative:
+        self.components = self.components[1:]
+    # paths including "//" can only be resolved by the etree backend
+    self.general = "//" in self.path
+    self.steps = tuple([helper._parse_step(c) for c in self.components])
+    self.tags = None if (relative and not caller) or self.general else \
+                  self._tags()
+    self.xpath = None
+
+  def _tags(self):
+    """
+      Return a tuple of the tag names of the nodes along the path, or None
+      where these cannot be determined - as the path includes a wildcard.
+    """
+    tags = []
+    for tagname, attributes in self.steps:
+      if tagname == "..":
+        if not len(tags):
+          return None
+        tags.pop()
+      elif tagname == "*":
+        return None
+      elif not tagname == ".":
+        tags.append(tagname)
+    return tuple(tags)
+
+  def parent_path(self):
+    """
+      Return the absolute path of the parent of the node at this path, or
+      None where it is the root.
+    """
+    if len(self.components) < 2:
+      return None
+    return "/" + "/".join(self.components[:-1])
+
+class _PathNode(object):
+  """
+    A node of the native path index. The children of a node are keyed by
+    their tag name - a child which has no attributes, and no siblings of
+    the same name, is stored directly, otherwise the children with the
+    same name are grouped into a _PathLevel.
+  """
+  __slots__ = ('tag', 'attributes', 'obj', 'parent', 'children', 'seq')
+
+  def __init__(self, tag, attributes, obj, parent, seq):
+    self.tag = tag
+    # a tuple of the (name, value) pairs of the attributes, sorted by name
+    self.attributes = attributes
+    self.obj = obj
+    self.parent = parent
+    # only allocated when a child is added, as most nodes are leaves
+    self.children = None
+    # the order in which the node was added, such that matches are returned
+    # in the same order as by the etree backend.
+    self.seq = seq
+
+class _PathLevel(object):
+  """
+    The children of a node of the native path index which have the same
+    tag name, keyed by their attributes - such that a list entry can be
+    found by its keys with a single lookup.
+  """
+  __slots__ = ('entries', 'names')
+
+  def __init__(self):
+    self.entries = {}
+    # the number of entries with each set of attribute names
+    self.names = {}
+
+  def add(self, node):
+    self.entries[node.attributes] = node
+    names = tuple([n for n, v in node.attributes])
+    self.names[names] = self.names.get(names, 0) + 1
+
+  def remove(self, node):
+    del self.entries[node.attributes]
+    names = tuple([n for n, v in node.attributes])
+    self.names[names] -= 1
+    if not self.names[names]:
+      del self.names[names]
+
+  def match(self, attributes):
+    """
+      Return the entries whose attributes include each of the (name,
+      value) pairs of attributes.
+    """
+    if not attributes:
+      nodes = self.entries.values()
+    else:
+      names = tuple([n for n, v in attributes])
+      candidates = [n for n in self.names if set(names).issubset(n)]
+      if not candidates:
+        return []
+      if candidates == [names]:
+        # the only entries that can match are those that have exactly the
+        # attributes that are matched.
+        node = self.entries.get(attributes)
+        return [] if node is None else [node]
+      nodes = [node for node in self.entries.itervalues()
+                  if set(attributes).issubset(node.attributes)]
+    if len(nodes) > 1:
+      nodes.sort(key=operator.attrgetter('seq'))
+    return nodes
+
+def _match_children(children, attributes):
+  """
+    Return the nodes of children - the children of a node with a particular
+    tag name, either a _PathNode or a _PathLevel - that match attributes.
+  """
+  if children.__class__ is _PathNode:
+    if not attributes or set(attributes).issubset(children.attributes):
+      return [children]
+    return []
+  return children.match(attributes)
+
+def _child_nodes(node):
+  """
+    Return all of the children of node, in the order that they were added.
+  """
+  if node.children is None:
+    return []
+  nodes = []
+  for children in node.children.itervalues():
+    if children.__class__ is _PathNode:
+      nodes.append(children)
+    else:
+      nodes.extend(children.entries.itervalues())
+  nodes.sort(key=operator.attrgetter('seq'))
+  return nodes
+
+class _NativePathIndex(object):
+  """
+    An index of registered objects which is a trie of the segments of
+    their paths. Paths consisting of tag names (or "*"), "." and "..",
+    with predicates matching the keys of list entries, are resolved by a
+    lookup at each level of the path.
+  """
+  def __init__(self, helper):
+    self._helper = helper
+    self._seq = itertools.count()
+    self._root = _PathNode("root", (), None, None, self._seq.next())
+    self._count = 0
+
+  def find(self, parsed):
+    if parsed.general:
+      raise XPathError, "path %s is not supported by the native path index, " \
+                          "the etree backend supports general XPath" % parsed.path
+    nodes = [self._root]
+    for tagname, attributes in parsed.steps:
+      if tagname == ".":
+        continue
+      elif tagname == "..":
+        parents, seen = [], set()
+        for node in nodes:
+          if node.parent is not None and not id(node.parent) in seen:
+            seen.add(id(node.parent))
+            parents.append(node.parent)
+        nodes = parents
+      elif tagname == "*":
+        nodes = [child for node in nodes for child in _child_nodes(node)]
+      else:
+        matched = []
+        for node in nodes:
+          if node.children is not None and tagname in node.children:
+            matched.extend(_match_children(node.children[tagname], attributes))
+        nodes = matched
+      if not nodes:
+        return []
+    return [node for node in nodes if node is not self._root]
+
+  def find_children(self, parent, tagname, attributes):
+    if parent is None:
+      parent = self._root
+    if parent.children is None or not tagname in parent.children:
+      return []
+    return _match_children(parent.children[tagname], attributes)
+
+  def children(self, node):
+    return _child_nodes(node)
+
+  def get_object(self, node):
+    return node.obj
+
+  def set_object(self, node, obj):
+    node.obj = obj
+
+  def add(self, parent, tagname, attributes, obj):
+    if parent is None:
+      parent = self._root
+    node = _PathNode(tagname, attributes, obj, parent, self._seq.next())
+    if parent.children is None:
+      parent.children = {}
+    children = parent.children.get(tagname)
+    if children is None and not attributes:
+      # most nodes are the only child with their name, and have no keys,
+      # these are stored without allocating a _PathLevel.
+      parent.children[tagname] = node
+      self._count += 1
+      return node
+    if children is None or children.__class__ is _PathNode:
+      level = _PathLevel()
+      if children is not None:
+        level.add(children)
+      parent.children[tagname] = level
+      children = level
+    children.add(node)
+    self._count += 1
+    return node
+
+  def remove(self, node):
+    """
+      Remove node, and the subtree below it, from the index. Each node of
+      the subtree is cleared, such that the references between nodes and
+      their parents do not keep the subtree (and the objects registered in
+      it) alive until the garbage collector runs. Returns the number of
+      objects that were unregistered.
+    """
+    children = node.parent.children[node.tag]
+    if children.__class__ is _PathNode:
+      del node.parent.children[node.tag]
+    else:
+      children.remove(node)
+      if not children.entries:
+        del node.parent.children[node.tag]
+    removed = 0
+    subtree = [node]
+    while subtree:
+      node = subtree.pop()
+      subtree.extend(_child_nodes(node))
+      node.obj = None
+      node.parent = None
+      node.children = None
+      removed += 1
+    self._count -= removed
+    return removed
+
+  def count(self):
+    return self._count
+
+  def tostring(self, pretty_print=False):
+    out = []
+    def write(node, depth):
+      indent = "  " * depth if pretty_print else ""
+      newline = "\n" if pretty_print else ""
+      start = "<%s%s" % (node.tag, "".join([" %s=%s" % (n, quoteattr(v))
+                                              for n, v in node.attributes]))
+      children = _child_nodes(node)
+      if not children:
+        out.append("%s%s/>%s" % (indent, start, newline))
+        return
+      out.append("%s%s>%s" % (indent, start, newline))
+      for child in children:
+        write(child, depth+1)
+      out.append("%s</%s>%s" % (indent, node.tag, newline))
+    write(self._root, 0)
+    return "".join(out)
+
+class _EtreePathIndex(object):
+  """
+    An index of registered objects which is an lxml ElementTree, each
+    element of which refers to an object in a library. Paths are resolved
+    by running them as XPath expressions.
+  """
+  def __init__(self, helper):
+    self._helper = helper
+    self._root = etree.Element("root")
+    # the registered objects, keyed by an integer handle which is stored
+    # as the obj_ptr attribute of their element.
+    self._library = {}
+    self._handles = itertools.count(1)
+
+  def find(self, parsed):
+    if parsed.xpath is None:
+      parsed.xpath = "." + self._helper._encode_path(parsed.path)
+    return self._root.xpath(parsed.xpath)
+
+  def find_children(self, parent, tagname, attributes):
+    if parent is None:
+      parent = self._root
+    fx_q = "./" + tagname
+    if attributes:
+      fx_q += "[" + " and ".join(["@%s='%s'" % (k,v) for k,v in attributes]) + "]"
+    return parent.xpath(fx_q)
+
+  def children(self, node):
+    return list(node)
+
+  def get_object(self, node):
+    return self._library[int(node.get("obj_ptr"))]
+
+  def set_object(self, node, obj):
+    self._library[int(node.get("obj_ptr"))] = obj
+
+  def add(self, parent, tagname, attributes, obj):
+    if parent is None:
+      parent = self._root
+    this_obj_id = self._handles.next()
+    self._library[this_obj_id] = obj
+    added_item = etree.SubElement(parent, tagname, obj_ptr=str(this_obj_id))
+    for k,v in attributes:
+      added_item.set(k,v)
+    return added_item
+
+  def remove(self, node):
+    """
+      Remove node, and the subtree below it, from the tree, along with the
+      library entries of each of the objects registered in the subtree.
+      Returns the number of objects that were unregistered.
+    """
+    removed = 0
+    for element in node.iter():
+      del self._library[int(element.get("obj_ptr"))]
+      removed += 1
+    node.getparent().remove(node)
+    return removed
+
+  def count(self):
+    return len(self._library)
+
+  def tostring(self, pretty_print=False):
+    return etree.tostring(self._root,pretty_print=pretty_print)
+
+_path_index_backends = {
+  "native": _NativePathIndex,
+  "etree": _EtreePathIndex,
+}
+
+_PathCacheInfo = collections.namedtuple("_PathCacheInfo",
+                                        ["hits", "misses", "maxsize", "currsize"])
+
 class YANGPathHelper(object):
   _attr_re = re.compile("^(?P<tagname>.*)\[(?P<arg>.*)\]$")
   _arg_re = re.compile("^[@]?(?P<cmd>[a-zA-Z0-9\-\_]+)([ ]+)?=([ ]+)?[\'\"]?(?P<arg>[^ ^\'^\"]+)([\'\"])?([ ]+)?(?P<remainder>.*)")
   _relative_path_re = re.compile("^(\.|\.\.)")
+  _path_component_re = re.compile("(?:[^/\[]|\[[^\]]*\])+")
+  _valid_path_re = re.compile("^(\.|\.\.|\/)")
+  # the maximum number of resolved paths that are cached
+  _cache_size = 4096
+  # the maximum number of parsed paths that are cached
+  _parsed_cache_size = 4096
 
-  def __init__(self):
-    self._root = etree.Element("root")
-    self._library = {}
+  def __init__(self, backend="native"):
+    """
+      Create a path helper, using the native path index where backend is
+      "native", or an lxml ElementTree (supporting general XPath
+      expressions, such as those including "//") where it is "etree".
+    """
+    if not backend in _path_index_backends:
+      raise ValueError, "backend must be one of %s" % _path_index_backends.keys()
+    if backend == "etree" and etree is None:
+      raise ImportError, "the etree backend of YANGPathHelper requires lxml"
+    self._index = _path_index_backends[backend](self)
+    # paths that have been resolved by get(), keyed on the path and the
+    # caller. Each is indexed by the tag names of the path, and of each of
+    # its prefixes, such that it can be invalidated when an object is
+    # registered or unregistered above or below it.
+    self._cache = {}
+    self._cache_by_tags = {}
+    self._cache_by_prefix = {}
+    self._cache_wildcard = set()
+    # parsed paths, keyed on the path and the caller, in order of their
+    # last use - such that the least recently used is discarded when the
+    # cache is full.
+    self._parsed = collections.OrderedDict()
+    self._parsed_hits = 0
+    self._parsed_misses = 0
+    self._parsed_steps = {}
+    # registrations of the objects at and below a path that are deferred
+    # while a container is created, such that they are made in one pass.
+    self._deferred = None
+    self._deferred_root = None
+    self._deferred_depth = 0
 
   def _encode_path(self, path, mode="search", find_parent=False):
       if not mode in ["search", "set"]:
@@ -63,51 +504,166 @@ class YANGPathHelper(object):
 
   def _tagname_attributes(self, tag):
       tagname,attributes = tag,None
-      if self._attr_re.match(tag):
-        tagname,arg = self._attr_re.sub('\g<tagname>||\g<arg>', tag).split("||")
+      tag_match = self._attr_re.match(tag)
+      if tag_match:
+        tagname,arg = tag_match.group('tagname', 'arg')
         attributes = {}
-        cmd_arg_pairs = []
         tmp_arg = arg
         while len(tmp_arg):
-          if self._arg_re.match(tmp_arg):
-            c,a,r = self._arg_re.sub('\g<cmd>||\g<arg>||\g<remainder>', tmp_arg).split("||")
+          arg_match = self._arg_re.match(tmp_arg)
+          if arg_match:
+            c,a,tmp_arg = arg_match.group('cmd', 'arg', 'remainder')
             attributes[c] = a
-            tmp_arg = r
           else:
             raise XPathError, "invalid attribute string specified for %s - %s" % (tagname, arg)
       return (tagname, attributes)
 
+  def _parse_step(self, component):
+    """
+      Return the tag name of a component of a path, and a tuple of the
+      (name, value) pairs of its attributes sorted by name. The steps of
+      components are cached, as many paths share the same components.
+    """
+    try:
+      return self._parsed_steps[component]
+    except KeyError:
+      pass
+    if component in [".", "..", "*"]:
+      step = (component, ())
+    else:
+      (tagname, attributes) = self._tagname_attributes(component)
+      step = (tagname, tuple(sorted(attributes.items())) if attributes else ())
+    if len(self._parsed_steps) >= self._parsed_cache_size:
+      self._parsed_steps = {}
+    self._parsed_steps[component] = step
+    return step
+
+  def _parse(self, object_path, caller=False):
+    """
+      Return the _ParsedPath for object_path (relative to caller), using
+      the cached parsed path where one exists.
+    """
+    key = (object_path, caller)
+    try:
+      parsed = self._parsed.pop(key)
+      self._parsed_hits += 1
+    except KeyError:
+      parsed = _ParsedPath(self, object_path, caller=caller)
+      self._parsed_misses += 1
+      if len(self._parsed) >= self._parsed_cache_size:
+        self._parsed.popitem(last=False)
+    self._parsed[key] = parsed
+    return parsed
+
+  def parsed_path_cache_info(self):
+    """
+      Return the number of hits and misses of the cache of parsed paths,
+      its maximum size and the number of paths that it currently holds.
+    """
+    return _PathCacheInfo(self._parsed_hits, self._parsed_misses,
+                            self._parsed_cache_size, len(self._parsed))
+
+  def _invalidate(self, object_path):
+    """
+      Remove any cached resolutions that depend on the object at
+      object_path - those that resolve paths above, at, or below it.
+    """
+    if not self._cache:
+      return
+    tags = self._parse(object_path).tags
+    if tags is None:
+      self._clear_cache()
+      return
+    stale = set(self._cache_wildcard)
+    stale.update(self._cache_by_prefix.get(tags, ()))
+    for i in range(0, len(tags)):
+      stale.update(self._cache_by_tags.get(tags[:i], ()))
+    for key in stale:
+      self._uncache(key)
+
+  def _uncache(self, key):
+    tags = self._cache.pop(key).tags
+    if tags is None:
+      self._cache_wildcard.discard(key)
+      return
+    for index, index_key in [(self._cache_by_tags, tags)] + \
+                  [(self._cache_by_prefix, tags[:i]) for i in range(1, len(tags)+1)]:
+      keys = index[index_key]
+      keys.discard(key)
+      if not keys:
+        del index[index_key]
+
+  def _clear_cache(self):
+    self._cache = {}
+    self._cache_by_tags = {}
+    self._cache_by_prefix = {}
+    self._cache_wildcard = set()
+
+  def _resolve(self, object_path, caller=False):
+    """
+      Return the _ResolvedPath for object_path (relative to caller), using
+      the cached resolution where one exists.
+    """
+    if self._deferred:
+      self._register_deferred()
+    key = (object_path, caller)
+    try:
+      return self._cache[key]
+    except KeyError:
+      pass
+    parsed = self._parse(object_path, caller=caller)
+    objects = [self._index.get_object(i) for i in self._index.find(parsed)]
+    resolved = _ResolvedPath(objects, parsed.tags)
+    if len(self._cache) >= self._cache_size:
+      self._clear_cache()
+    self._cache[key] = resolved
+    if resolved.tags is None:
+      self._cache_wildcard.add(key)
+    else:
+      self._cache_by_tags.setdefault(resolved.tags, set()).add(key)
+      for i in range(1, len(resolved.tags)+1):
+        self._cache_by_prefix.setdefault(resolved.tags[:i], set()).add(key)
+    return resolved
+
   def register(self, object_path, ptr, caller=False):
-    #print "REGISTERING %s" % object_path
-    #print self.tostring(pretty_print=True)
-    if not re.match("^(\.|\.\.|\/)", object_path):
+    if not self._valid_path_re.match(object_path):
       raise XPathError("A valid relative or absolute path must start with '.', '..', or '/'")
+    if self._deferred is not None:
+      if object_path == self._deferred_root:
+        self._deferred.append(("", ptr))
+        return
+      elif object_path.startswith(self._deferred_root + "/"):
+        self._deferred.append((object_path[len(self._deferred_root)+1:], ptr))
+        return
+      self._register_deferred()
+    self._invalidate(object_path)
+    (node, updated) = self._register(self._parse(object_path), ptr)
+    if updated:
+      return True
+
+  def _register(self, parsed, ptr):
+    """
+      Register ptr at the path that has been parsed, returning the node
+      of the index that it is registered at, and whether an existing node
+      was updated.
+    """
+    if not parsed.steps:
+      raise XPathError, "an object cannot be registered at the root - %s" % parsed.path
 
     # check whether we're updating
-    this_obj_existing = self._get_etree(object_path)
+    this_obj_existing = self._index.find(parsed)
     if len(this_obj_existing) > 1:
-      raise XPathError, "duplicate objects in tree - %s" % object_path
-    if this_obj_existing is not None and not this_obj_existing == []:
-      this_obj_existing = this_obj_existing[0]
-      if self._library[this_obj_existing.get("obj_ptr")] == ptr:
-        return True
-      else:
-        del self._library[this_obj_existing.get("obj_ptr")]
-        new_uuid = str(uuid.uuid1())
-        self._library[new_uuid] = ptr
-        this_obj_existing.set("obj_ptr", new_uuid)
-        return True
-
-    this_obj_id = str(uuid.uuid1())
-    self._library[this_obj_id] = ptr
-    parent = self._encode_path(object_path, mode="set", find_parent=True)
-    pparts = object_path.split("/")
-    (tagname, attributes) = self._tagname_attributes(pparts[len(pparts)-1])
-
-    if parent == "/":
-      parent_o = self._root
+      raise XPathError, "duplicate objects in tree - %s" % parsed.path
+    if len(this_obj_existing) == 1:
+      self._index.set_object(this_obj_existing[0], ptr)
+      return (this_obj_existing[0], True)
+
+    (tagname, attributes) = parsed.steps[-1]
+    parent = parsed.parent_path()
+    if parent is None:
+      parent_o = None
     else:
-      parent_o = self._get_etree(parent)
+      parent_o = self._index.find(self._parse(parent))
       if len(parent_o) > 1:
         raise XPathError, "multiple elements returned for parent %s, must be exact path for registration" \
           % parent
@@ -115,35 +671,133 @@ class YANGPathHelper(object):
         raise XPathError, "parent node did not exist for %s @ %s" % (tagname, parent)
       parent_o = parent_o[0]
 
-    added_item = etree.SubElement(parent_o, tagname, obj_ptr=this_obj_id)
-    if attributes is not None:
-      for k,v in attributes.iteritems():
-        added_item.set(k,v)
+    return (self._index.add(parent_o, tagname, attributes, ptr), False)
+
+  def register_subtree(self, root_path, subtree):
+    """
+      Register the objects of subtree - an iterable of (relative_path, obj)
+      tuples, where relative_path is relative to root_path, and "" refers
+      to root_path itself. The node at root_path (or, where it is not yet
+      registered, its parent) is resolved once, and each object is attached
+      to its parent within the subtree in a single pass - the parent of an
+      object must be registered before it, or precede it in subtree.
+    """
+    if not self._valid_path_re.match(root_path):
+      raise XPathError("A valid relative or absolute path must start with '.', '..', or '/'")
+    if self._deferred:
+      self._register_deferred()
+    self._invalidate(root_path)
+    parsed = self._parse(root_path)
+    root = self._index.find(parsed) if parsed.steps else [None]
+    if len(root) > 1:
+      raise XPathError, "duplicate objects in tree - %s" % root_path
+
+    # the nodes of the subtree, keyed by the components of their relative
+    # path, along with whether they were added by this call - in which case
+    # they cannot have existing children.
+    nodes = {}
+    if root:
+      nodes[()] = (root[0], False)
+    for relative_path, obj in subtree:
+      components = tuple(self._path_component_re.findall(relative_path))
+      if components in nodes:
+        self._index.set_object(nodes[components][0], obj)
+        continue
+      if not components:
+        nodes[()] = (self._register(parsed, obj)[0], True)
+        continue
+      (tagname, attributes) = self._parse_step(components[-1])
+      if tagname in [".", "..", "*"]:
+        raise XPathError, "the paths of a subtree must be relative to its root - %s" % relative_path
+      try:
+        (parent, added) = nodes[components[:-1]]
+      except KeyError:
+        # the parent of this object is not part of the subtree, so must be
+        # found from the root.
+        nodes[components] = (self._register(self._parse(root_path.rstrip("/") + "/" +
+                                relative_path), obj)[0], False)
+        continue
+      existing = [] if added else self._index.find_children(parent, tagname, attributes)
+      if len(existing) > 1:
+        raise XPathError, "duplicate objects in tree - %s/%s" % (root_path, relative_path)
+      if existing:
+        self._index.set_object(existing[0], obj)
+        nodes[components] = (existing[0], False)
+      else:
+        nodes[components] = (self._index.add(parent, tagname, attributes, obj), True)
+
+  def _defer_registration(self, root_path):
+    """
+      Defer the registration of objects at and below root_path until the
+      matching call to _end_deferral(), such that they are registered by a
+      single call to register_subtree(). Calls may be nested, in which case
+      the objects are registered when the outermost deferral ends.
+    """
+    if self._deferred is None:
+      self._deferred = []
+      self._deferred_root = root_path
+    self._deferred_depth += 1
+
+  def _end_deferral(self):
+    self._deferred_depth -= 1
+    if not self._deferred_depth:
+      self._register_deferred()
+      self._deferred = None
+      self._deferred_root = None
+
+  def _register_deferred(self):
+    # registered as the objects deferred so far are needed to resolve a
+    # path, or an object outside of the deferred subtree is registered -
+    # any further objects continue to be deferred.
+    subtree = self._deferred
+    self._deferred = []
+    self.register_subtree(self._deferred_root, subtree)
 
   def unregister(self, object_path, caller=False):
-    if not re.match("^(\.|\.\.|\/)", object_path):
+    if not self._valid_path_re.match(object_path):
       raise XPathError("A valid relative or absolute path must start with '.', '..', or '/'")
-    existing_objs = self._get_etree(object_path)
+    if self._deferred:
+      self._register_deferred()
+    self._invalidate(object_path)
+    existing_objs = self._index.find(self._parse(object_path))
     if len(existing_objs) == 0:
       raise XPathError, "object did not exist to unregister - %s" % object_path
 
+    # the objects registered below each matched object are unregistered
+    # along with it.
+    removed = 0
     for obj in existing_objs:
-      ref = obj.get("obj_ptr")
-      del self._library[ref]
-      obj.getparent().remove(obj)
-
-  def _get_etree(self, object_path, caller=False):
-    fx_q = self._encode_path(object_path)
-    if self._relative_path_re.match(object_path) and caller:
-      fx_q = "." + caller + "/" + object_path
-    else:
-      fx_q = "."+fx_q
+      removed += self._index.remove(obj)
+    return removed
+
+  def _unregister_children(self, object_path):
+    """
+      Unregister the objects below each object at object_path, leaving
+      the objects at object_path registered. Used where an object whose
+      children are registered by value - such as a leaf-list - is replaced.
+      Deferred registrations are not flushed: they belong to objects that
+      are being created, whose children are registered after them.
+    """
+    removed = 0
+    for node in self._index.find(self._parse(object_path)):
+      for child in self._index.children(node):
+        removed += self._index.remove(child)
+    if removed:
+      self._invalidate(object_path)
+    return removed
 
-    retr_obj = self._root.xpath(fx_q)
-    return retr_obj
+  def registered_count(self):
+    """
+      Return the number of objects that are registered.
+    """
+    if self._deferred:
+      self._register_deferred()
+    return self._index.count()
 
   def get(self, object_path, caller=False):
-    return [self._library[i.get("obj_ptr")] for i in self._get_etree(object_path, caller=caller)]
+    return list(self._resolve(object_path, caller=caller).objects)
 
   def tostring(self,pretty_print=False):
-    return etree.tostring(self._root,pretty_print=pretty_print)
\ No newline at end of file
+    if self._deferred:
+      self._register_deferred()
+    return self._index.tostring(pretty_print=pretty_print)
\ No newline at end of file
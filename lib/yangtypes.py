@@ -14,20 +14,47 @@ See the License for the specific language governing permissions and
 limitations under the License.
 """
 import numpy as np
-from decimal import Decimal
+from decimal import Decimal, InvalidOperation
 import uuid
 import re
+import sys
+import bisect
+import array
 import collections
+import itertools
 
 NUMPY_INTEGER_TYPES = [np.uint8, np.uint16, np.uint32, np.uint64,
                     np.int8, np.int16, np.int32, np.int64]
 
+# the path of an entry of a list without a key includes the key that the
+# list generated for the entry as the _key attribute.
+_keyless_list_template = "[_key=%s]"
+
+# caches of types derived from types that cannot store their own caches
+# (builtin and extension types), keyed on the name of the cache and the
+# types. Since such types are never generated, these are bounded.
+_builtin_type_caches = {}
+
+# RestrictedPrecisionDecimal types that have already been built, keyed on
+# their precision.
+_precision_decimal_cache = {}
+
 def RestrictedPrecisionDecimalType(*args, **kwargs):
   """
     Function to return a new type that is based on decimal.Decimal with
     an arbitrary restricted precision.
   """
   precision = kwargs.pop("precision", False)
+  try:
+    precision_class = _precision_decimal_cache[precision]
+  except KeyError:
+    precision_class = _build_precision_decimal(precision)
+    _precision_decimal_cache[precision] = precision_class
+  if len(args):
+    precision_class(*args, **kwargs)
+  return precision_class
+
+def _build_precision_decimal(precision):
   class RestrictedPrecisionDecimal(Decimal):
     """
       Class extending decimal.Decimal to restrict the precision that is
@@ -35,23 +62,349 @@ def RestrictedPrecisionDecimalType(*args, **kwargs):
       type.
     """
     _precision = 10.0**(-1.0*int(precision))
+    # the exponent that values are quantized to, computed once per type
+    _quantum = Decimal(1).scaleb(-int(precision))
     def __new__(self, *args, **kwargs):
       """
         Overloads the decimal __new__ function in order to round the input
         value to the new value.
       """
-      if not self._precision is None:
-        if len(args):
-          value = Decimal(args[0]).quantize(Decimal(str(self._precision)))
-        else:
-          value = Decimal(0)
-      elif len(args):
-        value = Decimal(args[0])
+      if len(args):
+        value = Decimal(args[0]).quantize(self._quantum)
       else:
         value = Decimal(0)
       obj = Decimal.__new__(self, value, **kwargs)
       return obj
-  return type(RestrictedPrecisionDecimal(*args, **kwargs))
+  return RestrictedPrecisionDecimal
+
+# decimal64 values are 64-bit integers scaled by the number of fraction digits
+DECIMAL64_MIN, DECIMAL64_MAX = -2**63, 2**63-1
+
+_fixed_point_string_re = re.compile("^\s*([+-]?)([0-9]*)(?:\.([0-9]*))?\s*$")
+
+class _FixedPointDecimal(object):
+  """
+    A decimal64 value with a fixed number of fraction digits (_precision),
+    held as an integer scaled by _scale (10**_precision). Comparisons and
+    arithmetic with integers or values of the same precision operate on
+    the scaled integer - other values are compared with, or operated on,
+    as a decimal.Decimal.
+  """
+  __slots__ = ('_scaled',)
+
+  def __init__(self, *args, **kwargs):
+    if len(args):
+      self._scaled = self._to_scaled(args[0])
+    else:
+      self._scaled = 0
+
+  @classmethod
+  def _to_scaled(cls, value):
+    if isinstance(value, _FixedPointDecimal) and \
+          value._precision == cls._precision:
+      return value._scaled
+    if isinstance(value, (int, long, np.integer)):
+      scaled = int(value) * cls._scale
+    else:
+      match = _fixed_point_string_re.match(value) if \
+                isinstance(value, basestring) else None
+      if match is not None and (match.group(2) or match.group(3)) and \
+            len(match.group(3) or "") <= cls._precision:
+        # strings with no more fraction digits than the precision are
+        # scaled directly
+        sign, integer, fraction = match.groups()
+        scaled = int(sign + (integer or "0") +
+                        (fraction or "").ljust(cls._precision, "0"))
+      else:
+        if isinstance(value, _FixedPointDecimal):
+          value = value.to_decimal()
+        try:
+          value = Decimal(value)
+        except Exception:
+          raise ValueError, "%s is not a valid decimal64 value" % repr(value)
+        if not value.is_finite():
+          raise ValueError, "%s is not a valid decimal64 value" % value
+        try:
+          scaled = int(value.quantize(cls._quantum).scaleb(cls._precision))
+        except InvalidOperation:
+          raise ValueError, "%s is out of range for decimal64 with %d fraction digits" \
+                          % (value, cls._precision)
+    if scaled < DECIMAL64_MIN or scaled > DECIMAL64_MAX:
+      raise ValueError, "%s is out of range for decimal64 with %d fraction digits" \
+                          % (value, cls._precision)
+    return scaled
+
+  def _new(self, scaled):
+    if scaled < DECIMAL64_MIN or scaled > DECIMAL64_MAX:
+      raise ValueError, "result is out of range for decimal64 with %d fraction digits" \
+                          % self._precision
+    result = _FixedPointDecimal.__new__(self._fixed_class)
+    result._scaled = scaled
+    return result
+
+  def _scaled_other(self, other):
+    # the scaled integer value of other, if it can be used directly
+    if isinstance(other, _FixedPointDecimal):
+      if other._precision == self._precision:
+        return other._scaled
+    elif isinstance(other, (int, long, np.integer)):
+      return int(other) * self._scale
+    return None
+
+  def to_decimal(self):
+    """
+      Return the value as a decimal.Decimal with the type's precision.
+    """
+    return Decimal(self._scaled).scaleb(-self._precision)
+
+  def _compare(self, other):
+    other_scaled = self._scaled_other(other)
+    if other_scaled is not None:
+      return (self._scaled > other_scaled) - (self._scaled < other_scaled)
+    if isinstance(other, _FixedPointDecimal):
+      other = other.to_decimal()
+    elif not isinstance(other, (Decimal, float)):
+      return NotImplemented
+    value = self.to_decimal()
+    return (value > other) - (value < other)
+
+  def __eq__(self, other):
+    c = self._compare(other)
+    return c if c is NotImplemented else c == 0
+  def __ne__(self, other):
+    c = self._compare(other)
+    return c if c is NotImplemented else c != 0
+  def __lt__(self, other):
+    c = self._compare(other)
+    return c if c is NotImplemented else c < 0
+  def __le__(self, other):
+    c = self._compare(other)
+    return c if c is NotImplemented else c <= 0
+  def __gt__(self, other):
+    c = self._compare(other)
+    return c if c is NotImplemented else c > 0
+  def __ge__(self, other):
+    c = self._compare(other)
+    return c if c is NotImplemented else c >= 0
+
+  def __hash__(self):
+    # equal to the hash of the equivalent Decimal (and integer)
+    if self._scaled % self._scale == 0:
+      return hash(self._scaled // self._scale)
+    return hash(self.to_decimal())
+
+  def __add__(self, other):
+    other_scaled = self._scaled_other(other)
+    if other_scaled is None:
+      return self.to_decimal() + other
+    return self._new(self._scaled + other_scaled)
+  __radd__ = __add__
+
+  def __sub__(self, other):
+    other_scaled = self._scaled_other(other)
+    if other_scaled is None:
+      return self.to_decimal() - other
+    return self._new(self._scaled - other_scaled)
+
+  def __rsub__(self, other):
+    other_scaled = self._scaled_other(other)
+    if other_scaled is None:
+      return other - self.to_decimal()
+    return self._new(other_scaled - self._scaled)
+
+  def __mul__(self, other):
+    if isinstance(other, (int, long, np.integer)):
+      return self._new(self._scaled * int(other))
+    return self.to_decimal() * other
+  __rmul__ = __mul__
+
+  def __div__(self, other):
+    return self.to_decimal() / other
+  __truediv__ = __div__
+
+  def __rdiv__(self, other):
+    return other / self.to_decimal()
+  __rtruediv__ = __rdiv__
+
+  def __neg__(self):
+    return self._new(-self._scaled)
+
+  def __pos__(self):
+    return self._new(self._scaled)
+
+  def __abs__(self):
+    return self._new(abs(self._scaled))
+
+  def __nonzero__(self):
+    return self._scaled != 0
+
+  def __int__(self):
+    # truncate towards zero, as int() does for Decimal
+    value = abs(self._scaled) // self._scale
+    return -value if self._scaled < 0 else value
+  __long__ = __int__
+
+  def __float__(self):
+    return float(self._scaled) / self._scale
+
+  def __str__(self):
+    integer, fraction = divmod(abs(self._scaled), self._scale)
+    sign = "-" if self._scaled < 0 else ""
+    if not self._precision:
+      return "%s%d" % (sign, integer)
+    return "%s%d.%0*d" % (sign, integer, self._precision, fraction)
+
+  def __repr__(self):
+    return "FixedPointDecimal('%s')" % self.__str__()
+
+# FixedPointDecimal types that have already been built, keyed on their
+# precision.
+_fixed_point_class_cache = {}
+
+def FixedPointDecimalType(*args, **kwargs):
+  """
+    Function to return a type that stores a decimal64 value with a fixed
+    number of fraction digits (precision) as a scaled integer, converting
+    to decimal.Decimal only on demand (using to_decimal()).
+  """
+  precision = int(kwargs.pop("precision", 0))
+  try:
+    fixed_class = _fixed_point_class_cache[precision]
+  except KeyError:
+    class FixedPointDecimal(_FixedPointDecimal):
+      __slots__ = ()
+      _precision = precision
+      _scale = 10**precision
+      _quantum = Decimal(1).scaleb(-precision)
+    # results of arithmetic are of this type, rather than of any subclass
+    FixedPointDecimal._fixed_class = FixedPointDecimal
+    fixed_class = FixedPointDecimal
+    _fixed_point_class_cache[precision] = fixed_class
+  if len(args):
+    fixed_class(*args, **kwargs)
+  return fixed_class
+
+def _convert_regexp(pattern):
+  """
+    YANG patterns are implicitly anchored, Python regular expressions are
+    not, so anchor the pattern at both ends.
+  """
+  if not pattern[0] == "^":
+    pattern = "^%s" % pattern
+  if not pattern[len(pattern)-1] == "$":
+    pattern = "%s$" % pattern
+  return pattern
+
+def _pattern_validator(restriction_arg, base_type=str):
+  """
+    Compile the pattern (or list of patterns, all of which must match) into
+    a single callable. Where there is one pattern, the compiled match method
+    is used directly, such that validation is a single call.
+  """
+  if not isinstance(restriction_arg, list):
+    restriction_arg = [restriction_arg,]
+  tests = [re.compile(_convert_regexp(p)).match for p in restriction_arg]
+  if len(tests) == 1:
+    return tests[0]
+  def match_all(value):
+    for test in tests:
+      if not test(value):
+        return False
+    return True
+  return match_all
+
+def _range_bound(bound, base_type):
+  """
+    Convert a single bound of a YANG range expression to a number. The
+    min and max keywords are resolved to the limits of the base type, or
+    to an infinite Decimal where the base type does not have limits.
+  """
+  if bound in ["min", "max"]:
+    if base_type in NUMPY_INTEGER_TYPES:
+      limits = np.iinfo(base_type)
+      return int(limits.min) if bound == "min" else int(limits.max)
+    return Decimal("-Infinity") if bound == "min" else Decimal("Infinity")
+  if "." in bound or "e" in bound.lower():
+    return Decimal(bound)
+  return int(bound)
+
+def _parse_range(restriction_arg, base_type=int):
+  """
+    Parse a YANG range expression (e.g., "1..10 | 20..30 | 100..max")
+    into a list of (low, high) tuples sorted by their lower bound, with
+    overlapping intervals (and adjacent integer intervals) merged.
+  """
+  intervals = []
+  for part in restriction_arg.split("|"):
+    part = part.strip()
+    if ".." in part:
+      low, high = [i.strip() for i in part.split("..", 1)]
+    else:
+      low, high = part, part
+    try:
+      low, high = _range_bound(low, base_type), _range_bound(high, base_type)
+    except (ValueError, ArithmeticError):
+      raise ValueError, "invalid range restriction %s" % restriction_arg
+    if low > high:
+      raise ValueError, "invalid range restriction %s" % restriction_arg
+    intervals.append((low, high))
+
+  intervals.sort()
+  merged = []
+  for low, high in intervals:
+    if merged:
+      plow, phigh = merged[-1]
+      adjacent = isinstance(low, (int, long)) and \
+                    isinstance(phigh, (int, long)) and low == phigh + 1
+      if low <= phigh or adjacent:
+        merged[-1] = (plow, max(high, phigh))
+        continue
+    merged.append((low, high))
+  return merged
+
+def _range_validator(restriction_arg, base_type=int):
+  """
+    Parse a range restriction into sorted interval arrays once, and return
+    a callable that checks a value against them. Membership of a range made
+    up of many intervals is found by bisecting the lower bounds.
+  """
+  intervals = _parse_range(restriction_arg, base_type)
+  if len(intervals) == 1:
+    low, high = intervals[0]
+    in_range = lambda i: low <= i <= high
+  else:
+    lows = [i[0] for i in intervals]
+    highs = [i[1] for i in intervals]
+    def in_range(value):
+      idx = bisect.bisect_right(lows, value) - 1
+      return idx >= 0 and value <= highs[idx]
+  # the parsed intervals are retained for vectorised checks
+  in_range.intervals = intervals
+  return in_range
+
+def _dict_key_validator(restriction_arg, base_type=str):
+  """
+    Assign values to each key of an enumeration that did not have one
+    specified, and return the membership test for the enumeration.
+  """
+  used_values = []
+  for k in restriction_arg:
+    if "value" in restriction_arg[k]:
+      used_values.append(int(restriction_arg[k]["value"]))
+  c = 0
+  for k in restriction_arg:
+    while c in used_values:
+      c += 1
+    if not "value" in restriction_arg[k]:
+      restriction_arg[k]["value"] = c
+    c += 1
+  return restriction_arg.__contains__
+
+_restriction_validators = {
+  "pattern":    _pattern_validator,
+  "range":      _range_validator,
+  "dict_key":   _dict_key_validator,
+}
 
 def RestrictedClassType(*args, **kwargs):
   """
@@ -64,6 +417,44 @@ def RestrictedClassType(*args, **kwargs):
   restriction_type = kwargs.pop("restriction_type", None)
   restriction_arg = kwargs.pop("restriction_arg", None)
 
+  if not restriction_type in _restriction_validators:
+    raise TypeError, "unsupported restriction type"
+
+  # RestrictedClass types are interned on their base type, such that the
+  # restriction is compiled once per type rather than each time a value is
+  # set.
+  cache = _type_cache((base_type,), "_restricted_class_cache")
+  cache_key = (restriction_type, repr(restriction_arg))
+  try:
+    restricted_class = cache[cache_key]
+  except KeyError:
+    restricted_class = _build_restricted_class(base_type, restriction_type,
+                                                restriction_arg)
+    cache[cache_key] = restricted_class
+
+  if len(args):
+    # retain the behaviour of validating any value that is supplied when
+    # the type is created.
+    restricted_class(*args, **kwargs)
+  return restricted_class
+
+def _build_restricted_class(base_type, restriction_type, restriction_arg):
+  restriction_test = \
+    _restriction_validators[restriction_type](restriction_arg, base_type)
+  # a value that is rejected by a restricted base type is reported as the
+  # base type reports it, rather than as a value that cannot be converted.
+  restricted_base = hasattr(base_type, "_restriction_test")
+  if restriction_type == "range":
+    # integer types are compared as Python integers such that numpy does
+    # not wrap out of range values, other types (decimal64, and restricted
+    # types) use their own constructor.
+    if base_type in NUMPY_INTEGER_TYPES or base_type in [int, long]:
+      convert = int
+    else:
+      convert = base_type
+  else:
+    convert = None
+
   class RestrictedClass(base_type):
     """
       A class that restricts the base_type class with a new function that the
@@ -72,93 +463,25 @@ def RestrictedClassType(*args, **kwargs):
     """
     _restriction_type = restriction_type
     _restriction_arg = restriction_arg
-    _restriction_test = None
-
-    def __init__(self, *args, **kwargs):
-      """
-        Overloads the base_class __init__ method to check the input argument
-        against the validation function - returns on instance of the base_type
-        class, which can be manipulated as per a usual Python object.
-      """
-      try:
-        self.__check(args[0])
-      except IndexError:
-        pass
-      super(RestrictedClass, self).__init__(*args, **kwargs)
+    _restriction_test = staticmethod(restriction_test)
 
     def __new__(self, *args, **kwargs):
       """
-        Create a new class instance, and dynamically define the
-        _restriction_test method so that it can be called by other functions.
+        Create a new class instance, validating the input value against the
+        pre-compiled restriction test.
       """
-      def convert_regexp(pattern):
-        if not pattern[0] == "^":
-          pattern = "^%s" % pattern
-        if not pattern[len(pattern)-1] == "$":
-          pattern = "%s$" % pattern
-        return pattern
-
-      val = False
-      try:
+      if len(args):
         val = args[0]
-      except IndexError:
-        pass
-      if restriction_type == "pattern":
-        tests = []
-        if isinstance(restriction_arg, list):
-          for pattern in restriction_arg:
-            tests.append(re.compile(convert_regexp(pattern)).match)
-        else:
-          tests.append(re.compile(convert_regexp(restriction_arg)).match)
-        self._tests = tests
-        self._restriction_test = staticmethod(lambda val: False if False in [True if t(val) else False for t in tests] else True)
-        self._restriction_arg = [i + "$" for i in restriction_arg] if isinstance(restriction_arg,list) else [restriction_arg+"$"]
-        self._restriction_type = restriction_type
-      elif restriction_type == "range":
-        x = [base_type(i) for i in \
-          re.sub("(?P<low>[0-9]+)([ ]+)?\.\.([ ]+)?(?P<high>[0-9]+)", \
-            "\g<low>,\g<high>", restriction_arg).split(",")]
-        self._restriction_test = staticmethod(lambda i: i >= x[0] and i <= x[1])
-        self._restriction_arg = restriction_arg
-        self._restriction_type = restriction_type
-        try:
-          val = int(val)
-        except:
-          raise TypeError, "must specify a numeric type for a range argument"
-      elif restriction_type == "dict_key":
-        # populate enum values
-        used_values = []
-        for k in restriction_arg:
-          if "value" in restriction_arg[k]:
-            used_values.append(int(restriction_arg[k]["value"]))
-        c = 0
-        for k in restriction_arg:
-          while c in used_values:
-            c += 1
-          if not "value" in restriction_arg[k]:
-            restriction_arg[k]["value"] = c
-          c += 1
-        self._restriction_test = staticmethod(lambda i: i in \
-                                              restriction_arg)
-        self._restriction_arg = restriction_arg
-        self._restriction_type = restriction_type
-      else:
-        raise TypeError, "unsupported restriction type"
-      if not val == False:
-        if not self._restriction_test(val):
+        if restricted_base and convert is not None:
+          val = convert(val)
+        elif convert is not None:
+          try:
+            val = convert(val)
+          except (TypeError, ValueError, ArithmeticError):
+            raise TypeError, "must specify a numeric type for a range argument"
+        if not restriction_test(val):
           raise ValueError, "did not match restricted type"
-      obj = base_type.__new__(self, *args, **kwargs)
-      return obj
-
-    def __check(self, v):
-      """
-        Run the _restriction_test static method against the argument v,
-        returning an error if the value does not validate.
-      """
-      v = base_type(v)
-      if not self._restriction_test(v):
-        raise ValueError, "did not match restricted type"
-      return True
+      return base_type.__new__(self, *args, **kwargs)
 
     def getValue(self, *args, **kwargs):
       """
@@ -171,50 +494,107 @@ def RestrictedClassType(*args, **kwargs):
           return self._restriction_arg[self.__str__()]["value"]
       return self
 
-  return type(RestrictedClass(*args, **kwargs))
+  return RestrictedClass
+
+def _typed_list_plan(allowed_type):
+  """
+    Convert the types that are allowed in a TypedList into an ordered plan
+    for validating values - a tuple of types that can be checked with a
+    single isinstance call, followed by a list of coercions that are tried
+    in turn for values that are not already instances of an allowed type.
+  """
+  coercions = []
+  for t in allowed_type:
+    if hasattr(t, "_restriction_test"):
+      # restricted classes validate the value when they are instantiated
+      coercions.append(t)
+    elif t in NUMPY_INTEGER_TYPES:
+      # numpy has odd characteristics where it supports lists, so we
+      # check against int as well.
+      def numpy_coercion(v, t=t):
+        int(v)
+        return t(v)
+      coercions.append(numpy_coercion)
+  return (tuple(allowed_type), coercions)
+
+def _compact_storage(allowed_type):
+  """
+    Determine whether a leaf-list of allowed_type can be stored compactly
+    in an array.array. This is the case for a single numpy integer type, or
+    a range restriction of one. Returns the numpy dtype, the array typecode
+    and any restriction test - or None where compact storage is not
+    possible.
+  """
+  if not len(allowed_type) == 1:
+    return None
+  base = allowed_type[0]
+  restriction_test = None
+  if hasattr(base, "_restriction_test"):
+    if not base._restriction_type == "range":
+      return None
+    restriction_test = base._restriction_test
+    base = base.__bases__[0]
+  if not base in NUMPY_INTEGER_TYPES:
+    return None
+  dtype = np.dtype(base)
+  for typecode in "bBhHiIlL":
+    if array.array(typecode).itemsize == dtype.itemsize and \
+        typecode.islower() == (dtype.kind == "i"):
+      return (dtype, typecode, restriction_test)
+  return None
 
 def TypedListType(*args, **kwargs):
   allowed_type = kwargs.pop("allowed_type", str)
+  compact = kwargs.pop("compact", False)
   if not isinstance(allowed_type, list):
     allowed_type = [allowed_type,]
+
+  # TypedList types are interned on their allowed types
+  cache = _type_cache(tuple(allowed_type), "_typed_list_cache")
+  cache_key = (tuple(allowed_type), compact)
+  try:
+    typed_list = cache[cache_key]
+  except KeyError:
+    typed_list = _build_typed_list(allowed_type)
+    if compact:
+      # where the allowed type cannot be stored compactly, a standard
+      # TypedList is used.
+      storage = _compact_storage(allowed_type)
+      if storage is not None:
+        typed_list = _build_typed_array_list(typed_list, *storage)
+    cache[cache_key] = typed_list
+
+  if len(args):
+    typed_list(*args, **kwargs)
+  return typed_list
+
+def _build_typed_list(allowed_type):
+  instance_types, coercions = _typed_list_plan(allowed_type)
+
   # this was from collections.MutableSequence
   class TypedList(collections.MutableSequence):
+    _allowed_type = allowed_type
 
     def __init__(self, *args, **kwargs):
-      self._allowed_type = allowed_type
       self._list = list()
       if len(args):
-        for i in args[0]:
-          self.check(i)
-        self._list.extend(args[0])
+        # the initial values are validated and stored directly, rather than
+        # through the extend() of a YANGBaseClass that wraps this type,
+        # which would mark the leaf-list as changed and register each
+        # value with the path helper.
+        TypedList.extend(self, args[0])
 
     def check(self,v):
-      passed = False
-      for i in self._allowed_type:
-        if isinstance(v, i):
-          passed = True
+      if isinstance(v, instance_types):
+        return True
+      for coerce in coercions:
         try:
-          # specific checks are required where there is a
-          # restricted class, so we generate a tmp type to
-          # be able to check the __bases__ of.
-          tmp_t = RestrictedClassType(base_type=str, restriction_type="pattern", restriction_arg=".*")
-          if i.__bases__ == tmp_t.__bases__:
-            tmp = i(v)
-            passed = True
-            break
-          elif i in NUMPY_INTEGER_TYPES:
-            # numpy has odd characteristics where
-            # it supports lists, so we check against
-            # int as well.
-            tmp = int(v)
-            tmp = i(v)
-            passed = True
-            break
-        except:
-            pass
-      if not passed:
-        raise ValueError("Cannot add %s to TypedList (accepts only %s)" % \
-          (v, self._allowed_type))
+          coerce(v)
+          return True
+        except Exception:
+          pass
+      raise ValueError("Cannot add %s to TypedList (accepts only %s)" % \
+        (v, self._allowed_type))
 
     def __len__(self): return len(self._list)
     def __getitem__(self, i): return self._list[i]
@@ -231,6 +611,18 @@ def TypedListType(*args, **kwargs):
       self.check(v)
       self._list.append(v)
 
+    def extend(self, values):
+      """
+        Validate all of the values that are supplied in a single pass, and
+        only then add them to the list - such that the list is unchanged if
+        any value is invalid.
+      """
+      values = list(values)
+      check = self.check
+      for v in values:
+        check(v)
+      self._list.extend(values)
+
     def __str__(self):
       return str(self._list)
 
@@ -244,7 +636,99 @@ def TypedListType(*args, **kwargs):
 
     def get(self, filter=False):
       return self._list
-  return type(TypedList(*args,**kwargs))
+  return TypedList
+
+def _build_typed_array_list(typed_list, dtype, typecode, restriction_test):
+  limits = np.iinfo(dtype)
+  low, high = int(limits.min), int(limits.max)
+  intervals = getattr(restriction_test, "intervals", None)
+
+  class TypedArrayList(typed_list):
+    """
+      A TypedList of integers which is backed by an array.array rather than
+      a list of Python objects. Bulk extend() calls are validated as a numpy
+      array, and the contents can be exported without copying through
+      as_ndarray().
+    """
+    _dtype = dtype
+
+    def __init__(self, *args, **kwargs):
+      self._list = array.array(typecode)
+      if len(args):
+        TypedArrayList.extend(self, args[0])
+
+    def _convert(self, v):
+      try:
+        i = int(v)
+      except (TypeError, ValueError):
+        raise ValueError("Cannot add %s to TypedList (accepts only %s)" % \
+          (v, self._allowed_type))
+      if not low <= i <= high or \
+          (restriction_test is not None and not restriction_test(i)):
+        raise ValueError("Cannot add %s to TypedList (accepts only %s)" % \
+          (v, self._allowed_type))
+      return i
+
+    def check(self, v):
+      self._convert(v)
+      return True
+
+    def __setitem__(self, i, v):
+      self._list.insert(i, self._convert(v))
+
+    def insert(self, i, v):
+      self._list.insert(i, self._convert(v))
+
+    def append(self, v):
+      self._list.append(self._convert(v))
+
+    def extend(self, values):
+      """
+        Validate and add values in bulk. Where the values are integers, the
+        whole set is checked against the bounds of the type (and any range
+        restriction) in a single vectorised operation, and copied directly
+        into the backing array.
+      """
+      if not isinstance(values, np.ndarray):
+        values = list(values)
+      arr = np.asarray(values)
+      if not (arr.ndim == 1 and arr.dtype.kind in "iu"):
+        converted = [self._convert(v) for v in values]
+        self._list.extend(converted)
+        return
+      if len(arr):
+        valid = arr.min() >= low and arr.max() <= high
+        if valid and intervals is not None:
+          lows = np.array([i[0] for i in intervals], dtype=object)
+          highs = np.array([i[1] for i in intervals], dtype=object)
+          idx = np.searchsorted(lows, arr, side="right") - 1
+          valid = bool(np.all((idx >= 0) & (arr <= highs[idx.clip(0)])))
+        elif valid and restriction_test is not None:
+          valid = all([restriction_test(i) for i in arr.tolist()])
+        if not valid:
+          raise ValueError("Cannot add values to TypedList (accepts only %s)" % \
+            (self._allowed_type))
+      self._list.fromstring(arr.astype(dtype).tostring())
+
+    def __str__(self):
+      return str(self._list.tolist())
+
+    def __eq__(self, other):
+      if self._list.tolist() == other:
+        return True
+      return False
+
+    def get(self, filter=False):
+      return self._list.tolist()
+
+    def as_ndarray(self):
+      """
+        Return a numpy array that shares the memory of the backing array.
+        The array is only valid until the leaf-list is next modified.
+      """
+      return np.frombuffer(self._list, dtype=dtype)
+
+  return TypedArrayList
 
 def YANGListType(*args,**kwargs):
   try:
@@ -257,8 +741,10 @@ def YANGListType(*args,**kwargs):
   yang_name = kwargs.pop("yang_name", False)
   user_ordered = kwargs.pop("user_ordered", False)
   path_helper = kwargs.pop("path_helper", False)
+  uuid_keys = kwargs.pop("uuid_keys", False)
   class YANGList(object):
-    __slots__ = ('_members', '_keyval', '_contained_class', '_path_helper')
+    __slots__ = ('_members', '_keyval', '_contained_class', '_path_helper',
+                  '_next_key', '_indexes', '_changed_keys')
     def __init__(self, *args, **kwargs):
       if user_ordered:
         self._members = collections.OrderedDict()
@@ -269,6 +755,15 @@ def YANGListType(*args,**kwargs):
         raise ValueError, "contained class of a YANGList must be a class"
       self._contained_class = listclass
       self._path_helper = path_helper
+      # entries of a list without a key are keyed by an integer that is
+      # incremented for each entry added to the list.
+      self._next_key = itertools.count(1)
+      # secondary indexes of the entries, keyed by the Python name of the
+      # indexed leaf.
+      self._indexes = {}
+      # the keys of the entries that have been changed, such that a
+      # filtered get() does not need to visit every entry.
+      self._changed_keys = set()
 
     def __str__(self):
       return str(self._members)
@@ -302,44 +797,171 @@ def YANGListType(*args,**kwargs):
         raise ValueError, "value must be set to an instance of %s" % \
           (self._contained_class)
       if self._keyval:
-        try:
-          tmp = YANGDynClass(base=self._contained_class, parent=parent, yang_name=yang_name,
-                              is_container=is_container, path_helper=False)
-          if " " in self._keyval:
-            keys = self._keyval.split(" ")
-            keyparts = k.split(" ")
-            if not len(keyparts) == len(keys):
-              raise KeyError, "YANGList key must contain all key elements (%s)" % (self._keyval.split(" "))
-            path_keystring = "["
-            for kv,kp in zip(keys,keyparts):
-              kv_obj = getattr(tmp, kv)
-              path_keystring += "%s='%s' " % (kv_obj.yang_name(),kp)
-            path_keystring = path_keystring.rstrip(" ")
-            path_keystring += "]"
-          else:
-            keys = [self._keyval,]
-            keyparts = [k,]
-            kv_obj = getattr(tmp, self._keyval)
-            path_keystring = "[%s=%s]" % (kv_obj.yang_name(), k)
-          tmp = YANGDynClass(base=self._contained_class, parent=parent, yang_name=yang_name, \
-                  is_container=is_container, path_helper=path_helper, \
-                  register_path=self._parent.path()+"/"+self._yang_name+path_keystring)
-          for i in range(0,len(keys)):
-            key = getattr(tmp, "_set_%s" % keys[i])
-            key(keyparts[i])
-          self._members[k] = tmp
-        except ValueError, m:
-          raise KeyError, "key value must be valid, %s" % m
+        self.__new_entry(k)
       else:
-        # this is a list that does not have a key specified, and hence
-        # we generate a uuid that is used as the key, the method then
-        # returns the uuid for the upstream process to use
+        return self.__new_keyless_entry()
+
+    def __key_spec(self):
+      return _yang_list_key_spec(self._contained_class, self._keyval)
+
+    def __entry_path(self):
+      # the path of the entries of the list, without their keys - a list
+      # that is not within a container has no path.
+      if not self._parent:
+        return None
+      return self._parent.path() + "/" + self._yang_name
+
+    def __keyparts(self, k, keys):
+      if len(keys) > 1:
+        keyparts = k.split(" ")
+        if not len(keyparts) == len(keys):
+          raise KeyError, "YANGList key must contain all key elements (%s)" % (self._keyval.split(" "))
+        return keyparts
+      return [k,]
+
+    def __new_entry(self, k):
+      keys, yang_keys, template, names = self.__key_spec()
+      keyparts = self.__keyparts(k, keys)
+      entry_path = self.__entry_path()
+      register_path = None if entry_path is None else \
+                        entry_path + template % tuple(keyparts)
+      failed = False
+      if self._path_helper:
+        # the entry, its children and its key leaves are registered with
+        # the path helper in one pass.
+        self._path_helper._defer_registration(register_path)
+      try:
+        tmp = YANGDynClass(base=self._contained_class, parent=parent,
+                            yang_name=yang_name, is_container=is_container,
+                            path_helper=path_helper, register_path=register_path)
+        for key, keypart in zip(keys, keyparts):
+          getattr(tmp, "_set_%s" % key)(keypart)
+      except ValueError, m:
+        failed = True
+        raise KeyError, "key value must be valid, %s" % m
+      finally:
+        if self._path_helper:
+          self._path_helper._end_deferral()
+          if failed and self._path_helper.get(register_path):
+            # the entry may have been registered before its key was
+            # rejected, since registrations are flushed to resolve paths.
+            self._path_helper.unregister(register_path)
+      self.__store(k, tmp)
+      return tmp
+
+    def __new_keyless_entry(self):
+      # this is a list that does not have a key specified, and hence
+      # we generate a key (a counter value, or a uuid where uuid_keys is
+      # set), the method then returns the key for the upstream process
+      # to use. The entry is registered with the path helper under the
+      # generated key, such that it can be unregistered individually.
+      if uuid_keys:
         k = str(uuid.uuid1())
-        self._members[k] = YANGDynClass(base=self._contained_class, parent=parent, yang_name=yang_name, \
-                            is_container=is_container, path_helper=path_helper)
-        return k
+      else:
+        k = self._next_key.next()
+      entry_path = self.__entry_path()
+      register_path = None if entry_path is None else \
+                        entry_path + _keyless_list_template % k
+      self.__store(k, YANGDynClass(base=self._contained_class, parent=parent,
+                                    yang_name=yang_name, is_container=is_container,
+                                    path_helper=path_helper,
+                                    register_path=register_path))
+      return k
+
+    def __store(self, k, entry):
+      if k in self._members:
+        self.__unindex(k)
+      # the entry refers back to the list such that changes to its leaves
+      # can be reflected in the indexes of the list.
+      entry._yang_list = self
+      entry._yang_list_key = k
+      self._members[k] = entry
+      if entry._changed:
+        self._changed_keys.add(k)
+      else:
+        self._changed_keys.discard(k)
+      for element, index in self._indexes.iteritems():
+        index.add(k, getattr(entry, element))
+
+    def __unindex(self, k):
+      entry = self._members[k]
+      for element, index in self._indexes.iteritems():
+        index.remove(k, getattr(entry, element))
+      entry._yang_list = None
+      self._changed_keys.discard(k)
+
+    def _update_index(self, k, element, old, new):
+      index = self._indexes[element]
+      index.remove(k, old)
+      index.add(k, new)
+
+    def __element_name(self, leaf):
+      keys, yang_keys, template, names = self.__key_spec()
+      if not leaf in names:
+        raise KeyError, "%s is not an element of %s" % (leaf, yang_name)
+      return names[leaf]
+
+    def add_index(self, leaf, kind="hash"):
+      """
+        Maintain an index of the entries of the list by the value of leaf
+        (specified by its Python or YANG name), which must be a direct
+        child of the list entry. A "hash" index allows find() to look up
+        entries by value, a "sorted" index additionally allows range() to
+        do so without examining each entry. Indexes are kept up to date by
+        the setter (and unset) methods of the list entries. Containers,
+        lists and leaf-lists cannot be indexed.
+      """
+      if not kind in _list_index_types:
+        raise ValueError, "index type must be one of %s" % _list_index_types.keys()
+      element = self.__element_name(leaf)
+      probe = getattr(YANGDynClass(base=self._contained_class, is_container=True,
+                                    path_helper=False), element)
+      if getattr(probe, "_is_container", False) or hasattr(probe, "_allowed_type"):
+        raise ValueError, "%s is not a leaf of %s, and cannot be indexed" % \
+                            (leaf, yang_name)
+      index = _list_index_types[kind]()
+      for k in self._members:
+        index.add(k, getattr(self._members[k], element))
+      self._indexes[element] = index
+
+    def find(self, **kwargs):
+      """
+        Return the keys of the entries of the list whose leaves are equal
+        to the values specified as keyword arguments - for example,
+        find(peer_as=65000). Leaves that are indexed are looked up in their
+        index, otherwise each entry is examined. The keys are returned in
+        no particular order.
+      """
+      result = None
+      unindexed = []
+      for leaf, value in kwargs.iteritems():
+        element = self.__element_name(leaf)
+        if element in self._indexes:
+          found = set(self._indexes[element].find(value))
+          result = found if result is None else result & found
+        else:
+          unindexed.append((element, value))
+      if result is None:
+        result = self._members
+      if not unindexed:
+        return list(result)
+      return [k for k in result if all([getattr(self._members[k], element) == value
+                                          for element, value in unindexed])]
+
+    def range(self, leaf, low, high):
+      """
+        Return the keys of the entries of the list for which the value of
+        leaf is between low and high (inclusive), ordered by the value of
+        the leaf.
+      """
+      element = self.__element_name(leaf)
+      if element in self._indexes:
+        return self._indexes[element].range(low, high)
+      entries = [(getattr(self._members[k], element), k) for k in self._members]
+      return [k for v, k in sorted(entries) if low <= v <= high]
 
     def __delitem__(self, k):
+      self.__unindex(k)
       del self._members[k]
 
     def __len__(self): return len(self._members)
@@ -357,21 +979,72 @@ def YANGListType(*args,**kwargs):
         k = self.__set()
         return k
 
+    def add_many(self, entries):
+      """
+        Add a number of entries to the list. entries is an iterable of
+        either keys (as would be supplied to add()) or dictionaries mapping
+        the names (Python or YANG) of leaves within the list entry to their
+        values - in which case the dictionary must include the key leaves
+        of the list. Each entry is added by add(), and the entries are
+        registered with the path helper together. If any entry cannot be
+        added, none of the entries are added. Returns the keys of the
+        added entries.
+      """
+      spec = None
+      added = []
+      if self._path_helper:
+        # the entries are registered with the path helper in one pass,
+        # below the container of the list.
+        self._path_helper._defer_registration(self._parent.path())
+      try:
+        for entry in entries:
+          values = None
+          if isinstance(entry, dict):
+            values = entry
+            if spec is None:
+              spec = self.__key_spec()
+            keys, yang_keys, template, names = spec
+            if self._keyval:
+              keyparts = []
+              for key, yang_key in zip(keys, yang_keys):
+                if yang_key in entry:
+                  keyparts.append(entry[yang_key])
+                elif key in entry:
+                  keyparts.append(entry[key])
+                else:
+                  raise KeyError, "list entry must specify key leaf %s" % yang_key
+              entry = keyparts[0] if len(keyparts) == 1 else \
+                        " ".join([str(i) for i in keyparts])
+          if self._keyval:
+            self.add(entry)
+          else:
+            entry = self.add()
+          added.append(entry)
+          if values is not None:
+            for name, value in values.iteritems():
+              if name in keys or name in yang_keys:
+                continue
+              if not name in names:
+                raise KeyError, "%s is not an element of %s" % (name, yang_name)
+              getattr(self._members[entry], "_set_%s" % names[name])(value)
+      except Exception:
+        exc_info = sys.exc_info()
+        for k in added:
+          self.delete(k)
+        raise exc_info[0], exc_info[1], exc_info[2]
+      finally:
+        if self._path_helper:
+          self._path_helper._end_deferral()
+      return added
+
     def delete(self, k):
       if self._path_helper:
         current_item = self._members[k]
-        keyparts = self._keyval.split(" ")
-
-        keyargs = k.split(" ")
-        key_string = "["
-        for key,val in zip(keyparts,keyargs):
-          key_string += "%s=%s " % (key,val)
-        key_string = key_string.rstrip(" ")
-        key_string += "]"
-
-        obj_path = self._parent.path() + "/" + self._yang_name + key_string
+        keys, yang_keys, template, names = self.__key_spec()
+        obj_path = self.__entry_path() + template % tuple(self.__keyparts(k, keys))
 
       try:
+        self.__unindex(k)
         del self._members[k]
         if self._path_helper:
           self._path_helper.unregister(obj_path)
@@ -383,15 +1056,138 @@ def YANGListType(*args,**kwargs):
         d = collections.OrderedDict()
       else:
         d = {}
-      for i in self._members:
-        if hasattr(self._members[i], "get"):
-          d[i] = self._members[i].get(filter=filter)
+      # each member is an instance of the generated class for the list
+      # entry, and hence has a get() method.
+      if filter:
+        # only entries that have been changed are visited.
+        if user_ordered:
+          changed = [k for k in self._members if k in self._changed_keys]
         else:
-          d[i] = self._members[i]
+          changed = self._changed_keys
+        for i in changed:
+          d[i] = self._members[i].get(filter=filter)
+      else:
+        for i, member in self._members.iteritems():
+          d[i] = member.get(filter=filter)
       return d
 
   return type(YANGList(*args,**kwargs))
 
+class _HashIndex(object):
+  """
+    A secondary index of the keys of YANGList entries by the value of one
+    of their leaves. The distinct values are also kept in order, such that
+    range() can bisect them.
+  """
+  __slots__ = ('_values', '_sorted')
+
+  def __init__(self):
+    self._values = {}
+    self._sorted = []
+
+  def add(self, k, value):
+    keys = self._values.get(value)
+    if keys is None:
+      keys = self._values[value] = set()
+      bisect.insort(self._sorted, value)
+    keys.add(k)
+
+  def remove(self, k, value):
+    keys = self._values.get(value)
+    if keys is not None:
+      keys.discard(k)
+      if not keys:
+        del self._values[value]
+        del self._sorted[bisect.bisect_left(self._sorted, value)]
+
+  def find(self, value):
+    return self._values.get(value, ())
+
+  def range(self, low, high):
+    keys = []
+    i = bisect.bisect_left(self._sorted, low)
+    while i < len(self._sorted) and self._sorted[i] <= high:
+      keys.extend(self._values[self._sorted[i]])
+      i += 1
+    return keys
+
+class _SortedIndex(object):
+  """
+    A secondary index of the keys of YANGList entries, ordered by the value
+    of one of their leaves, such that ranges of values can be found by
+    bisection.
+  """
+  __slots__ = ('_entries',)
+
+  def __init__(self):
+    self._entries = []
+
+  def add(self, k, value):
+    bisect.insort(self._entries, (value, k))
+
+  def remove(self, k, value):
+    i = bisect.bisect_left(self._entries, (value, k))
+    if i < len(self._entries) and self._entries[i] == (value, k):
+      del self._entries[i]
+
+  def find(self, value):
+    return self.range(value, value)
+
+  def range(self, low, high):
+    keys = []
+    i = bisect.bisect_left(self._entries, (low,))
+    while i < len(self._entries) and self._entries[i][0] <= high:
+      keys.append(self._entries[i][1])
+      i += 1
+    return keys
+
+_list_index_types = {"hash": _HashIndex, "sorted": _SortedIndex}
+
+_yang_list_key_spec_cache = {}
+
+def _yang_list_key_spec(listclass, keyname):
+  """
+    Return a tuple of (keys, yang_keys, template, names) for the list
+    entries of listclass keyed by keyname, where keys and yang_keys are the
+    Python and YANG names of the key leaves, template is the format string
+    used to build the path of an entry from its key values (or from its
+    generated key, for a list without a key), and names maps
+    the Python and YANG names of each element of the entry to its Python
+    name.
+    The result is computed once for each contained class.
+  """
+  cache_key = (listclass, keyname)
+  try:
+    return _yang_list_key_spec_cache[cache_key]
+  except KeyError:
+    pass
+  # instantiate the contained class once to find the YANG names of its
+  # elements.
+  tmp = YANGDynClass(base=listclass, is_container=True, path_helper=False)
+  names = {}
+  yang_names = {}
+  for element_name in tmp.elements():
+    element = getattr(tmp, element_name)
+    if hasattr(element, "yang_name"):
+      yang_names[element_name] = element.yang_name()
+    else:
+      yang_names[element_name] = element_name
+    names[element_name] = element_name
+    names[yang_names[element_name]] = element_name
+  keys = keyname.split(" ") if keyname else []
+  yang_keys = [yang_names.get(k, k) for k in keys]
+  if len(keys) > 1:
+    template = "[%s]" % " ".join(["%s='%%s'" % k for k in yang_keys])
+  elif len(keys) == 1:
+    template = "[%s=%%s]" % yang_keys[0]
+  else:
+    # the entries of a list without a key are registered with the path
+    # helper under the key that the list generates for them.
+    template = _keyless_list_template
+  spec = (keys, yang_keys, template, names)
+  _yang_list_key_spec_cache[cache_key] = spec
+  return spec
+
 class YANGBool(int):
   def __new__(self, *args, **kwargs):
     false_args = ["false", "False", False, 0, "0"]
@@ -432,54 +1228,281 @@ def YANGDynClass(*args,**kwargs):
       # so use the first type (default)
       base_type = base_type[0]
     else:
-      type_test = False
-      for candidate_type in base_type:
-        try:
-          type_test = candidate_type(args[0]) # does the slipper fit?
-          break
-        except:
-          pass # don't worry, move on, plenty more fish (types) in the sea...
-      if not type_test:
-        # we're left alone at midnight -- no types fit the arguments
-        raise TypeError, "did not find a valid type using the argument as a" + \
-                            "hint"
-      # otherwise, hop, skip and jump with the last candidate
-      base_type = candidate_type
+      base_type = _resolve_union_type(base_type, args[0])
+
+  yang_class = _yang_base_class(base_type, is_container, is_leaf,
+                                choice_member, yang_name, default)
+  return _yang_instance(yang_class, args, kwargs, parent_instance,
+                          path_helper, supplied_register_path)
+
+def _yang_instance(yang_class, args, kwargs, parent_instance, path_helper,
+                    supplied_register_path=None):
+  # per-instance state is set between __new__ and __init__ such that it is
+  # available when the instance registers itself and builds its children.
+  obj = yang_class.__new__(yang_class, *args, **kwargs)
+  obj._parent = parent_instance
+  obj._path_helper = path_helper
+  obj._supplied_register_path = supplied_register_path
+  obj.__init__(*args, **kwargs)
+  return obj
+
+class YANGDynClassFactory(object):
+  """
+    Creates instances of YANGDynClass for a single schema node. The
+    arguments that describe the node (base, default, yang_name, choice,
+    is_container and is_leaf) are those of YANGDynClass, and are handled
+    once when the factory is created - such that creating an instance only
+    requires the value and the arguments that differ per instance (parent
+    and path_helper). Generated classes create a factory for each of their
+    elements, which is used by the element's setter.
+  """
+  __slots__ = ('_base_type', '_schema', '_yang_class', '_union_classes',
+                '_check_ndarray')
+
+  def __init__(self, base=False, default=False, yang_name=False, choice=False,
+                is_container=False, is_leaf=False):
+    if not base:
+      raise TypeError, "must have a base type"
+    self._base_type = base
+    self._schema = (is_container, is_leaf, choice, yang_name, default)
+    self._check_ndarray = base in NUMPY_INTEGER_TYPES
+    if isinstance(base, list):
+      # the type of a union is resolved for each value, the YANGBaseClass
+      # for each member type is stored once it has been used.
+      self._yang_class = None
+      self._union_classes = {}
+    else:
+      self._yang_class = _yang_base_class(base, *self._schema)
+
+  def __call__(self, *args, **kwargs):
+    parent_instance = kwargs.pop("parent", False)
+    path_helper = kwargs.pop("path_helper", False)
+    yang_class = self._yang_class
+    if yang_class is None:
+      if len(args):
+        base_type = _resolve_union_type(self._base_type, args[0])
+      else:
+        base_type = self._base_type[0]
+      try:
+        yang_class = self._union_classes[base_type]
+      except KeyError:
+        yang_class = _yang_base_class(base_type, *self._schema)
+        self._union_classes[base_type] = yang_class
+    elif self._check_ndarray and len(args) and isinstance(args[0], list):
+      raise TypeError, "do not support creating numpy ndarrays!"
+    return _yang_instance(yang_class, args, kwargs, parent_instance,
+                            path_helper)
+
+# the outcome of a union candidate check that does not depend on the value
+_UNION_ACCEPT, _UNION_REJECT = True, False
 
+def _union_candidate_check(candidate, value_type):
+  """
+    Determine how a value of value_type is tested against a union member
+    type (candidate) without constructing it. Returns _UNION_ACCEPT or
+    _UNION_REJECT where every value of the type is accepted or rejected by
+    the candidate, None where the candidate must be tried, or a function
+    of the value that returns one of True, False or None with the same
+    meanings.
+  """
+  if candidate is str:
+    # unicode values that cannot be encoded fail str()
+    return None if issubclass(value_type, unicode) else _UNION_ACCEPT
+  if candidate in NUMPY_INTEGER_TYPES:
+    if value_type is int or value_type in NUMPY_INTEGER_TYPES:
+      return _UNION_ACCEPT
+    if issubclass(value_type, basestring):
+      return _integer_string_check
+    return None
+  if not hasattr(candidate, "_restriction_test"):
+    return None
+  test = candidate._restriction_test
+  restriction_type = candidate._restriction_type
+  restricted_base = candidate.__bases__[0]
+  if restriction_type in ["pattern", "dict_key"] and restricted_base is str:
+    if issubclass(value_type, str):
+      return lambda v: bool(test(v))
+    if issubclass(value_type, (int, long, float, Decimal)):
+      # numbers never match a pattern or an enumeration's keys
+      return _UNION_REJECT
+  elif restriction_type == "range" and (restricted_base in NUMPY_INTEGER_TYPES \
+                                          or restricted_base in [int, long]):
+    if value_type in [int, long] or value_type in NUMPY_INTEGER_TYPES:
+      return lambda v: bool(test(int(v)))
+    if issubclass(value_type, basestring):
+      return _integer_string_check
+  return None
+
+_integer_string_re = re.compile("^\s*[+-]?[0-9]+\s*$")
+
+def _integer_string_check(v):
+  # strings that are not integer literals cannot be converted to an integer
+  # type, those that are may still be out of range, so must be tried.
+  return None if _integer_string_re.match(v) else False
+
+# plans for resolving the member type of a union, keyed on the union's
+# members and the type of the value being set. Since both may be generated
+# types, the cache is emptied when it reaches its maximum size rather than
+# holding them indefinitely.
+_union_plan_cache = {}
+_union_plan_cache_size = 4096
+
+def _union_plan(candidates, value_type):
+  """
+    Return the list of (candidate, check) pairs that are considered for a
+    value of value_type, in the order of the union's members. Candidates
+    that reject every value of the type are omitted, and the list ends with
+    the first candidate that accepts every value of the type.
+  """
+  plan = []
+  for candidate in candidates:
+    check = _union_candidate_check(candidate, value_type)
+    if check is _UNION_REJECT:
+      continue
+    plan.append((candidate, check))
+    if check is _UNION_ACCEPT:
+      break
+  return plan
+
+def _resolve_union_type(candidates, value):
+  """
+    Return the first member type of a union (candidates) that accepts value.
+    Members are discriminated by the type of the value and cheap checks
+    where possible, and only constructed from the value (as a trial) where
+    the check is ambiguous.
+  """
+  cache_key = (tuple(candidates), type(value))
+  try:
+    plan = _union_plan_cache[cache_key]
+  except KeyError:
+    plan = _union_plan(candidates, type(value))
+    if len(_union_plan_cache) >= _union_plan_cache_size:
+      _union_plan_cache.clear()
+    _union_plan_cache[cache_key] = plan
+  for candidate, check in plan:
+    if check is None or check is _UNION_ACCEPT:
+      fits = check
+    else:
+      fits = check(value)
+    if fits is None:
+      try:
+        candidate(value) # does the slipper fit?
+      except:
+        continue # don't worry, move on, plenty more fish (types) in the sea...
+      return candidate
+    if fits:
+      return candidate
+  # we're left alone at midnight -- no types fit the arguments
+  raise TypeError, "did not find a valid type using the argument as a hint"
+
+def _type_cache(types, name):
+  """
+    Return the dictionary (name) that caches what is derived from a tuple
+    of types. The cache is stored as an attribute of the first of the types
+    that accepts one, such that it is released along with dynamically
+    generated types rather than holding references to them.
+  """
+  cache = _builtin_type_caches.get((name, types))
+  if cache is not None:
+    return cache
+  for t in types:
+    cache = t.__dict__.get(name)
+    if cache is not None:
+      return cache
+    try:
+      setattr(t, name, {})
+    except (TypeError, AttributeError):
+      # builtin and extension types (str, numpy) cannot have attributes set
+      continue
+    return t.__dict__[name]
+  return _builtin_type_caches.setdefault((name, types), {})
+
+def _yang_base_class(base_type, is_container, is_leaf, choice_member,
+                      yang_name, default):
+  """
+    Return the YANGBaseClass type wrapping base_type for a particular schema
+    node. Types are interned such that each (base type, is_container,
+    is_leaf, choice, yang_name, default) is only defined once, rather than
+    once per instance.
+  """
+  if default:
+    key = (is_container, is_leaf, choice_member, yang_name,
+            default.__class__, repr(default))
+  else:
+    key = (is_container, is_leaf, choice_member, yang_name, False)
+  cache = _type_cache((base_type,), "_yang_class_cache")
+  try:
+    return cache[key]
+  except KeyError:
+    pass
+  try:
+    yang_class = _build_yang_base_class(base_type, is_container, is_leaf,
+                        choice_member, yang_name, default, slots=True)
+  except TypeError:
+    # variable-size base types (str, long) cannot have non-empty __slots__
+    yang_class = _build_yang_base_class(base_type, is_container, is_leaf,
+                        choice_member, yang_name, default, slots=False)
+  cache[key] = yang_class
+  return yang_class
+
+def _build_yang_base_class(base_type, is_container, is_leaf, choice_member,
+                            node_name, default_value, slots=True):
+  # immutable base types (str, numpy types, Decimal) are initialised by
+  # __new__, their __init__ is that of object and need not be called.
+  init_base = not base_type.__init__ == object.__init__
+  # leaf-lists register their elements below their own path
+  is_leaflist = hasattr(base_type, "_allowed_type")
+  # the class defines default() and yang_name() methods, so the schema
+  # attributes are supplied under different names.
   class YANGBaseClass(base_type):
-    if is_container:
-      __slots__ = ('_default', '_changed', '_yang_name', '_choice', '_parent', '_supplied_register_path',
-                   '_path_helper', '_base_type', '_is_leaf', '_is_container')
-    def __new__(self, *args, **kwargs):
-      obj = base_type.__new__(self, *args, **kwargs)
-      return obj
+    if slots:
+      __slots__ = ('_changed', '_parent', '_supplied_register_path',
+                    '_path_helper')
+      if is_container:
+        # containers may be entries of a YANGList
+        __slots__ += ('_yang_list', '_yang_list_key')
+      else:
+        # leaves can still be given arbitrary attributes, however the
+        # instance dictionary is only allocated when this happens.
+        __slots__ += ('__dict__',)
+    _default = default_value if default_value else False
+    _yang_name = node_name
+    _choice = choice_member
+    _base_type = base_type
+    _is_leaf = is_leaf
+    _is_container = is_container
 
     def __init__(self, *args, **kwargs):
-      self._default = False
       self._changed = False
-      self._yang_name = yang_name
-      self._parent = parent_instance
-      self._choice = choice_member
-      self._path_helper = path_helper
-      self._supplied_register_path = supplied_register_path
-      self._base_type = base_type
-      self._is_leaf = is_leaf
-      self._is_container = is_container
+      deferred = False
       if self._path_helper:
-        if self._supplied_register_path is None:
-          self._path_helper.register(self._register_path(), self)
-        else:
-          self._path_helper.register(self._supplied_register_path, self)
-      if default:
-        self._default = default
-      if len(args):
-        if not args[0] == self._default:
-          self._changed = True
-
+        register_path = self._register_path()
+        if is_container:
+          # the container and the children that are created by its
+          # constructor are registered with the path helper in one pass.
+          self._path_helper._defer_registration(register_path)
+          deferred = True
+      # the deferral must be ended however the constructor exits, since
+      # the path helper is shared with every other object.
       try:
-        super(YANGBaseClass, self).__init__(*args, **kwargs)
-      except:
-        raise TypeError, "couldn't generate dynamic type"
+        if self._path_helper:
+          if is_leaflist:
+            # the elements of a leaf-list that this instance replaces are
+            # not replaced by registering it, so are unregistered.
+            self._path_helper._unregister_children(register_path)
+          self._path_helper.register(register_path, self)
+        if len(args):
+          if not args[0] == self._default:
+            self._changed = True
+
+        if init_base:
+          try:
+            super(YANGBaseClass, self).__init__(*args, **kwargs)
+          except:
+            raise TypeError, "couldn't generate dynamic type"
+      finally:
+        if deferred:
+          self._path_helper._end_deferral()
 
     def changed(self):
       return self._changed
@@ -494,22 +1517,38 @@ def YANGDynClass(*args,**kwargs):
       return super(YANGBaseClass, self).__str__()
 
     def set(self,choice=False):
-      if hasattr(self, '__choices__') and choice:
-        for ch in self.__choices__:
-          if ch == choice[0]:
-            for case in self.__choices__[ch]:
-              if not case == choice[1]:
-                for elem in self.__choices__[ch][case]:
-                  method = "_unset_%s" % elem
-                  if not hasattr(self, method):
-                    raise AttributeError, "unmapped choice!"
-                  x = getattr(self, method)
-                  x()
-      if self._choice and not choice:
-        choice=self._choice
+      if choice and hasattr(self, '__choices__'):
+        # a member of a case of one of this container's choices has been
+        # set, so the members of the other cases are unset.
+        cases = self.__choices__.get(choice[0], {})
+        for case in cases:
+          if not case == choice[1]:
+            for elem in cases[case]:
+              method = "_unset_%s" % elem
+              if not hasattr(self, method):
+                raise AttributeError, "unmapped choice!"
+              x = getattr(self, method)
+              x()
+      if self._changed and not self._choice:
+        # the ancestors of a changed node have already been marked as
+        # changed, such that propagation can stop here.
+        return
       self._changed = True
+      yang_list = getattr(self, "_yang_list", None)
+      if yang_list is not None:
+        # this is an entry of a list, which tracks its changed entries.
+        yang_list._changed_keys.add(self._yang_list_key)
       if self._parent and hasattr(self._parent, "set"):
-        self._parent.set(choice=choice)
+        # only this node's own choice is relevant to its parent.
+        self._parent.set(choice=self._choice)
+
+    def _reindex(self, element, value):
+      # called by the setters of the leaves of a list entry before the
+      # leaf is changed, such that an index of the list can be updated.
+      yang_list = getattr(self, "_yang_list", None)
+      if yang_list is not None and element in yang_list._indexes:
+        yang_list._update_index(self._yang_list_key, element,
+                                  getattr(self, element), value)
 
     def yang_name(self):
       return self._yang_name
@@ -517,10 +1556,18 @@ def YANGDynClass(*args,**kwargs):
     def default(self):
       return self._default
 
-    # we need to overload the set methods
+    # we need to overload the set methods, such that a change to an item is
+    # propagated to the ancestors of this node as any other change is.
     def __setitem__(self, *args, **kwargs):
-      self._changed = True
+      self.set()
       super(YANGBaseClass, self).__setitem__(*args, **kwargs)
+      if is_leaflist and self._path_helper:
+        register_path = self._register_path() + "/" + str(args[1])
+        self._path_helper.register(register_path, super(YANGBaseClass, self).__getitem__(args[0]))
+
+    def __delitem__(self, *args, **kwargs):
+      self.set()
+      super(YANGBaseClass, self).__delitem__(*args, **kwargs)
 
     def _register_path(self):
       if not self._supplied_register_path is None:
@@ -567,9 +1614,16 @@ def YANGDynClass(*args,**kwargs):
       if not hasattr(super(YANGBaseClass, self), "extend"):
         raise AttributeError("%s object has no attribute extend" % base_type)
       self.set()
-      super(YANGBaseClass, self).extend(*args, **kwargs)
-      # Note we do not call register() here for a path_helper as extend()
-      # will call append.
+      super_class = super(YANGBaseClass, self)
+      start = super_class.__len__()
+      super_class.extend(*args, **kwargs)
+      # a bulk extend() does not call append(), so register the new
+      # elements here, in one pass.
+      if self._path_helper:
+        register_path = self._register_path()
+        self._path_helper.register_subtree(register_path,
+            [(str(super_class.__getitem__(i)), super_class.__getitem__(i))
+              for i in range(start, super_class.__len__())])
 
     def insert(self, *args, **kwargs):
       if not hasattr(super(YANGBaseClass,self), "insert"):
@@ -580,7 +1634,7 @@ def YANGDynClass(*args,**kwargs):
         register_path = self._register_path() + "/" + str(args[1])
         self._path_helper.register(register_path, super(YANGBaseClass, self).__getitem__(args[0]))
 
-  return YANGBaseClass(*args, **kwargs)
+  return YANGBaseClass
 
 def ReferenceType(*args,**kwargs):
   ref_path = kwargs.pop("referenced_path", False)
@@ -603,7 +1657,10 @@ def ReferenceType(*args,**kwargs):
         value = None
 
       if self._path_helper:
-        path_chk = self._path_helper.get(self._referenced_path, caller=self._caller)
+        # the resolution of the path is cached by the path helper until an
+        # object is registered or unregistered along it.
+        resolved = self._path_helper._resolve(self._referenced_path, caller=self._caller)
+        path_chk = resolved.objects
 
         if len(path_chk) == 1 and path_chk[0]._is_leaf == True:
           # we are not checking whether this leaf exists, but rather
@@ -618,21 +1675,9 @@ def ReferenceType(*args,**kwargs):
           if not value:
             self._referenced_object = None
           elif self._require_instance:
-            lookup_o = []
-            path_chk = self._path_helper.get(self._referenced_path, caller=self._caller)
-
-            found = False
-            if value in path_chk:
-              self._referenced_object = path_chk[path_chk.index(value)]
-              found = True
-            else:
-              for i in path_chk:
-                try:
-                  self._referenced_object = i[i.index(value)]
-                  found = True
-                except ValueError:
-                  pass
-            if not found:
+            try:
+              self._referenced_object = resolved.find(value)
+            except KeyError:
               raise ValueError, "no such key (%s) existed in path (%s -> %s)" % (value, self._referenced_path, path_chk)
         else:
           # require instance is not set, so act like a string
@@ -640,7 +1685,7 @@ def ReferenceType(*args,**kwargs):
 
     def _get_ptr(self):
       if self._ptr:
-        ptr = self._path_helper.get(self._referenced_path, caller=self._caller)
+        ptr = self._path_helper._resolve(self._referenced_path, caller=self._caller).objects
         if len(ptr) == 1:
           return ptr[0]
       raise ValueError, "Invalid pointer specified"
@@ -21,6 +21,9 @@ import string
 import numpy as np
 import decimal
 import copy
+import collections
+import StringIO
+import os
 
 from pyang import plugin
 from pyang import statements
@@ -120,6 +123,32 @@ class_map = {
                           "pytype": np.int64},
 }
 
+class TypeMapOverlay(object):
+  """
+    A read-only view of a type map, in which the entries of a dict of
+    overrides take precedence over those of the underlying map. This is
+    used in place of copying the class_map, which grows with each typedef
+    and identity that is defined.
+  """
+  __slots__ = ('_base', '_overrides',)
+
+  def __init__(self, base, overrides):
+    self._base = base
+    self._overrides = overrides
+
+  def __getitem__(self, k):
+    if k in self._overrides:
+      return self._overrides[k]
+    return self._base[k]
+
+  def __contains__(self, k):
+    return k in self._overrides or k in self._base
+
+# when determining the default of a leaf, the type of an enumeration is
+# taken to be a string.
+default_class_map = TypeMapOverlay(class_map,
+                                    {"enumeration": {"parent_type": "string"}})
+
 # all types that support range substmts
 INT_RANGE_TYPES = ["uint8", "uint16", "uint32", "uint64",
                     "int8", "int16", "int32", "int64"]
@@ -155,23 +184,78 @@ class BTPyClass(plugin.PyangPlugin):
                                        action="store_true",
                                        help="""Use the xpathhelper module to
                                                resolve leafrefs"""),
+                  optparse.make_option("--compact-leaflists",
+                                       dest="compact_leaflists",
+                                       action="store_true",
+                                       help="""Store leaf-lists of integer
+                                               types in compact arrays"""),
+                  optparse.make_option("--keyless-list-uuids",
+                                       dest="keyless_list_uuids",
+                                       action="store_true",
+                                       help="""Key entries of lists without a
+                                               key with a uuid rather than a
+                                               counter"""),
+                  optparse.make_option("--decimal64-fixed-point",
+                                       dest="decimal64_fixed_point",
+                                       action="store_true",
+                                       help="""Store decimal64 values with
+                                               fraction-digits as scaled
+                                               integers"""),
+                  optparse.make_option("--lazy-children",
+                                       dest="lazy_children",
+                                       action="store_true",
+                                       help="""Create the children of a
+                                               container when they are first
+                                               accessed, rather than when the
+                                               container is created"""),
+                  optparse.make_option("--deduplicate-classes",
+                                       dest="deduplicate_classes",
+                                       action="store_true",
+                                       help="""Generate a single class for
+                                               containers and lists that are
+                                               identical, and report the
+                                               number of classes that were
+                                               shared"""),
+                  optparse.make_option("--split-class-dir",
+                                       metavar="DIR",
+                                       dest="split_class_dir",
+                                       help="""Generate a package in DIR,
+                                               with a submodule for each
+                                               top-level container or list
+                                               that is imported when it is
+                                               first used"""),
                 ]
       g = optparser.add_option_group("pyangbind output specific options")
       g.add_options(optlist)
 
 
-def build_pybind(ctx, modules, fd):
-
+def write_header(ctx, fd):
   # output the base code that we need to re-use with dynamically generated
   # objects.
   fd.write("from operator import attrgetter\n")
   if ctx.opts.use_xpathhelper:
     fd.write("import lib.xpathhelper as xpathhelper\n")
-  fd.write("""from lib.yangtypes import RestrictedPrecisionDecimalType, RestrictedClassType, TypedListType\n""")
-  fd.write("""from lib.yangtypes import YANGBool, YANGListType, YANGDynClass, ReferenceType\n""")
+  fd.write("""from lib.yangtypes import RestrictedPrecisionDecimalType, FixedPointDecimalType, RestrictedClassType, TypedListType\n""")
+  fd.write("""from lib.yangtypes import YANGBool, YANGListType, YANGDynClass, YANGDynClassFactory, ReferenceType\n""")
   fd.write("""from decimal import Decimal\n""")
   fd.write("""import numpy as np\n""")
 
+def build_pybind(ctx, modules, fd):
+
+  if ctx.opts.split_class_dir:
+    # the root classes are written to the __init__ module of the package,
+    # the classes of each top-level container or list to a submodule of it.
+    if not os.path.isdir(ctx.opts.split_class_dir):
+      os.makedirs(ctx.opts.split_class_dir)
+    fd = open(os.path.join(ctx.opts.split_class_dir, "__init__.py"), "w")
+    write_header(ctx, fd)
+    fd.write("""import importlib
+
+def _submodule(name):
+  return importlib.import_module("%s.%s" % (__name__, name))\n""")
+  else:
+    write_header(ctx, fd)
+
   all_mods = []
   for module in modules:
     local_module_prefix = module.search_one('prefix').arg
@@ -200,6 +284,12 @@ def build_pybind(ctx, modules, fd):
   build_identities(ctx, defn['identity'])
   build_typedefs(ctx, defn['typedef'])
 
+  # the classes that have been generated, keyed by their code (excluding
+  # docstrings and the class name), such that identical classes are only
+  # generated once when deduplicate_classes is set.
+  ctx.pybind_classes = {}
+  ctx.pybind_class_count = 0
+
   for module in modules:
     mods = [module]
     for i in module.search('include'):
@@ -212,42 +302,120 @@ def build_pybind(ctx, modules, fd):
             if ch.keyword in statements.data_definition_keywords]
       get_children(ctx, fd, children, m, m)
 
+  if ctx.opts.deduplicate_classes and ctx.pybind_class_count:
+    shared = ctx.pybind_class_count - len(ctx.pybind_classes)
+    sys.stderr.write("pybind: %d classes generated for %d containers and " \
+                      "lists, %d (%.1f%%) shared\n" % (len(ctx.pybind_classes),
+                      ctx.pybind_class_count, shared,
+                      100.0 * shared / ctx.pybind_class_count))
+
+  if ctx.opts.split_class_dir:
+    fd.close()
+
+def dependency_order(dependencies):
+  """
+    Order the items of the dependencies dict - which is keyed by the name
+    of each item, with a list of the names of the items that it depends on
+    as its value - such that each item appears after all of those that it
+    depends on (Kahn's algorithm). Each dependency must itself be a key of
+    the dict.
+
+    Returns a tuple of the ordered names, and the names of those items which
+    are part of a circular dependency. Items which only depend on a cycle are
+    in neither.
+  """
+  waiting_on = {}
+  dependents = {}
+  for name in dependencies:
+    waiting_on[name] = len(set(dependencies[name]))
+    dependents[name] = []
+  for name in dependencies:
+    for dependency in set(dependencies[name]):
+      dependents[dependency].append(name)
+
+  ordered = []
+  ready = collections.deque(sorted([n for n in waiting_on if not waiting_on[n]]))
+  while ready:
+    name = ready.popleft()
+    ordered.append(name)
+    for dependent in dependents[name]:
+      waiting_on[dependent] -= 1
+      if not waiting_on[dependent]:
+        ready.append(dependent)
+
+  # strip the items which nothing else that is unresolved depends on, what
+  # remains are the members of a cycle.
+  unresolved = set([n for n in waiting_on if waiting_on[n]])
+  depended_on = dict([(n, 0) for n in unresolved])
+  for name in unresolved:
+    for dependency in set(dependencies[name]):
+      depended_on[dependency] += 1
+  leaves = [n for n in unresolved if not depended_on[n]]
+  while leaves:
+    name = leaves.pop()
+    unresolved.discard(name)
+    for dependency in set(dependencies[name]):
+      depended_on[dependency] -= 1
+      if not depended_on[dependency]:
+        leaves.append(dependency)
+
+  return ordered, sorted(unresolved)
+
 def build_identities(ctx, defnd):
-  unresolved_idc = {}
-  for i in defnd:
-    unresolved_idc[i] = 0
-  unresolved_ids = defnd.keys()
+  # each identity depends on its base, and - where the base is also known
+  # with or without the prefix of the identity - on that form of the base, so
+  # that both are built before the identity is added to them.
+  dependencies = {}
   error_ids = []
-  identity_d = {}
-
-  while len(unresolved_ids):
-    ident = unresolved_ids.pop(0)
+  for ident in defnd:
+    dependencies[ident] = []
     base = defnd[ident].search_one('base')
     if base is None:
-      identity_d[ident] = {}
+      continue
+    if not base.arg in defnd:
+      sys.stderr.write("could not find a match for %s base: %s\n" % (ident, base.arg))
+      error_ids.append(ident)
+      continue
+    dependencies[ident].append(base.arg)
+    if ":" in ident:
+      pfx_base = "%s:%s" % (ident.split(":")[0], base.arg)
+      if pfx_base in defnd:
+        dependencies[ident].append(pfx_base)
+    if ":" in base.arg and base.arg.split(":")[1] in defnd:
+      dependencies[ident].append(base.arg.split(":")[1])
+
+  ordered, cyclic = dependency_order(dependencies)
+  resolved = set(ordered)
+  for ident in sorted(defnd):
+    if ident in resolved or ident in error_ids:
+      continue
+    if ident in cyclic:
+      sys.stderr.write("identity %s has a circular base\n" % ident)
     else:
-      if base.arg in identity_d:
-        val = ident
-        if ":" in ident:
-          parts = ident.split(":")
-          val = parts[1]
-          pfx = parts[0]
-          if "%s:%s" % (pfx, base.arg) in identity_d:
-            identity_d["%s:%s" % (pfx, base.arg)][val] = {}
-        if ":" in base.arg and base.arg.split(":")[1] in identity_d:
-          identity_d[base.arg.split(":")[1]][val] = {}
-        identity_d[base.arg][val] = {}
-        # everything that is a value can also be a base
-        if not val in identity_d:
-          identity_d[val] = {}
-      else:
-        if unresolved_idc[ident] > 1000:
-          # looked at this id a lot, it's a problem
-          sys.stderr.write("could not find a match for %s base: %s\n" % (ident, base.arg))
-          error_ids.append(ident)
-        else:
-          unresolved_ids.append(ident)
-          unresolved_idc[ident] += 1
+      sys.stderr.write("identity %s has a base that could not be " \
+                        "resolved: %s\n" % (ident, defnd[ident].search_one('base').arg))
+    error_ids.append(ident)
+
+  if error_ids:
+    raise TypeError, "could not resolve identities %s" % sorted(error_ids)
+
+  identity_d = {}
+  for ident in ordered:
+    # every identity can also be a base
+    if not ident in identity_d:
+      identity_d[ident] = {}
+    base = defnd[ident].search_one('base')
+    if base is not None:
+      val = ident
+      if ":" in ident:
+        parts = ident.split(":")
+        val = parts[1]
+        pfx = parts[0]
+        if "%s:%s" % (pfx, base.arg) in identity_d:
+          identity_d["%s:%s" % (pfx, base.arg)][val] = {}
+      if ":" in base.arg and base.arg.split(":")[1] in identity_d:
+        identity_d[base.arg.split(":")[1]][val] = {}
+      identity_d[base.arg][val] = {}
 
   # use keys() as the dictionary will change size when we
   # del an item.
@@ -255,9 +423,6 @@ def build_identities(ctx, defnd):
     if len(identity_d[potential_identity]) == 0:
       del identity_d[potential_identity]
 
-  if error_ids:
-    raise TypeError, "could not resolve identities %s" % error_ids
-
   for i in identity_d:
     id_type = {"native_type": """RestrictedClassType(base_type=str, restriction_type="dict_key", restriction_arg=%s,)""" % identity_d[i], \
                 "restriction_argument": identity_d[i], \
@@ -267,17 +432,12 @@ def build_identities(ctx, defnd):
     class_map[i] = id_type
 
 def build_typedefs(ctx, defnd):
-  unresolved_tc = {}
-  for i in defnd:
-    unresolved_tc[i] = 0
-  unresolved_t = defnd.keys()
+  # a typedef depends on those of its types (the members of a union, or the
+  # base of an identityref) which are themselves typedefs.
+  dependencies = {}
   error_ids = []
-  known_types = class_map.keys()
-  known_types.append('enumeration')
-  process_typedefs_ordered = []
-  while len(unresolved_t):
-
-    t = unresolved_t.pop(0)
+  for t in defnd:
+    dependencies[t] = []
     base_t = defnd[t].search_one('type')
     if base_t.arg == "union":
       subtypes = [i for i in base_t.search('type')]
@@ -286,23 +446,33 @@ def build_typedefs(ctx, defnd):
     else:
       subtypes = [base_t,]
 
-    any_unknown = False
     for i in subtypes:
-      if not i.arg in known_types:
-        any_unknown=True
-    if not any_unknown:
-      process_typedefs_ordered.append((t, defnd[t]))
-      known_types.append(t)
-    else:
-      unresolved_tc[t] += 1
-      if unresolved_tc[t] > 1000:
-        error_ids.append(t)
-        sys.stderr.write("could not find a match for %s type\n" % t)
+      if i.arg in class_map or i.arg == "enumeration":
+        continue
+      elif i.arg in defnd:
+        dependencies[t].append(i.arg)
       else:
-        unresolved_t.append(t)
+        sys.stderr.write("could not find a match for %s type: %s\n" % (t, i.arg))
+        if not t in error_ids:
+          error_ids.append(t)
+
+  ordered, cyclic = dependency_order(dependencies)
+  resolved = set(ordered)
+  for t in sorted(defnd):
+    if t in resolved or t in error_ids:
+      continue
+    if t in cyclic:
+      sys.stderr.write("typedef %s has a circular type\n" % t)
+    else:
+      sys.stderr.write("typedef %s has a type that could not be " \
+                        "resolved: %s\n" % (t, ", ".join([d for d in
+                          dependencies[t] if not d in resolved])))
+    error_ids.append(t)
 
   if error_ids:
-    raise TypeError, "could not resolve typedefs %s" % error_ids
+    raise TypeError, "could not resolve typedefs %s" % sorted(error_ids)
+
+  process_typedefs_ordered = [(t, defnd[t]) for t in ordered]
 
   for i_tuple in process_typedefs_ordered:
     item = i_tuple[1]
@@ -311,12 +481,9 @@ def build_typedefs(ctx, defnd):
     mapped_type = False
     restricted_arg = False
     cls,elemtype = copy.deepcopy(build_elemtype(ctx, item.search_one('type')))
-    known_types = class_map.keys()
     # Enumeration is a native type, but is not natively supported
-    # in the class_map, and hence we append it here.
-    known_types.append("enumeration")
-
-    if type_name in known_types:
+    # in the class_map, and hence is checked for here.
+    if type_name in class_map or type_name == "enumeration":
       raise TypeError, "Duplicate definition of %s" % type_name
     default_stmt = item.search_one('default')
     if not isinstance(elemtype,list):
@@ -327,7 +494,7 @@ def build_typedefs(ctx, defnd):
         class_map[type_name]["parent_type"] = elemtype["parent_type"]
       else:
         yang_type = item.search_one('type').arg
-        if not yang_type in known_types:
+        if not (yang_type in class_map or yang_type == "enumeration"):
           raise TypeError, "typedef specified a native type that was not \
                             supported"
         class_map[type_name]["parent_type"] = yang_type
@@ -350,7 +517,7 @@ def build_typedefs(ctx, defnd):
           native_type.extend(i[1]["native_type"])
         else:
           native_type.append(i[1]["native_type"])
-        if i[1]["yang_type"] in known_types:
+        if i[1]["yang_type"] in class_map or i[1]["yang_type"] == "enumeration":
           parent_type.append(i[1]["yang_type"])
         else:
           msg = "typedef in a union specified a native type that was not"
@@ -384,6 +551,11 @@ def get_children(ctx, fd, i_children, module, parent, path=str(), parent_cfg=Tru
   used_types,elements = [],[]
   choices = False
 
+  # the children of the root of a split package are created lazily, such
+  # that their submodules are not imported until they are used.
+  split_root = ctx.opts.split_class_dir and path == ""
+  lazy_children = ctx.opts.lazy_children or split_root
+
   if parent_cfg:
     # the first time we find a container that has config false set on it
     # then we need to hand this down the tree - we don't need to look if
@@ -401,15 +573,35 @@ def get_children(ctx, fd, i_children, module, parent, path=str(), parent_cfg=Tru
         # these are case statements
         for case_ch in choice_ch.i_children:
           elements += get_element(ctx, fd, case_ch, module, parent, path+"/"+ch.arg, parent_cfg=parent_cfg, choice=(ch.arg,choice_ch.arg))
+    elif split_root and ch.keyword in ["container", "list"]:
+      # each top-level container or list is written to its own submodule,
+      # which is imported by the root class when the child is first used.
+      submodule = safe_name("%s_%s" % (parent.arg, ch.arg))
+      sub_fd = open(os.path.join(ctx.opts.split_class_dir, "%s.py" % submodule), "w")
+      write_header(ctx, sub_fd)
+      # classes are only shared within a submodule
+      ctx.pybind_classes = {}
+      sub_elements = get_element(ctx, sub_fd, ch, module, parent, path+"/"+ch.arg, parent_cfg=parent_cfg, choice=choice)
+      sub_fd.close()
+      for i in sub_elements:
+        i["type"] = "_submodule(\"%s\").%s" % (submodule, i["type"])
+        i["split"] = True
+      elements += sub_elements
     else:
       elements += get_element(ctx, fd, ch, module, parent, path+"/"+ch.arg, parent_cfg=parent_cfg, choice=choice)
 
+  if ctx.opts.deduplicate_classes:
+    # the class is written to a buffer such that it can be compared to the
+    # classes that have already been generated.
+    class_fd, fd = fd, StringIO.StringIO()
+
   if parent.keyword in ["container", "module", "list", "submodule"]:
     if not path == "":
-      fd.write("class yc_%s_%s(object):\n" % (safe_name(parent.arg), \
-        safe_name(path.replace("/", "_"))))
+      class_name = "yc_%s_%s" % (safe_name(parent.arg), \
+        safe_name(path.replace("/", "_")))
     else:
-      fd.write("class %s(object):\n" % safe_name(parent.arg))
+      class_name = safe_name(parent.arg)
+    fd.write("class %s(object):\n" % class_name)
 
     keyval = False
     if parent.keyword == "list":
@@ -436,6 +628,7 @@ def get_children(ctx, fd, i_children, module, parent, path=str(), parent_cfg=Tru
     raise TypeError, "unhandled keyword with children %s" % parent.keyword
 
   e_str = ""
+  factories = []
   if len(elements) == 0:
     fd.write("  pass\n")
   else:
@@ -471,6 +664,8 @@ def get_children(ctx, fd, i_children, module, parent, path=str(), parent_cfg=Tru
           allowed_type += "]"
         else:
           allowed_type = "%s" % (i["type"]["native_type"][1])
+        if ctx.opts.compact_leaflists:
+          allowed_type += ", compact=True"
         class_str["arg"] += "%s(allowed_type=%s)" % (i["type"]["native_type"][0],allowed_type)
         if "default" in i and not i["default"] is None:
           class_str["arg"] += ", default=%s(%s)" % (i["defaulttype"], default_arg)
@@ -482,6 +677,8 @@ def get_children(ctx, fd, i_children, module, parent, path=str(), parent_cfg=Tru
         class_str["arg"] += ", yang_name=\"%s\", parent=self, is_container=True" % (i["yang_name"])
         class_str["arg"] += ", user_ordered=%s" % i["user_ordered"]
         class_str["arg"] += ", path_helper=self._path_helper"
+        if not i["key"] and ctx.opts.keyless_list_uuids:
+          class_str["arg"] += ", uuid_keys=True"
         if i["choice"]:
           class_str["arg"] += ", choice=%s" % repr(choice)
         class_str["arg"] += ")"
@@ -511,7 +708,12 @@ def get_children(ctx, fd, i_children, module, parent, path=str(), parent_cfg=Tru
         class_str["name"] = "__%s" % (i["name"])
         class_str["type"] = "YANGDynClass"
         class_str["arg"] = "base=%s" % i["type"]
-        class_str["arg"] += "(referenced_path='%s', caller='%s', " % (i["referenced_path"], path+"/"+i["yang_name"])
+        class_str["arg"] += "(referenced_path='%s', " % i["referenced_path"]
+        # the caller is only used to resolve a relative path, and is omitted
+        # otherwise such that containers that include a leafref with an
+        # absolute path can be deduplicated.
+        if not i["referenced_path"].startswith("/"):
+          class_str["arg"] += "caller='%s', " % (path+"/"+i["yang_name"])
         class_str["arg"] += "path_helper=self._path_helper, "
         class_str["arg"] += "require_instance=%s)" % (i["require_instance"])
       else:
@@ -538,6 +740,17 @@ def get_children(ctx, fd, i_children, module, parent, path=str(), parent_cfg=Tru
         class_str["arg"] += ", path_helper=self._path_helper"
         #class_str += ", path='%s'" % (path+"/"+i["yang_name"])
         #class_str["arg"] += ")\n"
+        class_str["description"] = class_str["arg"]
+        if not i["class"] in ["list", "leafref"] and not i.get("split", False):
+          # the arguments of elements whose type does not depend on the
+          # instance are handled once, by a factory that is created at the
+          # module level.
+          factory_name = "_%s_%s" % (class_name, i["name"])
+          factories.append((factory_name, class_str["arg"].replace(
+                              ", parent=self", "").replace(
+                              ", path_helper=self._path_helper", "")))
+          class_str["type"] = factory_name
+          class_str["arg"] = "parent=self, path_helper=self._path_helper"
         classes[i["name"]] = class_str
         # TODO: NEED TO CLEAN UP HOW BASE ERRORS ARE REPORTED
         # WILL BE FIXED LATER.
@@ -554,8 +767,19 @@ def get_children(ctx, fd, i_children, module, parent, path=str(), parent_cfg=Tru
       else:
         fd.write("""
     self._path_helper = False\n""")
-    for c in classes:
-      fd.write("    self.%s = %s(%s)\n" % (classes[c]["name"], classes[c]["type"], classes[c]["arg"]))
+    if not lazy_children:
+      for c in classes:
+        fd.write("    self.%s = %s(%s)\n" % (classes[c]["name"], classes[c]["type"], classes[c]["arg"]))
+    elif ctx.opts.use_xpathhelper:
+      # leafrefs can only be resolved to nodes that are registered with the
+      # path helper, so children are not created lazily where one is used.
+      fd.write("    if self._path_helper:\n")
+      for c in classes:
+        fd.write("      self.%s = %s(%s)\n" % (classes[c]["name"], classes[c]["type"], classes[c]["arg"]))
+    # a supplied object is copied through the setters of its elements, such
+    # that any index of a list that this is an entry of is updated. Elements
+    # that are unchanged are not copied, so that copying the default of an
+    # element in one case of a choice does not unset the members of another.
     fd.write("""
     if args:
       if len(args) > 1:
@@ -568,7 +792,9 @@ def get_children(ctx, fd, i_children, module, parent, path=str(), parent_cfg=Tru
       if not all_attr:
         raise ValueError, "Supplied object did not have the correct attributes"
       for e in self.__elements:
-        setattr(self, getattr(args[0], e))
+        v = getattr(args[0], e)
+        if getattr(v, "_changed", True):
+          getattr(self, "_set_%s" % e)(v)
 """)
     if path == "":
       fd.write("""
@@ -584,10 +810,21 @@ def get_children(ctx, fd, i_children, module, parent, path=str(), parent_cfg=Tru
   def _get_%s(self):
     \"\"\"
       Getter method for %s, mapped from YANG variable %s (%s)%s
-    \"\"\"
+    \"\"\"""" % (i["name"], i["name"], i["path"], i["origtype"],
+                      description_str))
+      if lazy_children:
+        # the child is created the first time that it is accessed
+        fd.write("""
+    try:
+      return self.__%s
+    except AttributeError:
+      self.__%s = %s(%s)
+      return self.__%s
+      """ % (i["name"], i["name"], c_str["type"], c_str["arg"], i["name"]))
+      else:
+        fd.write("""
     return self.__%s
-      """ % (i["name"], i["name"], i["path"], i["origtype"],
-             description_str, i["name"]))
+      """ % i["name"])
 
       fd.write("""
   def _set_%s(self,v):
@@ -604,14 +841,28 @@ def get_children(ctx, fd, i_children, module, parent, path=str(), parent_cfg=Tru
       t = %s(v,%s)""" % (c_str["type"], c_str["arg"]))
       fd.write("""
     except (TypeError, ValueError):
-      raise ValueError(\"\"\"%s must be of a type compatible with %s\"\"\")
-    self.__%s = t\n""" % (i["name"], c_str["arg"], i["name"]))
-      fd.write("    self.set()\n")
+      raise ValueError(\"\"\"%s must be of a type compatible with %s\"\"\")\n""" % \
+                          (i["name"], c_str["description"]))
+      indexed = parent.keyword == "list" and \
+                  not i["class"] in ["container", "list", "leaf-list"]
+      if indexed:
+        # leaves of list entries may be indexed by the list
+        fd.write("""    self._reindex("%s", t)\n""" % i["name"])
+      fd.write("""    self.__%s = t\n""" % i["name"])
+      if i["choice"]:
+        # setting a member of a case of a choice unsets the members of the
+        # other cases
+        fd.write("    self.set(choice=%s)\n" % repr(i["choice"]))
+      else:
+        fd.write("    self.set()\n")
 
       if i["name"] in choice_attrs:
         fd.write("""
   def _unset_%s(self):
-    self.__%s = %s(%s)\n\n""" % (i["name"], i["name"], c_str["type"], c_str["arg"],))
+    t = %s(%s)\n""" % (i["name"], c_str["type"], c_str["arg"],))
+        if indexed:
+          fd.write("""    self._reindex("%s", t)\n""" % i["name"])
+        fd.write("""    self.__%s = t\n\n""" % i["name"])
     for i in elements:
       rw = True
       if not i["config"]:
@@ -640,59 +891,73 @@ def get_children(ctx, fd, i_children, module, parent, path=str(), parent_cfg=Tru
   def __str__(self):
     return str(self.elements())
 
-  def get(self, filter=False):
-    def error():
-      return NameError, "element does not exist"
-    d = {}
-    # for each YANG element within this container.
-    for element_name in self.__elements:
-      element = getattr(self, element_name, error)
-      if hasattr(element, "yang_name"):
-        # retrieve the YANG name method
-        yang_name = getattr(element, "yang_name", error)
-        element_id = yang_name()
-      else:
-        element_id = element_name
-      if hasattr(element, "get"):
-        # this is a YANG container that has its own
-        # get method
-        d[element_id] = element.get(filter=filter)
-        if filter == True:
-          # if the element hadn't changed but we were
-          # filtering unchanged elements, remove it
-          # from the dictionary
-          if isinstance(d[element_id], dict):
-            for entry in d[element_id]:
-              if hasattr(d[element_id][entry], "changed"):
-                if not d[element_id][entry].changed():
-                  del d[element_id][entry]
-            if len(d[element_id]) == 0:
-              del d[element_id]
-          elif isinstance(d[element_id], list):
-            for list_entry in d[element_id]:
-              if hasattr(list_entry, "changed"):
-                if not list_entry.changed():
-                  d[element_id].remove(list_entry)
-            if len(d[element_id]) == 0:
-              del d[element_id]
-      else:
-        # this is an attribute that does not have get()
-        # method
-
-        if filter == False and not element.changed():
-          if not element._default == False and element._default:
-            d[element_id] = element._default
-          else:
-            d[element_id] = element
-        elif element.changed():
-          d[element_id] = element
-        else:
-          # changed = False, and filter = True
-          pass
-    return d
-  \n""" % e_str)
+""" % e_str)
+
+  # get() is generated for each container, such that the YANG name and kind
+  # of each element does not need to be determined at run-time.
+  fd.write("""  def get(self, filter=False):
+    d = {}\n""")
+  for i in elements:
+    if lazy_children:
+      # children that have not been created have not been changed, and are
+      # otherwise reported using an instance that is not registered with
+      # the path helper, or retained.
+      unregistered_arg = classes[i["name"]]["arg"].replace(
+                            "path_helper=self._path_helper", "path_helper=False")
+      fd.write("""    try:
+      v = self.__%s
+    except AttributeError:
+      v = None if filter else %s(%s)
+    if v is not None:\n""" % (i["name"], classes[i["name"]]["type"],
+                                  unregistered_arg))
+      indent = "  "
+    else:
+      fd.write("""    v = self.__%s\n""" % i["name"])
+      indent = ""
+    if i["class"] == "container":
+      # a container is marked as changed when any of its descendants are,
+      # such that unchanged containers are not visited when filtering.
+      get_str = """if not filter or v._changed:
+  v = v.get(filter=filter)
+  if v or not filter:
+    d["%s"] = v""" % i["yang_name"]
+    elif i["class"] in ["list", "leaf-list"]:
+      # elements with their own get() method are omitted when filtering
+      # if they are empty
+      get_str = """v = v.get(filter=filter)
+if v or not filter:
+  d["%s"] = v""" % i["yang_name"]
+    else:
+      get_str = """if v._changed:
+  d["%s"] = v
+elif not filter:
+  d["%s"] = v._default if v._default else v""" % \
+                  (i["yang_name"], i["yang_name"])
+    for line in get_str.split("\n"):
+      fd.write("    %s%s\n" % (indent, line))
+  fd.write("""    return d
+  \n""")
   fd.write("\n")
-  return None
+  if factories:
+    for factory in factories:
+      fd.write("%s = YANGDynClassFactory(%s)\n" % factory)
+    fd.write("\n")
+
+  if ctx.opts.deduplicate_classes:
+    class_code = fd.getvalue()
+    # docstrings and the class name (which are derived from the path) are
+    # not considered when comparing classes. Children are referred to by
+    # the name of the class that was generated for them, so containers
+    # with identical children are also identical.
+    signature = re.sub('"""[\s\S]*?"""', '', class_code).replace(class_name, "")
+    ctx.pybind_class_count += 1
+    if signature in ctx.pybind_classes:
+      shared_name = ctx.pybind_classes[signature]
+      class_fd.write("%s = %s\n\n" % (class_name, shared_name))
+      return shared_name
+    ctx.pybind_classes[signature] = class_name
+    class_fd.write(class_code)
+  return class_name
 
 def build_elemtype(ctx, et, prefix=False):
   cls = "leaf"
@@ -747,9 +1012,13 @@ def build_elemtype(ctx, et, prefix=False):
     fd_stmt = et.search_one('fraction-digits')
     if not fd_stmt is None:
       cls = "restricted-decimal64"
+      if ctx.opts.decimal64_fixed_point:
+        decimal_type = "FixedPointDecimalType"
+      else:
+        decimal_type = "RestrictedPrecisionDecimalType"
       elemtype = {"native_type": \
-                    """RestrictedPrecisionDecimalType(precision=%s)""" % \
-                    fd_stmt.arg, "base_type": False, \
+                    """%s(precision=%s)""" % \
+                    (decimal_type, fd_stmt.arg), "base_type": False, \
                     "parent_type": "decimal64",}
     else:
       elemtype = class_map[et.arg]
@@ -840,10 +1109,9 @@ def get_element(ctx, fd, element, module, parent, path, parent_cfg=True,choice=F
       npath=path
     if element.i_children:
       chs = element.i_children
-      get_children(ctx, fd, chs, module, element, npath, parent_cfg=parent_cfg, choice=choice)
+      class_name = get_children(ctx, fd, chs, module, element, npath, parent_cfg=parent_cfg, choice=choice)
       elemdict = {"name": safe_name(element.arg), "origtype": element.keyword,
-                          "type": "yc_%s_%s" % (safe_name(element.arg),
-                          safe_name(path.replace("/", "_"))),
+                          "type": class_name,
                           "class": element.keyword,
                           "path": safe_name(npath), "config": True,
                           "description": elemdescr,
@@ -890,11 +1158,6 @@ def get_element(ctx, fd, element, module, parent, path, parent_cfg=True,choice=F
       elemdefault = elemtype["default"]
       default_type = elemtype
 
-    # we need to indicate that the default type for the class_map
-    # is str
-    tmp_class_map = copy.deepcopy(class_map)
-    tmp_class_map["enumeration"] = {"parent_type": "string"}
-
     if not default_type:
       if isinstance(elemtype, list):
         # this type has multiple parents
@@ -915,18 +1178,18 @@ def get_element(ctx, fd, element, module, parent, path, parent_cfg=True,choice=F
           check = to_visit.pop(0)
           if check not in checked:
             checked.append(check)
-            if "parent_type" in tmp_class_map[check]:
-              if isinstance(tmp_class_map[check]["parent_type"], list):
-                to_visit.extend(tmp_class_map[check]["parent_type"])
+            if "parent_type" in default_class_map[check]:
+              if isinstance(default_class_map[check]["parent_type"], list):
+                to_visit.extend(default_class_map[check]["parent_type"])
               else:
-                to_visit.append(tmp_class_map[check]["parent_type"])
+                to_visit.append(default_class_map[check]["parent_type"])
 
         # checked now has the breadth-first search result
         if elemdefault is None:
           for option in checked:
-            if "default" in tmp_class_map[option]:
-              elemdefault = tmp_class_map[option]["default"]
-              default_type = tmp_class_map[option]
+            if "default" in default_class_map[option]:
+              elemdefault = default_class_map[option]["default"]
+              default_type = default_class_map[option]
               break
 
     if elemdefault is not None:
@@ -959,12 +1222,12 @@ def get_element(ctx, fd, element, module, parent, path, parent_cfg=True,choice=F
           check = to_visit.pop(0) # remove from the top of stack - depth first
           if not check in checked:
             checked.append(check)
-            if "parent_type" in tmp_class_map[check]:
-              if isinstance(tmp_class_map[check]["parent_type"], list):
-                to_visit.expand(tmp_class_map[check]["parent_type"])
+            if "parent_type" in default_class_map[check]:
+              if isinstance(default_class_map[check]["parent_type"], list):
+                to_visit.expand(default_class_map[check]["parent_type"])
               else:
-                to_visit.append(tmp_class_map[check]["parent_type"])
-        default_type = tmp_class_map[checked.pop()]
+                to_visit.append(default_class_map[check]["parent_type"])
+        default_type = default_class_map[checked.pop()]
         if not default_type["base_type"]:
           raise TypeError, "default type was not a base type"
 
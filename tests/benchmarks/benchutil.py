@@ -0,0 +1,18 @@
+"""
+  Helpers that are shared by the benchmarks in this directory.
+"""
+
+import resource
+
+def rss_kb():
+  """
+    Return the resident set size of this process in KB. Where /proc is not
+    available, the peak resident set size is returned instead.
+  """
+  try:
+    for line in open("/proc/self/status"):
+      if line.startswith("VmRSS:"):
+        return int(line.split()[1])
+  except IOError:
+    pass
+  return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
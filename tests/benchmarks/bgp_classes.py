@@ -0,0 +1,86 @@
+#!/usr/bin/env python
+"""
+  Benchmark: populate the openconfig-bgp-juniper model with a large number
+  of neighbors and report the number of YANGBaseClass types that exist, the
+  resident memory of the process, and the time taken to populate the tree.
+
+  Usage: bgp_classes.py [-k] [-n neighbors[,neighbors...]]
+"""
+
+import os, sys, getopt, gc, time, subprocess
+
+from benchutil import rss_kb
+
+TESTNAME = "openconfig-bgp-juniper"
+DEFAULT_SIZES = [10000, 100000]
+
+def populate(count):
+  from bgp_bindings import openconfig_bgp_juniper
+
+  gc.collect()
+  rss_before = rss_kb()
+  start = time.time()
+
+  bgp = openconfig_bgp_juniper()
+  bgp.juniper_config.bgp.global_.as_ = "2856"
+  groups = ["group%d" % i for i in range(0, 10)]
+  for group in groups:
+    bgp.juniper_config.bgp.peer_group.add(group)
+
+  for i in range(0, count):
+    group = bgp.juniper_config.bgp.peer_group[groups[i % len(groups)]]
+    neighbor = "10.%d.%d.%d" % ((i >> 16) & 255, (i >> 8) & 255, i & 255)
+    group.neighbor.add(neighbor)
+    group.neighbor[neighbor].peer_as = str(64512 + (i % 1000))
+
+  elapsed = time.time() - start
+  gc.collect()
+  classes = len([o for o in gc.get_objects() if isinstance(o, type) and
+                    o.__name__ == "YANGBaseClass"])
+  print "neighbors: %d, YANGBaseClass types: %d, rss delta: %d KB, " \
+        "populate time: %.2fs" % (count, classes, rss_kb() - rss_before, elapsed)
+
+def main():
+  try:
+    opts, args = getopt.getopt(sys.argv[1:], "kn:c:", ["keepfiles", "neighbors=",
+                                                        "child="])
+  except getopt.GetoptError as e:
+    print str(e)
+    sys.exit(127)
+
+  k = False
+  sizes = DEFAULT_SIZES
+  child = False
+  for o, a in opts:
+    if o in ["-k", "--keepfiles"]:
+      k = True
+    elif o in ["-n", "--neighbors"]:
+      sizes = [int(i) for i in a.split(",")]
+    elif o in ["-c", "--child"]:
+      child = int(a)
+
+  this_dir = os.path.dirname(os.path.realpath(__file__))
+  if child:
+    sys.path.insert(0, this_dir)
+    populate(child)
+    return
+
+  pyangpath = os.environ.get('PYANGPATH') if os.environ.get('PYANGPATH') is not None else False
+  pyangbindpath = os.environ.get('PYANGBINDPATH') if os.environ.get('PYANGBINDPATH') is not None else False
+  assert not pyangpath == False, "could not find path to pyang"
+  assert not pyangbindpath == False, "could not resolve pyangbind directory"
+
+  yang_file = "%s/../%s/%s.yang" % (this_dir, TESTNAME, TESTNAME)
+  os.system("%s --plugindir %s -f pybind -o %s/bgp_bindings.py %s > /dev/null" %
+              (pyangpath, pyangbindpath, this_dir, yang_file))
+
+  # each size is run in a separate interpreter such that memory figures
+  # are not affected by previous runs.
+  for size in sizes:
+    subprocess.call([sys.executable, os.path.realpath(__file__), "-c", str(size)])
+
+  if not k:
+    os.system("/bin/rm -f %s/bgp_bindings.py %s/bgp_bindings.pyc" % (this_dir, this_dir))
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,129 @@
+#!/usr/bin/env python
+"""
+  Benchmark: serialise the openconfig-bgp-juniper model populated with a
+  large number of neighbors using get(), with and without filtering, and
+  compare with the introspective get() that was previously generated for
+  each container (reproduced by introspective_get() below).
+
+  Usage: bgp_get.py [-k] [-n neighbors]
+"""
+
+import os, sys, getopt, time, gc
+
+TESTNAME = "openconfig-bgp-juniper"
+
+def introspective_get(obj, filter=False):
+  # the get() method that was generated for each container before it was
+  # specialised, with calls to get() of child containers replaced with
+  # calls to this function.
+  def error():
+    return NameError, "element does not exist"
+  d = {}
+  for element_name in obj.elements():
+    element = getattr(obj, element_name, error)
+    if hasattr(element, "yang_name"):
+      yang_name = getattr(element, "yang_name", error)
+      element_id = yang_name()
+    else:
+      element_id = element_name
+    if hasattr(element, "get"):
+      d[element_id] = child_get(element, filter=filter)
+      if filter == True:
+        if isinstance(d[element_id], dict):
+          for entry in d[element_id]:
+            if hasattr(d[element_id][entry], "changed"):
+              if not d[element_id][entry].changed():
+                del d[element_id][entry]
+          if len(d[element_id]) == 0:
+            del d[element_id]
+        elif isinstance(d[element_id], list):
+          for list_entry in d[element_id]:
+            if hasattr(list_entry, "changed"):
+              if not list_entry.changed():
+                d[element_id].remove(list_entry)
+          if len(d[element_id]) == 0:
+            del d[element_id]
+    else:
+      if filter == False and not element.changed():
+        if not element._default == False and element._default:
+          d[element_id] = element._default
+        else:
+          d[element_id] = element
+      elif element.changed():
+        d[element_id] = element
+  return d
+
+def child_get(element, filter=False):
+  if hasattr(element, "elements"):
+    return introspective_get(element, filter=filter)
+  elif hasattr(element, "_members"):
+    d = {}
+    for k in element._members:
+      d[k] = introspective_get(element._members[k], filter=filter)
+    return d
+  return element.get(filter=filter)
+
+def populate(count):
+  from bgp_bindings import openconfig_bgp_juniper
+
+  bgp = openconfig_bgp_juniper()
+  bgp.juniper_config.bgp.global_.as_ = "2856"
+  groups = ["group%d" % i for i in range(0, 10)]
+  for group in groups:
+    bgp.juniper_config.bgp.peer_group.add(group)
+
+  for i in range(0, count):
+    group = bgp.juniper_config.bgp.peer_group[groups[i % len(groups)]]
+    neighbor = "10.%d.%d.%d" % ((i >> 16) & 255, (i >> 8) & 255, i & 255)
+    group.neighbor.add(neighbor)
+    group.neighbor[neighbor].peer_as = str(64512 + (i % 1000))
+  return bgp
+
+def main():
+  try:
+    opts, args = getopt.getopt(sys.argv[1:], "kn:", ["keepfiles", "neighbors="])
+  except getopt.GetoptError as e:
+    print str(e)
+    sys.exit(127)
+
+  k = False
+  count = 100000
+  for o, a in opts:
+    if o in ["-k", "--keepfiles"]:
+      k = True
+    elif o in ["-n", "--neighbors"]:
+      count = int(a)
+
+  pyangpath = os.environ.get('PYANGPATH') if os.environ.get('PYANGPATH') is not None else False
+  pyangbindpath = os.environ.get('PYANGBINDPATH') if os.environ.get('PYANGBINDPATH') is not None else False
+  assert not pyangpath == False, "could not find path to pyang"
+  assert not pyangbindpath == False, "could not resolve pyangbind directory"
+
+  this_dir = os.path.dirname(os.path.realpath(__file__))
+  yang_file = "%s/../%s/%s.yang" % (this_dir, TESTNAME, TESTNAME)
+  os.system("%s --plugindir %s -f pybind -o %s/bgp_bindings.py %s > /dev/null" %
+              (pyangpath, pyangbindpath, this_dir, yang_file))
+  sys.path.insert(0, this_dir)
+
+  bgp = populate(count)
+  for filter in [False, True]:
+    gc.collect()
+    start = time.time()
+    introspective = introspective_get(bgp, filter=filter)
+    introspective_time = time.time() - start
+
+    gc.collect()
+    start = time.time()
+    generated = bgp.get(filter=filter)
+    generated_time = time.time() - start
+
+    assert introspective == generated, "generated get() did not match " + \
+            "the introspective get() (filter=%s)" % filter
+    print "neighbors: %d, filter=%-5s introspective: %6.2fs  generated: %6.2fs" % \
+            (count, filter, introspective_time, generated_time)
+
+  if not k:
+    os.system("/bin/rm -f %s/bgp_bindings.py %s/bgp_bindings.pyc" % (this_dir, this_dir))
+
+if __name__ == '__main__':
+  main()
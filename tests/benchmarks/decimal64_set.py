@@ -0,0 +1,89 @@
+#!/usr/bin/env python
+"""
+  Benchmark: set, compare, sum and serialise a decimal64 leaf with
+  fraction-digits, in bindings generated with decimal.Decimal storage and
+  with --decimal64-fixed-point.
+
+  Usage: decimal64_set.py [-k] [-n writes]
+"""
+
+import os, sys, getopt, time
+
+MODULE = """
+module rates {
+  yang-version "1";
+  namespace "http://rob.sh/yang/test/benchmarks/rates";
+  prefix "rates";
+
+  container rates {
+    leaf rate {
+      type decimal64 {
+        fraction-digits 4;
+      }
+    }
+  }
+}
+"""
+
+def run(name, rates, writes):
+  values = ["%d.%04d" % (i // 10000, i % 10000) for i in xrange(0, writes)]
+  container = rates.rates
+
+  start = time.time()
+  for v in values:
+    container.rate = v
+  set_time = time.time() - start
+
+  start = time.time()
+  total = 0
+  for v in values:
+    container.rate = v
+    if container.rate > 1:
+      total = container.rate + total
+    str(container.rate)
+  use_time = time.time() - start
+
+  print "%-20s set: %6.2fs  set+compare+add+str: %6.2fs (%s)" % (name,
+            set_time, use_time, total)
+
+def main():
+  try:
+    opts, args = getopt.getopt(sys.argv[1:], "kn:", ["keepfiles", "writes="])
+  except getopt.GetoptError as e:
+    print str(e)
+    sys.exit(127)
+
+  k = False
+  writes = 200000
+  for o, a in opts:
+    if o in ["-k", "--keepfiles"]:
+      k = True
+    elif o in ["-n", "--writes"]:
+      writes = int(a)
+
+  pyangpath = os.environ.get('PYANGPATH') if os.environ.get('PYANGPATH') is not None else False
+  pyangbindpath = os.environ.get('PYANGBINDPATH') if os.environ.get('PYANGBINDPATH') is not None else False
+  assert not pyangpath == False, "could not find path to pyang"
+  assert not pyangbindpath == False, "could not resolve pyangbind directory"
+
+  this_dir = os.path.dirname(os.path.realpath(__file__))
+  f = open("%s/rates.yang" % this_dir, "w")
+  f.write(MODULE)
+  f.close()
+  os.system("%s --plugindir %s -f pybind -o %s/rates_bindings.py %s/rates.yang > /dev/null" %
+              (pyangpath, pyangbindpath, this_dir, this_dir))
+  os.system("%s --plugindir %s -f pybind -o %s/rates_fixed_bindings.py --decimal64-fixed-point %s/rates.yang > /dev/null" %
+              (pyangpath, pyangbindpath, this_dir, this_dir))
+  sys.path.insert(0, this_dir)
+  from rates_bindings import rates
+  from rates_fixed_bindings import rates as fixed_rates
+
+  run("decimal.Decimal", rates(), writes)
+  run("fixed-point", fixed_rates(), writes)
+
+  if not k:
+    os.system("/bin/rm -f %s/rates.yang %s/rates_bindings.py* %s/rates_fixed_bindings.py*" %
+                (this_dir, this_dir, this_dir))
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python
+"""
+  Benchmark: generate bindings for a module in which the same groupings are
+  used at a large number of places (in the style of the OpenConfig
+  config/state containers), with and without --deduplicate-classes, and
+  report the size of the generated file, the time taken to import it, and
+  the resident memory used once it is imported.
+
+  Usage: dedup_classes.py [-k] [-n uses]
+"""
+
+import os, sys, getopt, time, subprocess
+
+from benchutil import rss_kb
+
+def module(count):
+  leaves = "\n".join(["      leaf counter-%d { type uint64; }" % i for i in range(0, 10)])
+  uses = "\n".join(["""  container afi-safi-%d {
+    uses afi-safi-top;
+  }""" % i for i in range(0, count)])
+  return """
+module afi-safis {
+  yang-version "1";
+  namespace "http://rob.sh/yang/test/benchmarks/afi-safis";
+  prefix "afi";
+
+  grouping afi-safi-config {
+    leaf enabled { type boolean; }
+    leaf prefix-limit {
+      type uint32 {
+        range 1..1000000;
+      }
+    }
+    leaf description {
+      type string {
+        pattern "[a-zA-Z0-9 ]*";
+      }
+    }
+  }
+
+  grouping afi-safi-state {
+%s
+  }
+
+  grouping afi-safi-top {
+    container config {
+      uses afi-safi-config;
+    }
+    container state {
+      config false;
+      uses afi-safi-config;
+      uses afi-safi-state;
+    }
+  }
+
+%s
+}
+""" % (leaves, uses)
+
+def load(name):
+  rss_before = rss_kb()
+  start = time.time()
+  __import__(name)
+  elapsed = time.time() - start
+  print "%-32s import: %.2fs, rss delta: %d KB" % (name, elapsed, rss_kb() - rss_before)
+
+def main():
+  try:
+    opts, args = getopt.getopt(sys.argv[1:], "kn:i:", ["keepfiles", "uses=", "import="])
+  except getopt.GetoptError as e:
+    print str(e)
+    sys.exit(127)
+
+  k = False
+  count = 500
+  import_name = False
+  for o, a in opts:
+    if o in ["-k", "--keepfiles"]:
+      k = True
+    elif o in ["-n", "--uses"]:
+      count = int(a)
+    elif o in ["-i", "--import"]:
+      import_name = a
+
+  this_dir = os.path.dirname(os.path.realpath(__file__))
+  if import_name:
+    sys.path.insert(0, this_dir)
+    load(import_name)
+    return
+
+  pyangpath = os.environ.get('PYANGPATH') if os.environ.get('PYANGPATH') is not None else False
+  pyangbindpath = os.environ.get('PYANGBINDPATH') if os.environ.get('PYANGBINDPATH') is not None else False
+  assert not pyangpath == False, "could not find path to pyang"
+  assert not pyangbindpath == False, "could not resolve pyangbind directory"
+
+  f = open("%s/afi-safis.yang" % this_dir, "w")
+  f.write(module(count))
+  f.close()
+  for name, flags in [("afi_safis_bindings", ""),
+                      ("afi_safis_dedup_bindings", "--deduplicate-classes")]:
+    os.system("%s --plugindir %s -f pybind -o %s/%s.py %s %s/afi-safis.yang" %
+                (pyangpath, pyangbindpath, this_dir, name, flags, this_dir))
+    print "%-32s size: %d bytes" % (name, os.path.getsize("%s/%s.py" % (this_dir, name)))
+
+  # each set of bindings is imported (without a cached .pyc) in a separate
+  # interpreter.
+  for name in ["afi_safis_bindings", "afi_safis_dedup_bindings"]:
+    subprocess.call([sys.executable, "-B", os.path.realpath(__file__), "-i", name])
+
+  if not k:
+    os.system("/bin/rm -f %s/afi-safis.yang %s/afi_safis_bindings.py* %s/afi_safis_dedup_bindings.py*" %
+                (this_dir, this_dir, this_dir))
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+"""
+  Benchmark: set a leaf at depth 8 - within a list entry of a BGP-style
+  hierarchy of containers - a large number of times. Each write marks the
+  leaf's ancestors as changed.
+
+  Usage: deep_set.py [-k] [-n writes]
+"""
+
+import os, sys, getopt, time
+
+MODULE = """
+module deep-bgp {
+  yang-version "1";
+  namespace "http://rob.sh/yang/test/benchmarks/deep-bgp";
+  prefix "deep";
+
+  container network-instances {
+    container network-instance {
+      container protocols {
+        container bgp {
+          container neighbors {
+            list neighbor {
+              key "neighbor-address";
+              leaf neighbor-address {
+                type string;
+              }
+              container timers {
+                container config {
+                  leaf hold-time {
+                    type uint32;
+                  }
+                }
+              }
+            }
+          }
+        }
+      }
+    }
+  }
+}
+"""
+
+def main():
+  try:
+    opts, args = getopt.getopt(sys.argv[1:], "kn:", ["keepfiles", "writes="])
+  except getopt.GetoptError as e:
+    print str(e)
+    sys.exit(127)
+
+  k = False
+  writes = 1000000
+  for o, a in opts:
+    if o in ["-k", "--keepfiles"]:
+      k = True
+    elif o in ["-n", "--writes"]:
+      writes = int(a)
+
+  pyangpath = os.environ.get('PYANGPATH') if os.environ.get('PYANGPATH') is not None else False
+  pyangbindpath = os.environ.get('PYANGBINDPATH') if os.environ.get('PYANGBINDPATH') is not None else False
+  assert not pyangpath == False, "could not find path to pyang"
+  assert not pyangbindpath == False, "could not resolve pyangbind directory"
+
+  this_dir = os.path.dirname(os.path.realpath(__file__))
+  f = open("%s/deep-bgp.yang" % this_dir, "w")
+  f.write(MODULE)
+  f.close()
+  os.system("%s --plugindir %s -f pybind -o %s/deep_bindings.py %s/deep-bgp.yang > /dev/null" %
+              (pyangpath, pyangbindpath, this_dir, this_dir))
+  sys.path.insert(0, this_dir)
+  from deep_bindings import deep_bgp
+
+  d = deep_bgp()
+  neighbors = d.network_instances.network_instance.protocols.bgp.neighbors.neighbor
+  neighbors.add("192.0.2.1")
+  config = neighbors["192.0.2.1"].timers.config
+
+  start = time.time()
+  for i in xrange(0, writes):
+    config.hold_time = i
+  elapsed = time.time() - start
+  print "leaf writes at depth 8: %d, %.2fs (%.2f us/write)" % (writes, elapsed,
+            elapsed / writes * 1e6)
+
+  if not k:
+    os.system("/bin/rm -f %s/deep-bgp.yang %s/deep_bindings.py %s/deep_bindings.pyc" %
+                (this_dir, this_dir, this_dir))
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python
+"""
+  Benchmark: change 10 leaves of a tree of around 1M nodes - a list without
+  a key whose entries contain ten leaves - and serialise it using get(),
+  with and without filtering out unchanged nodes.
+
+  Usage: filtered_get.py [-k] [-n entries]
+"""
+
+import os, sys, getopt, time, gc
+
+MODULE = """
+module counters {
+  yang-version "1";
+  namespace "http://rob.sh/yang/test/benchmarks/counters";
+  prefix "counters";
+
+  container interfaces {
+    config false;
+    list interface {
+      leaf in-octets { type uint64; }
+      leaf in-pkts { type uint64; }
+      leaf in-errors { type uint32; }
+      leaf in-discards { type uint32; }
+      leaf out-octets { type uint64; }
+      leaf out-pkts { type uint64; }
+      leaf out-errors { type uint32; }
+      leaf out-discards { type uint32; }
+      container state {
+        leaf description { type string; }
+      }
+    }
+  }
+}
+"""
+
+def main():
+  try:
+    opts, args = getopt.getopt(sys.argv[1:], "kn:", ["keepfiles", "entries="])
+  except getopt.GetoptError as e:
+    print str(e)
+    sys.exit(127)
+
+  k = False
+  count = 100000
+  for o, a in opts:
+    if o in ["-k", "--keepfiles"]:
+      k = True
+    elif o in ["-n", "--entries"]:
+      count = int(a)
+
+  pyangpath = os.environ.get('PYANGPATH') if os.environ.get('PYANGPATH') is not None else False
+  pyangbindpath = os.environ.get('PYANGBINDPATH') if os.environ.get('PYANGBINDPATH') is not None else False
+  assert not pyangpath == False, "could not find path to pyang"
+  assert not pyangbindpath == False, "could not resolve pyangbind directory"
+
+  this_dir = os.path.dirname(os.path.realpath(__file__))
+  f = open("%s/counters.yang" % this_dir, "w")
+  f.write(MODULE)
+  f.close()
+  os.system("%s --plugindir %s -f pybind -o %s/counters_bindings.py %s/counters.yang > /dev/null" %
+              (pyangpath, pyangbindpath, this_dir, this_dir))
+  sys.path.insert(0, this_dir)
+  from counters_bindings import counters
+
+  c = counters()
+  interfaces = c.interfaces.interface
+  keys = interfaces.add_many([{} for i in xrange(0, count)])
+  for i in range(0, 10):
+    interfaces[keys[i * (count // 10)]]._set_in_errors(i + 1)
+
+  for filter in [False, True]:
+    gc.collect()
+    start = time.time()
+    d = c.get(filter=filter)
+    elapsed = time.time() - start
+    print "entries: %d (%d nodes), filter=%-5s get: %8.4fs, %d entries returned" % \
+            (count, count * 11, filter, elapsed, len(d["interfaces"]["interface"]))
+    del d
+
+  if not k:
+    os.system("/bin/rm -f %s/counters.yang %s/counters_bindings.py %s/counters_bindings.pyc" %
+                (this_dir, this_dir, this_dir))
+
+if __name__ == '__main__':
+  main()
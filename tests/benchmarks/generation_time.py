@@ -0,0 +1,118 @@
+#!/usr/bin/env python
+"""
+  Benchmark: generate bindings for a synthetic module with a large number of
+  typedefs - some of which are derived from other typedefs, or specify a
+  default - a hierarchy of identities, and leaves which use them, and report
+  the time taken by pyang to generate them.
+
+  Usage: generation_time.py [-k] [-t typedefs] [-l leaves] [-i identities]
+"""
+
+import os, sys, getopt, time
+
+def module(typedefs, leaves, identities):
+  defs = []
+  # identities are defined before their bases, each identity having the
+  # one with half its index as its base.
+  for i in range(identities - 1, -1, -1):
+    if i == 0:
+      defs.append("""  identity identity-0;""")
+    else:
+      defs.append("""  identity identity-%d {
+    base identity-%d;
+  }""" % (i, i // 2))
+  for i in range(0, typedefs):
+    if i % 10 == 0:
+      defs.append("""  typedef type-%d {
+    type uint32 {
+      range 0..%d;
+    }
+    default 0;
+  }""" % (i, 1000 + i))
+    else:
+      # derive from the preceding typedef
+      defs.append("""  typedef type-%d {
+    type type-%d;
+  }""" % (i, i - 1))
+
+  if identities:
+    # identityref typedefs, which are defined before the identities that
+    # they use as their base.
+    for i in range(0, min(identities // 2, 100)):
+      defs.insert(0, """  typedef identity-type-%d {
+    type identityref {
+      base identity-%d;
+    }
+  }""" % (i, i))
+
+  containers = []
+  per_container = 100
+  for c in range(0, leaves // per_container):
+    containers.append("""  container container-%d {
+%s
+  }""" % (c, "\n".join(["""    leaf leaf-%d {
+      type type-%d;
+    }""" % (j, (c * per_container + j) % typedefs) for j in range(0, per_container)])))
+  if identities:
+    containers.append("""  container identities {
+%s
+  }""" % "\n".join(["""    leaf leaf-%d {
+      type identity-type-%d;
+    }""" % (i, i) for i in range(0, min(identities // 2, 100))]))
+
+  return """
+module generation {
+  yang-version "1";
+  namespace "http://rob.sh/yang/test/benchmarks/generation";
+  prefix "gen";
+
+%s
+
+%s
+}
+""" % ("\n".join(defs), "\n".join(containers))
+
+def main():
+  try:
+    opts, args = getopt.getopt(sys.argv[1:], "kt:l:i:", ["keepfiles", "typedefs=",
+                                                          "leaves=", "identities="])
+  except getopt.GetoptError as e:
+    print str(e)
+    sys.exit(127)
+
+  k = False
+  typedefs = 5000
+  leaves = 50000
+  identities = 5000
+  for o, a in opts:
+    if o in ["-k", "--keepfiles"]:
+      k = True
+    elif o in ["-t", "--typedefs"]:
+      typedefs = int(a)
+    elif o in ["-l", "--leaves"]:
+      leaves = int(a)
+    elif o in ["-i", "--identities"]:
+      identities = int(a)
+
+  pyangpath = os.environ.get('PYANGPATH') if os.environ.get('PYANGPATH') is not None else False
+  pyangbindpath = os.environ.get('PYANGBINDPATH') if os.environ.get('PYANGBINDPATH') is not None else False
+  assert not pyangpath == False, "could not find path to pyang"
+  assert not pyangbindpath == False, "could not resolve pyangbind directory"
+
+  this_dir = os.path.dirname(os.path.realpath(__file__))
+  f = open("%s/generation.yang" % this_dir, "w")
+  f.write(module(typedefs, leaves, identities))
+  f.close()
+
+  start = time.time()
+  os.system("%s --plugindir %s -f pybind -o %s/generation_bindings.py %s/generation.yang > /dev/null" %
+              (pyangpath, pyangbindpath, this_dir, this_dir))
+  elapsed = time.time() - start
+  print "typedefs: %d, leaves: %d, identities: %d, generation: %.2fs" % \
+            (typedefs, leaves, identities, elapsed)
+
+  if not k:
+    os.system("/bin/rm -f %s/generation.yang %s/generation_bindings.py" % (this_dir, this_dir))
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,58 @@
+#!/usr/bin/env python
+"""
+  Benchmark: add entries to a list without a key, keyed either by a counter
+  (the default) or by a uuid (uuid_keys=True). Each mode is run in a
+  separate interpreter, and the time taken and the resident memory used are
+  reported.
+
+  Usage: keyless_list.py [-n entries]
+"""
+
+import os, sys, getopt, time, gc, subprocess
+
+from benchutil import rss_kb
+
+class entry(object):
+  pass
+
+def run(count, uuid_keys):
+  from lib.yangtypes import YANGListType, YANGDynClass
+
+  keyless = YANGDynClass(base=YANGListType(False, entry, yang_name="keyless",
+                is_container=True, uuid_keys=uuid_keys), yang_name="keyless")
+  gc.collect()
+  before = rss_kb()
+  start = time.time()
+  for i in xrange(0, count):
+    keyless.add()
+  elapsed = time.time() - start
+  gc.collect()
+  print "%-15s %d entries: %6.2fs, %d KB" % ("uuid keys" if uuid_keys else
+            "counter keys", count, elapsed, rss_kb() - before)
+
+def main():
+  try:
+    opts, args = getopt.getopt(sys.argv[1:], "n:m:", ["entries=", "mode="])
+  except getopt.GetoptError as e:
+    print str(e)
+    sys.exit(127)
+
+  count = 1000000
+  mode = False
+  for o, a in opts:
+    if o in ["-n", "--entries"]:
+      count = int(a)
+    elif o in ["-m", "--mode"]:
+      mode = a
+
+  sys.path.insert(0, os.path.dirname(os.path.realpath(__file__)))
+  if mode:
+    run(count, mode == "uuid")
+    return
+
+  for mode in ["uuid", "counter"]:
+    subprocess.call([sys.executable, os.path.realpath(__file__), "-n",
+                      str(count), "-m", mode])
+
+if __name__ == '__main__':
+  main()
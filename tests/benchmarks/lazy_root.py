@@ -0,0 +1,81 @@
+#!/usr/bin/env python
+"""
+  Benchmark: create empty instances of the root of the openconfig-bgp-juniper
+  model, from bindings generated with and without --lazy-children, and
+  report the time taken and the resident memory used per instance.
+
+  Usage: lazy_root.py [-k] [-n instances]
+"""
+
+import os, sys, getopt, gc, time, subprocess
+
+from benchutil import rss_kb
+
+TESTNAME = "openconfig-bgp-juniper"
+
+def create(module, count):
+  root = getattr(__import__(module), "openconfig_bgp_juniper")
+
+  gc.collect()
+  rss_before = rss_kb()
+  start = time.time()
+  instances = [root() for i in xrange(0, count)]
+  elapsed = time.time() - start
+  gc.collect()
+  rss = rss_kb() - rss_before
+
+  start = time.time()
+  for instance in instances[:1000]:
+    instance.get()
+  get_time = time.time() - start
+
+  print "%-20s instances: %d, create: %.2fs (%.1f us each), %.2f KB each, " \
+        "get() of 1000 empty instances: %.2fs" % (module, count, elapsed,
+          elapsed / count * 1e6, float(rss) / count, get_time)
+
+def main():
+  try:
+    opts, args = getopt.getopt(sys.argv[1:], "kn:m:", ["keepfiles", "instances=",
+                                                        "module="])
+  except getopt.GetoptError as e:
+    print str(e)
+    sys.exit(127)
+
+  k = False
+  count = 10000
+  module = False
+  for o, a in opts:
+    if o in ["-k", "--keepfiles"]:
+      k = True
+    elif o in ["-n", "--instances"]:
+      count = int(a)
+    elif o in ["-m", "--module"]:
+      module = a
+
+  this_dir = os.path.dirname(os.path.realpath(__file__))
+  if module:
+    sys.path.insert(0, this_dir)
+    create(module, count)
+    return
+
+  pyangpath = os.environ.get('PYANGPATH') if os.environ.get('PYANGPATH') is not None else False
+  pyangbindpath = os.environ.get('PYANGBINDPATH') if os.environ.get('PYANGBINDPATH') is not None else False
+  assert not pyangpath == False, "could not find path to pyang"
+  assert not pyangbindpath == False, "could not resolve pyangbind directory"
+
+  yang_file = "%s/../%s/%s.yang" % (this_dir, TESTNAME, TESTNAME)
+  os.system("%s --plugindir %s -f pybind -o %s/bgp_bindings.py %s > /dev/null" %
+              (pyangpath, pyangbindpath, this_dir, yang_file))
+  os.system("%s --plugindir %s -f pybind -o %s/bgp_lazy_bindings.py --lazy-children %s > /dev/null" %
+              (pyangpath, pyangbindpath, this_dir, yang_file))
+
+  # each set of bindings is measured in a separate interpreter
+  for module in ["bgp_bindings", "bgp_lazy_bindings"]:
+    subprocess.call([sys.executable, os.path.realpath(__file__), "-n", str(count),
+                      "-m", module])
+
+  if not k:
+    os.system("/bin/rm -f %s/bgp_bindings.py* %s/bgp_lazy_bindings.py*" % (this_dir, this_dir))
+
+if __name__ == '__main__':
+  main()
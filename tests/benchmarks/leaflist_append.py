@@ -0,0 +1,87 @@
+#!/usr/bin/env python
+"""
+  Benchmark: add elements to leaf-lists of restricted strings and of
+  integers, one at a time with append() and in bulk with extend(). The
+  memory used by a leaf-list of uint32 is reported with and without
+  compact (array-backed) storage.
+
+  Usage: leaflist_append.py [-n elements]
+"""
+
+import os, sys, getopt, time, gc, subprocess
+
+from benchutil import rss_kb
+
+def run(name, allowed_type, values, compact=False):
+  from lib.yangtypes import TypedListType, YANGDynClass
+
+  leaflist = YANGDynClass(base=TypedListType(allowed_type=allowed_type,
+                            compact=compact), yang_name="leaflist")
+  start = time.time()
+  for v in values:
+    leaflist.append(v)
+  append_time = time.time() - start
+
+  leaflist = YANGDynClass(base=TypedListType(allowed_type=allowed_type,
+                            compact=compact), yang_name="leaflist")
+  start = time.time()
+  leaflist.extend(values)
+  extend_time = time.time() - start
+
+  print "%-30s append: %6.2fs  extend: %6.2fs" % (name, append_time, extend_time)
+
+def memory(name, compact, count):
+  import numpy as np
+  from lib.yangtypes import TypedListType, YANGDynClass
+
+  gc.collect()
+  before = rss_kb()
+  leaflist = YANGDynClass(base=TypedListType(allowed_type=np.uint32,
+                            compact=compact), yang_name="leaflist")
+  for i in xrange(0, count):
+    leaflist.append(np.uint32(i))
+  gc.collect()
+  print "%-30s %d elements: %d KB" % (name, count, rss_kb() - before)
+  return leaflist
+
+def main():
+  try:
+    opts, args = getopt.getopt(sys.argv[1:], "n:m:", ["elements=", "memory="])
+  except getopt.GetoptError as e:
+    print str(e)
+    sys.exit(127)
+
+  count = 100000
+  memory_mode = False
+  for o, a in opts:
+    if o in ["-n", "--elements"]:
+      count = int(a)
+    elif o in ["-m", "--memory"]:
+      memory_mode = a
+
+  sys.path.insert(0, os.path.dirname(os.path.realpath(__file__)))
+  if memory_mode:
+    compact = memory_mode == "compact"
+    memory("uint32 memory%s" % (", compact" if compact else ""), compact, count)
+    return
+
+  import numpy as np
+  from lib.yangtypes import RestrictedClassType
+
+  community = RestrictedClassType(base_type=str, restriction_type="pattern",
+                                    restriction_arg="[0-9]+:[0-9]+")
+  run("restricted string", community,
+        ["%d:%d" % (65000, i) for i in range(0, count)])
+  run("union of uint32 and string", [np.uint32, str],
+        [i for i in range(0, count)])
+  run("uint32", np.uint32, [i for i in range(0, count)])
+  run("uint32, compact", np.uint32, [i for i in range(0, count)],
+        compact=True)
+
+  # memory is measured in a separate interpreter for each storage mode
+  for mode in ["list", "compact"]:
+    subprocess.call([sys.executable, os.path.realpath(__file__), "-n",
+                      str(count), "-m", mode])
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,62 @@
+#!/usr/bin/env python
+"""
+  Benchmark: set a leafref (with require-instance) that refers to the keys
+  of a list with a large number of entries, a large number of times - as
+  is the case where many policy references point at the same prefix-sets.
+
+  Usage: leafref_set.py [-k] [-e entries] [-n sets]
+"""
+
+import os, sys, getopt, time
+
+TESTNAME = "list-tc01"
+
+def main():
+  try:
+    opts, args = getopt.getopt(sys.argv[1:], "ke:n:", ["keepfiles", "entries=",
+                                                        "sets="])
+  except getopt.GetoptError as e:
+    print str(e)
+    sys.exit(127)
+
+  k = False
+  entries = 5000
+  sets = 10000
+  for o, a in opts:
+    if o in ["-k", "--keepfiles"]:
+      k = True
+    elif o in ["-e", "--entries"]:
+      entries = int(a)
+    elif o in ["-n", "--sets"]:
+      sets = int(a)
+
+  pyangpath = os.environ.get('PYANGPATH') if os.environ.get('PYANGPATH') is not None else False
+  pyangbindpath = os.environ.get('PYANGBINDPATH') if os.environ.get('PYANGBINDPATH') is not None else False
+  assert not pyangpath == False, "could not find path to pyang"
+  assert not pyangbindpath == False, "could not resolve pyangbind directory"
+
+  this_dir = os.path.dirname(os.path.realpath(__file__))
+  yang_file = "%s/../xpath/01-list_leaflist/%s.yang" % (this_dir, TESTNAME)
+  os.system("%s --plugindir %s -f pybind -o %s/leafref_bindings.py --use-xpathhelper %s > /dev/null 2>&1" %
+              (pyangpath, pyangbindpath, this_dir, yang_file))
+  sys.path.insert(0, this_dir)
+  from lib.xpathhelper import YANGPathHelper
+  from leafref_bindings import list_tc01
+
+  helper = YANGPathHelper()
+  obj = list_tc01(path_helper=helper)
+  keys = ["prefix-set-%d" % i for i in range(0, entries)]
+  obj.container.t2.add_many(keys)
+
+  start = time.time()
+  for i in xrange(0, sets):
+    obj.reference.t2_ptr = keys[(i * 7919) % entries]
+  elapsed = time.time() - start
+  print "leafref sets against %d list keys: %d, %.2fs (%.1f us/set)" % \
+          (entries, sets, elapsed, elapsed / sets * 1e6)
+
+  if not k:
+    os.system("/bin/rm -f %s/leafref_bindings.py %s/leafref_bindings.pyc" % (this_dir, this_dir))
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python
+"""
+  Benchmark: add neighbors to a peer-group of the openconfig-bgp-juniper
+  model, one at a time with add() and in a single call to add_many().
+
+  Usage: list_add_many.py [-k] [-n neighbors]
+"""
+
+import os, sys, getopt, time, gc
+
+TESTNAME = "openconfig-bgp-juniper"
+
+def neighbors(count):
+  return ["10.%d.%d.%d" % ((i >> 16) & 255, (i >> 8) & 255, i & 255)
+            for i in range(0, count)]
+
+def main():
+  try:
+    opts, args = getopt.getopt(sys.argv[1:], "kn:", ["keepfiles", "neighbors="])
+  except getopt.GetoptError as e:
+    print str(e)
+    sys.exit(127)
+
+  k = False
+  count = 100000
+  for o, a in opts:
+    if o in ["-k", "--keepfiles"]:
+      k = True
+    elif o in ["-n", "--neighbors"]:
+      count = int(a)
+
+  pyangpath = os.environ.get('PYANGPATH') if os.environ.get('PYANGPATH') is not None else False
+  pyangbindpath = os.environ.get('PYANGBINDPATH') if os.environ.get('PYANGBINDPATH') is not None else False
+  assert not pyangpath == False, "could not find path to pyang"
+  assert not pyangbindpath == False, "could not resolve pyangbind directory"
+
+  this_dir = os.path.dirname(os.path.realpath(__file__))
+  yang_file = "%s/../%s/%s.yang" % (this_dir, TESTNAME, TESTNAME)
+  os.system("%s --plugindir %s -f pybind -o %s/bgp_bindings.py %s > /dev/null" %
+              (pyangpath, pyangbindpath, this_dir, yang_file))
+  sys.path.insert(0, this_dir)
+  from bgp_bindings import openconfig_bgp_juniper
+
+  keys = neighbors(count)
+
+  bgp = openconfig_bgp_juniper()
+  bgp.juniper_config.bgp.peer_group.add("group")
+  group = bgp.juniper_config.bgp.peer_group["group"]
+  start = time.time()
+  for key in keys:
+    group.neighbor.add(key)
+  add_time = time.time() - start
+
+  del bgp, group
+  gc.collect()
+  bgp = openconfig_bgp_juniper()
+  bgp.juniper_config.bgp.peer_group.add("group")
+  group = bgp.juniper_config.bgp.peer_group["group"]
+  start = time.time()
+  group.neighbor.add_many(keys)
+  add_many_time = time.time() - start
+
+  print "neighbors: %d, add(): %.2fs, add_many(): %.2fs" % (count, add_time,
+            add_many_time)
+
+  if not k:
+    os.system("/bin/rm -f %s/bgp_bindings.py %s/bgp_bindings.pyc" % (this_dir, this_dir))
+
+if __name__ == '__main__':
+  main()
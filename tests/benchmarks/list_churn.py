@@ -0,0 +1,137 @@
+#!/usr/bin/env python
+"""
+  Benchmark: repeatedly add a large number of entries - each with a number
+  of leaves, and a container - to a list, with bindings generated with
+  --use-xpathhelper, and delete them again, reporting the number of objects
+  registered with the YANGPathHelper and the resident set size of the
+  process after each cycle. Checks that no objects remain registered after
+  each cycle, and that the memory used does not grow once the first cycle -
+  which leaves the allocator holding memory for the entries - has completed.
+  The etree backend goes through the same cycles with a smaller list (-e),
+  as each entry that is added there costs time proportional to the number
+  of entries that the list already holds.
+
+  Usage: list_churn.py [-k] [-n entries] [-e etree-entries] [-c cycles]
+"""
+
+import os, sys, getopt, time, gc
+
+from benchutil import rss_kb
+
+MODULE = """
+module churn {
+  yang-version "1";
+  namespace "http://rob.sh/yang/test/benchmarks/churn";
+  prefix "churn";
+
+  container churn {
+    list entry {
+      key "id";
+
+      leaf id {
+        type uint32;
+      }
+
+      leaf name {
+        type string;
+      }
+
+      leaf value {
+        type uint32;
+      }
+
+      container state {
+        leaf counter {
+          type uint64;
+        }
+
+        leaf enabled {
+          type boolean;
+        }
+      }
+    }
+  }
+}
+"""
+
+# the growth in the resident set size that is tolerated, as a proportion of
+# its size after the second cycle, to allow for fragmentation of the heap.
+RSS_TOLERANCE = 0.1
+
+def run(backend, entries, cycles):
+  from lib.xpathhelper import YANGPathHelper
+  from churn_bindings import churn
+
+  helper = YANGPathHelper(backend=backend)
+  instance = churn(path_helper=helper)
+  entry = instance.churn.entry
+  keys = range(0, entries)
+  baseline = helper.registered_count()
+
+  results = []
+  for c in range(0, cycles):
+    start = time.time()
+    entry.add_many(keys)
+    added = helper.registered_count()
+    for k in keys:
+      entry.delete(k)
+    elapsed = time.time() - start
+    gc.collect()
+    results.append((helper.registered_count(), rss_kb()))
+    print "%s: cycle %d, %d entries (%d objects), %.2fs, registered: %d, rss: %.1fMB" % \
+            (backend, c, entries, added - baseline, elapsed, results[-1][0],
+              results[-1][1] / 1024.0)
+
+  for registered, size in results:
+    assert registered == baseline, \
+      "%s: %d objects remain registered" % (backend, registered - baseline)
+  for registered, size in results[2:]:
+    assert size <= results[1][1] * (1 + RSS_TOLERANCE), \
+      "%s: memory grew from %.1fMB to %.1fMB" % \
+        (backend, results[1][1] / 1024.0, size / 1024.0)
+
+def main():
+  try:
+    opts, args = getopt.getopt(sys.argv[1:], "kn:e:c:", ["keepfiles", "entries=",
+                                                          "etree-entries=", "cycles="])
+  except getopt.GetoptError as e:
+    print str(e)
+    sys.exit(127)
+
+  k = False
+  entries = 100000
+  etree_entries = 2000
+  cycles = 5
+  for o, a in opts:
+    if o in ["-k", "--keepfiles"]:
+      k = True
+    elif o in ["-n", "--entries"]:
+      entries = int(a)
+    elif o in ["-e", "--etree-entries"]:
+      etree_entries = int(a)
+    elif o in ["-c", "--cycles"]:
+      cycles = int(a)
+
+  pyangpath = os.environ.get('PYANGPATH') if os.environ.get('PYANGPATH') is not None else False
+  pyangbindpath = os.environ.get('PYANGBINDPATH') if os.environ.get('PYANGBINDPATH') is not None else False
+  assert not pyangpath == False, "could not find path to pyang"
+  assert not pyangbindpath == False, "could not resolve pyangbind directory"
+
+  this_dir = os.path.dirname(os.path.realpath(__file__))
+  f = open("%s/churn.yang" % this_dir, "w")
+  f.write(MODULE)
+  f.close()
+  os.system("%s --plugindir %s -f pybind -o %s/churn_bindings.py --use-xpathhelper %s/churn.yang > /dev/null" %
+              (pyangpath, pyangbindpath, this_dir, this_dir))
+  sys.path.insert(0, this_dir)
+
+  try:
+    run("native", entries, cycles)
+    run("etree", etree_entries, cycles)
+  finally:
+    if not k:
+      os.system("/bin/rm -f %s/churn.yang %s/churn_bindings.py %s/churn_bindings.pyc" %
+                  (this_dir, this_dir, this_dir))
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+"""
+  Benchmark: add a large number of neighbors to the openconfig-bgp-juniper
+  model, with bindings generated with --use-xpathhelper and an instance
+  that registers its nodes with a YANGPathHelper, using add() and
+  add_many(). Each neighbor registers a number of containers and leaves.
+
+  Usage: list_register.py [-k] [-n neighbors]
+"""
+
+import os, sys, getopt, time
+
+TESTNAME = "openconfig-bgp-juniper"
+
+def neighbors(count, group):
+  return ["10.%d.%d.%d" % (group, (i >> 8) & 255, i & 255) for i in range(0, count)]
+
+def main():
+  try:
+    opts, args = getopt.getopt(sys.argv[1:], "kn:", ["keepfiles", "neighbors="])
+  except getopt.GetoptError as e:
+    print str(e)
+    sys.exit(127)
+
+  k = False
+  count = 2000
+  for o, a in opts:
+    if o in ["-k", "--keepfiles"]:
+      k = True
+    elif o in ["-n", "--neighbors"]:
+      count = int(a)
+
+  pyangpath = os.environ.get('PYANGPATH') if os.environ.get('PYANGPATH') is not None else False
+  pyangbindpath = os.environ.get('PYANGBINDPATH') if os.environ.get('PYANGBINDPATH') is not None else False
+  assert not pyangpath == False, "could not find path to pyang"
+  assert not pyangbindpath == False, "could not resolve pyangbind directory"
+
+  this_dir = os.path.dirname(os.path.realpath(__file__))
+  yang_dir = "%s/../%s" % (this_dir, TESTNAME)
+  os.system("%s --plugindir %s -f pybind -p %s -o %s/register_bindings.py --use-xpathhelper %s/%s.yang > /dev/null 2>&1" %
+              (pyangpath, pyangbindpath, yang_dir, this_dir, yang_dir, TESTNAME))
+  sys.path.insert(0, this_dir)
+  from lib.xpathhelper import YANGPathHelper
+  from register_bindings import openconfig_bgp_juniper
+
+  helper = YANGPathHelper()
+  bgp = openconfig_bgp_juniper(path_helper=helper)
+  bgp.juniper_config.bgp.peer_group.add("add")
+  bgp.juniper_config.bgp.peer_group.add("add_many")
+
+  start = time.time()
+  group = bgp.juniper_config.bgp.peer_group["add"]
+  for neighbor in neighbors(count, 1):
+    group.neighbor.add(neighbor)
+  add = time.time() - start
+
+  start = time.time()
+  bgp.juniper_config.bgp.peer_group["add_many"].neighbor.add_many(neighbors(count, 2))
+  add_many = time.time() - start
+
+  print "neighbors: %d, add(): %.2fs (%.0f us/entry), add_many(): %.2fs (%.0f us/entry)" % \
+          (count, add, add / count * 1e6, add_many, add_many / count * 1e6)
+
+  if not k:
+    os.system("/bin/rm -f %s/register_bindings.py %s/register_bindings.pyc" % (this_dir, this_dir))
+
+if __name__ == '__main__':
+  main()
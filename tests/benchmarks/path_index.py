@@ -0,0 +1,72 @@
+#!/usr/bin/env python
+"""
+  Benchmark: register a large number of nodes - the entries of a list, each
+  with a number of leaves - with a YANGPathHelper, and look up the leaves of
+  entries by their key, reporting the throughput of the native path index
+  and of the etree backend. Registering all of the nodes with the etree
+  backend takes time quadratic in their number, since each is compared
+  against its siblings, so it is given its own, smaller, node count (-e).
+
+  Usage: path_index.py [-n nodes] [-e etree-nodes] [-l lookups]
+"""
+
+import os, sys, getopt, time
+
+LEAVES = 9
+
+def run(backend, nodes, lookups):
+  from lib.xpathhelper import YANGPathHelper
+  helper = YANGPathHelper(backend=backend)
+  entries = nodes // (LEAVES + 1)
+
+  start = time.time()
+  helper.register("/bench", object())
+  for i in xrange(0, entries):
+    entry_path = "/bench/entry[id=%d]" % i
+    helper.register(entry_path, object())
+    for j in xrange(0, LEAVES):
+      helper.register("%s/leaf-%d" % (entry_path, j), object())
+  register = time.time() - start
+
+  # the paths are distinct, such that they are resolved by the index
+  # rather than the cache of resolved paths.
+  paths = ["/bench/entry[id=%d]/leaf-%d" % ((i * 7919) % entries, i % LEAVES)
+              for i in xrange(0, lookups)]
+  start = time.time()
+  for path in paths:
+    assert len(helper.get(path)) == 1
+  lookup = time.time() - start
+
+  registered = entries * (LEAVES + 1) + 1
+  print "%s: %d nodes, register: %.2fs (%.0f nodes/s), lookup: %d in %.2fs (%.0f lookups/s)" % \
+          (backend, registered, register, registered / register, lookups, lookup,
+            lookups / lookup)
+
+def main():
+  try:
+    opts, args = getopt.getopt(sys.argv[1:], "n:e:l:", ["nodes=", "etree-nodes=",
+                                                          "lookups="])
+  except getopt.GetoptError as e:
+    print str(e)
+    sys.exit(127)
+
+  nodes = 1000000
+  etree_nodes = 20000
+  lookups = 10000
+  for o, a in opts:
+    if o in ["-n", "--nodes"]:
+      nodes = int(a)
+    elif o in ["-e", "--etree-nodes"]:
+      etree_nodes = int(a)
+    elif o in ["-l", "--lookups"]:
+      lookups = int(a)
+
+  this_dir = os.path.dirname(os.path.realpath(__file__))
+  sys.path.insert(0, this_dir)
+
+  run("native", etree_nodes, lookups)
+  run("etree", etree_nodes, lookups)
+  run("native", nodes, lookups)
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python
+"""
+  Benchmark: register a large number of nodes - groups of list entries,
+  each with a number of leaves - with a YANGPathHelper, and report the
+  memory used by the path helper for each backend. Each backend is run in
+  a separate process, and its memory use is measured as the growth in the
+  resident set size of the process (as reported by /proc).
+
+  Usage: path_memory.py [-n nodes] [-b backend]
+"""
+
+import os, sys, getopt, time, gc
+
+from benchutil import rss_kb
+
+GROUPS = 100
+LEAVES = 9
+
+def run(backend, nodes):
+  from lib.xpathhelper import YANGPathHelper
+  entries = nodes // (GROUPS * (LEAVES + 1))
+  # the objects are shared, such that only the memory used by the path
+  # helper is measured.
+  obj = object()
+  leaves = [("leaf-%d" % j, obj) for j in range(0, LEAVES)]
+
+  gc.collect()
+  before = rss_kb()
+  start = time.time()
+  helper = YANGPathHelper(backend=backend)
+  helper.register("/bench", obj)
+  for g in xrange(0, GROUPS):
+    group_path = "/bench/group[id=%d]" % g
+    helper.register(group_path, obj)
+    for i in xrange(0, entries):
+      helper.register_subtree("%s/entry[id=%d]" % (group_path, i), [("", obj)] + leaves)
+  elapsed = time.time() - start
+  gc.collect()
+  used = (rss_kb() - before) * 1024
+
+  registered = 1 + GROUPS * (1 + entries * (LEAVES + 1))
+  print "%s: %d nodes, register: %.2fs, memory: %.1fMB (%.0f bytes/node)" % \
+          (backend, registered, elapsed, used / 1048576.0, float(used) / registered)
+
+def main():
+  try:
+    opts, args = getopt.getopt(sys.argv[1:], "n:b:", ["nodes=", "backend="])
+  except getopt.GetoptError as e:
+    print str(e)
+    sys.exit(127)
+
+  nodes = 500000
+  backend = None
+  for o, a in opts:
+    if o in ["-n", "--nodes"]:
+      nodes = int(a)
+    elif o in ["-b", "--backend"]:
+      backend = a
+
+  this_dir = os.path.dirname(os.path.realpath(__file__))
+  sys.path.insert(0, this_dir)
+
+  if backend is not None:
+    run(backend, nodes)
+  else:
+    for backend in ["native", "etree"]:
+      os.system("%s %s -n %d -b %s" % (sys.executable, os.path.realpath(__file__),
+                                        nodes, backend))
+
+if __name__ == '__main__':
+  main()
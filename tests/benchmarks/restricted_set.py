@@ -0,0 +1,86 @@
+#!/usr/bin/env python
+"""
+  Microbenchmark: set restricted leaves in a tight loop, building the
+  restricted type and wrapping the value in a YANGDynClass, and using a
+  YANGDynClassFactory as the setter methods of generated classes do.
+
+  Usage: restricted_set.py [-n iterations]
+"""
+
+import os, sys, getopt, timeit
+
+SETUP = """
+import numpy as np
+from lib.yangtypes import RestrictedClassType, YANGDynClass, YANGDynClassFactory
+enum_arg = {'one': {'value': 1}, 'two': {}, 'three': {}}
+prebuilt = RestrictedClassType(base_type=str, restriction_type="pattern",
+                                restriction_arg="^[a-z]+$")
+ipv4 = RestrictedClassType(base_type=str, restriction_type="pattern",
+          restriction_arg="[0-9]{1,3}\\.[0-9]{1,3}\\.[0-9]{1,3}\\.[0-9]{1,3}")
+ipv6 = RestrictedClassType(base_type=str, restriction_type="pattern",
+          restriction_arg="[0-9a-fA-F:\\.]+")
+vlans = RestrictedClassType(base_type=np.uint16, restriction_type="range",
+          restriction_arg=" | ".join(["%d..%d" % (i, i+3) for i in range(1, 4000, 8)]))
+pattern_factory = YANGDynClassFactory(base=RestrictedClassType(base_type=str,
+                    restriction_type="pattern", restriction_arg="^[a-z]+$"),
+                    is_leaf=True, yang_name="leaf")
+enum_factory = YANGDynClassFactory(base=RestrictedClassType(base_type=str,
+                    restriction_type="dict_key", restriction_arg=enum_arg),
+                    is_leaf=True, yang_name="leaf")
+union_factory = YANGDynClassFactory(base=[np.uint32,str,], is_leaf=True,
+                    yang_name="leaf")
+"""
+
+CASES = [
+  ("pattern, type built per set",
+    """YANGDynClass("abcdef", base=RestrictedClassType(base_type=str, """
+    """restriction_type="pattern", restriction_arg="^[a-z]+$"), """
+    """is_leaf=True, yang_name="leaf")"""),
+  ("range, type built per set",
+    """YANGDynClass(42, base=RestrictedClassType(base_type=np.uint16, """
+    """restriction_type="range", restriction_arg="1..1000"), """
+    """is_leaf=True, yang_name="leaf")"""),
+  ("enumeration, type built per set",
+    """YANGDynClass("two", base=RestrictedClassType(base_type=str, """
+    """restriction_type="dict_key", restriction_arg=enum_arg), """
+    """is_leaf=True, yang_name="leaf")"""),
+  ("pattern, factory",
+    """pattern_factory("abcdef", parent=False, path_helper=False)"""),
+  ("enumeration, factory",
+    """enum_factory("two", parent=False, path_helper=False)"""),
+  ("pattern, prebuilt type",
+    """prebuilt("abcdef")"""),
+  ("range of 500 intervals, prebuilt type",
+    """vlans(3210)"""),
+  ("union ip-address, v6 value",
+    """YANGDynClass("2001:db8::1", base=[ipv4,ipv6,], is_leaf=True, """
+    """yang_name="leaf")"""),
+  ("union as-number|string, string value",
+    """YANGDynClass("AS65000", base=[np.uint32,str,], is_leaf=True, """
+    """yang_name="leaf")"""),
+  ("union as-number|string, int value",
+    """YANGDynClass(65000, base=[np.uint32,str,], is_leaf=True, """
+    """yang_name="leaf")"""),
+  ("union as-number|string, int value, factory",
+    """union_factory(65000, parent=False, path_helper=False)"""),
+]
+
+def main():
+  try:
+    opts, args = getopt.getopt(sys.argv[1:], "n:", ["iterations="])
+  except getopt.GetoptError as e:
+    print str(e)
+    sys.exit(127)
+
+  iterations = 100000
+  for o, a in opts:
+    if o in ["-n", "--iterations"]:
+      iterations = int(a)
+
+  sys.path.insert(0, os.path.dirname(os.path.realpath(__file__)))
+  for name, stmt in CASES:
+    elapsed = min(timeit.repeat(stmt, setup=SETUP, repeat=3, number=iterations))
+    print "%-35s %8.2f us/set" % (name, elapsed / iterations * 1e6)
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python
+"""
+  Benchmark: generate bindings for a module with a large number of top-level
+  containers as a single module, and as a package using --split-class-dir,
+  and report the time taken and the resident memory used to import them,
+  create the root, and set a leaf in one container or in every container.
+
+  Usage: split_package.py [-k] [-n containers]
+"""
+
+import os, sys, getopt, time, subprocess
+
+from benchutil import rss_kb
+
+def module(count):
+  leaves = "\n".join(["""      leaf value-%d {
+        type uint32 {
+          range 0..%d;
+        }
+      }""" % (i, 1000 + i) for i in range(0, 20)])
+  containers = "\n".join(["""  container subsystem-%d {
+    container config {
+%s
+    }
+    container state {
+      config false;
+%s
+    }
+  }""" % (i, leaves, leaves) for i in range(0, count)])
+  return """
+module subsystems {
+  yang-version "1";
+  namespace "http://rob.sh/yang/test/benchmarks/subsystems";
+  prefix "sub";
+
+%s
+}
+""" % containers
+
+def load(name, count, touch):
+  rss_before = rss_kb()
+  start = time.time()
+  root = __import__(name).subsystems()
+  for i in range(0, count if touch == "all" else 1):
+    getattr(root, "subsystem_%d" % i).config.value_0 = 1
+  elapsed = time.time() - start
+  print "%-26s touching %-3s container(s): %.2fs, rss delta: %d KB" % (name,
+          touch, elapsed, rss_kb() - rss_before)
+
+def main():
+  try:
+    opts, args = getopt.getopt(sys.argv[1:], "kn:i:t:", ["keepfiles", "containers=",
+                                                          "import=", "touch="])
+  except getopt.GetoptError as e:
+    print str(e)
+    sys.exit(127)
+
+  k = False
+  count = 200
+  import_name = False
+  touch = "one"
+  for o, a in opts:
+    if o in ["-k", "--keepfiles"]:
+      k = True
+    elif o in ["-n", "--containers"]:
+      count = int(a)
+    elif o in ["-i", "--import"]:
+      import_name = a
+    elif o in ["-t", "--touch"]:
+      touch = a
+
+  this_dir = os.path.dirname(os.path.realpath(__file__))
+  if import_name:
+    sys.path.insert(0, this_dir)
+    load(import_name, count, touch)
+    return
+
+  pyangpath = os.environ.get('PYANGPATH') if os.environ.get('PYANGPATH') is not None else False
+  pyangbindpath = os.environ.get('PYANGBINDPATH') if os.environ.get('PYANGBINDPATH') is not None else False
+  assert not pyangpath == False, "could not find path to pyang"
+  assert not pyangbindpath == False, "could not resolve pyangbind directory"
+
+  f = open("%s/subsystems.yang" % this_dir, "w")
+  f.write(module(count))
+  f.close()
+  os.system("%s --plugindir %s -f pybind -o %s/subsystems_bindings.py %s/subsystems.yang" %
+              (pyangpath, pyangbindpath, this_dir, this_dir))
+  os.system("%s --plugindir %s -f pybind --split-class-dir %s/subsystems_split %s/subsystems.yang" %
+              (pyangpath, pyangbindpath, this_dir, this_dir))
+
+  # each set of bindings is imported (without a cached .pyc) in a separate
+  # interpreter.
+  for touch in ["one", "all"]:
+    for name in ["subsystems_bindings", "subsystems_split"]:
+      subprocess.call([sys.executable, "-B", os.path.realpath(__file__), "-n", str(count),
+                        "-i", name, "-t", touch])
+
+  if not k:
+    os.system("/bin/rm -rf %s/subsystems.yang %s/subsystems_bindings.py* %s/subsystems_split" %
+                (this_dir, this_dir, this_dir))
+
+if __name__ == '__main__':
+  main()
@@ -46,6 +46,14 @@ def main():
   assert t.container.case_two_container.case_two_leaf == 42, "object did not allow the other half of the choice to be specified, %s" % t.container.case_two_container.case_two_leaf
   assert t.container.case_one_container.case_one_leaf == 0, "object did not reset the value of the case-one side of the choice, %s" % t.container.case_one_container.case_one_leaf
 
+  # setting a case once its ancestors are marked changed must still reset
+  # the other case
+  t.container.case_two_container.case_two_leaf = 43
+  t.container.case_one_container.case_one_leaf = 1
+  assert t.container.case_two_container.case_two_leaf == 0, "object did not reset the value of the case-two side of the choice, %s" % t.container.case_two_container.case_two_leaf
+  assert t.container.changed() and t.container.case_one_container.changed(), "ancestors of a set leaf were not marked as changed"
+  assert not t.container.case_two_container.changed(), "reset side of the choice was marked as changed"
+
   if not keepfiles:
     os.system("/bin/rm %s/bindings.py" % this_dir)
     os.system("/bin/rm %s/bindings.pyc" % this_dir)
@@ -27,9 +27,43 @@ def main():
   os.system("%s --plugindir %s -f pybind -o %s/bindings.py %s/%s.yang" % (pyangpath, pyangbindpath, this_dir, this_dir, TESTNAME))
 
   from bindings import decimal_ as d
+  check_values(d())
+
+  os.system("%s --plugindir %s -f pybind -o %s/fixed_bindings.py --decimal64-fixed-point %s/%s.yang" % (pyangpath, pyangbindpath, this_dir, this_dir, TESTNAME))
+
+  from fixed_bindings import decimal_ as fixed_d
   from decimal import Decimal
+  q = fixed_d()
+  check_values(q)
+
+  q.container.d2 = "1.5"
+  assert str(q.container.d2) == "1.500", "fixed-point value was not formatted with its precision (%s)" \
+          % q.container.d2
+  assert q.container.d2 + 1 == Decimal("2.5"), "addition of an integer to a fixed-point value was incorrect (%s)" \
+          % (q.container.d2 + 1)
+  assert q.container.d2 * 3 == Decimal("4.5"), "multiplication of a fixed-point value was incorrect (%s)" \
+          % (q.container.d2 * 3)
+  assert q.container.d2 < 2 and q.container.d2 > Decimal("1.4999"), \
+          "fixed-point value did not compare correctly"
+  assert q.container.d2.to_decimal() == Decimal("1.500"), "to_decimal() returned an incorrect value (%s)" \
+          % q.container.d2.to_decimal()
+  assert q.container.d2.changed(), "fixed-point value was not marked as changed"
+
+  for v in ["9223372036854775.808", "NaN", "not-a-number"]:
+    passed = False
+    try:
+      q.container.d2 = v
+    except ValueError:
+      passed = True
+    assert passed, "an invalid decimal64 value was set (%s)" % v
 
-  q = d()
+  if not k:
+    for f in ["bindings", "fixed_bindings"]:
+      os.system("/bin/rm %s/%s.py" % (this_dir, f))
+      os.system("/bin/rm %s/%s.pyc" % (this_dir, f))
+
+def check_values(q):
+  from decimal import Decimal
 
   for i in ["d1", "d2", "d3"]:
     assert hasattr(q.container, i), "container missing attribute - %s" % i
@@ -44,9 +78,5 @@ def main():
   assert q.container.d3._default == Decimal("1"), "default was set wrong for d3 (%s)" \
           % q.container.d3._default
 
-  if not k:
-    os.system("/bin/rm %s/bindings.py" % this_dir)
-    os.system("/bin/rm %s/bindings.pyc" % this_dir)
-
 if __name__ == '__main__':
   main()
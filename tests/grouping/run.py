@@ -0,0 +1,94 @@
+#!/usr/bin/env python
+
+import os, sys, getopt
+
+TESTNAME="grouping"
+
+# generate bindings in this folder
+
+def main():
+  try:
+    opts, args = getopt.getopt(sys.argv[1:], "k", ["keepfiles"])
+  except getopt.GetoptError as e:
+    print str(e)
+    sys.exit(127)
+
+  k = False
+  for o, a in opts:
+    if o in ["-k", "--keepfiles"]:
+      k = True
+
+  pyangpath = os.environ.get('PYANGPATH') if os.environ.get('PYANGPATH') is not None else False
+  pyangbindpath = os.environ.get('PYANGBINDPATH') if os.environ.get('PYANGBINDPATH') is not None else False
+  assert not pyangpath == False, "could not find path to pyang"
+  assert not pyangbindpath == False, "could not resolve pyangbind directory"
+
+  this_dir = os.path.dirname(os.path.realpath(__file__))
+  os.system("%s --plugindir %s -f pybind -o %s/bindings.py --use-xpathhelper %s/%s.yang" % (pyangpath, pyangbindpath, this_dir, this_dir, TESTNAME))
+  os.system("%s --plugindir %s -f pybind -o %s/dedup_bindings.py --use-xpathhelper --deduplicate-classes %s/%s.yang" % (pyangpath, pyangbindpath, this_dir, this_dir, TESTNAME))
+
+  from lib.xpathhelper import YANGPathHelper
+  import bindings
+  import dedup_bindings
+
+  assert dedup_bindings.yc_config__ipv6_config is dedup_bindings.yc_config__ipv4_config, \
+    "a container instantiated from the same grouping did not share a class"
+  assert dedup_bindings.yc_ipv4__interface_ipv4 is dedup_bindings.yc_ipv4__ipv4, \
+    "a container with identical children did not share a class"
+  assert not dedup_bindings.yc_state__ipv4_state is dedup_bindings.yc_config__ipv4_config, \
+    "config false and config true containers shared a class"
+  assert dedup_bindings.yc_absolute__secondary_absolute is \
+          dedup_bindings.yc_absolute__primary_absolute, \
+    "containers with a leafref with the same absolute path did not share a class"
+  assert not dedup_bindings.yc_relative__secondary_relative is \
+          dedup_bindings.yc_relative__primary_relative, \
+    "containers with a leafref with a relative path shared a class"
+  assert not bindings.yc_config__ipv6_config is bindings.yc_config__ipv4_config, \
+    "classes were shared when deduplicate-classes was not specified"
+
+  results = []
+  for module in [bindings, dedup_bindings]:
+    tree = YANGPathHelper()
+    g = module.grouping(path_helper=tree)
+    g.ipv4.config.address = "192.0.2.1"
+    g.ipv6.config.address = "2001:db8::1"
+    g.ipv6.config.prefix_length = 48
+    g.interface.add("eth0")
+    g.interface["eth0"].ipv4.config.address = "198.51.100.1"
+    # a leafref to a single leaf is a pointer to it, such that setting the
+    # leafref sets the leaf that it is resolved to.
+    for container, label in [(g.primary, "primary"), (g.secondary, "secondary")]:
+      container.relative.label = label
+    for container, label in [(g.primary, "primary"), (g.secondary, "secondary")]:
+      assert container.label == label, \
+        "a relative leafref was resolved from the wrong path (%s != %s)" % \
+          (container.label, label)
+
+    assert not g.ipv4.config.prefix_length.changed(), \
+      "a leaf of a shared class was not independent (%s)" % g.ipv4.config.prefix_length
+    for path, value in [("/ipv4/config/address", "192.0.2.1"),
+                        ("/ipv6/config/address", "2001:db8::1"),
+                        ("/interface[name=eth0]/ipv4/config/address", "198.51.100.1")]:
+      retr = tree.get(path)
+      assert len(retr) == 1 and retr[0] == value, \
+        "the path of a leaf of a shared class was incorrect (%s -> %s)" % (path, retr)
+    # leafrefs are checked above, since they do not compare equal between
+    # instances.
+    result = (g.get(), g.get(filter=True))
+    for r in result:
+      for name in ["primary", "secondary"]:
+        r.pop(name, None)
+    results.append(result)
+
+  assert results[0] == results[1], \
+    "get() of deduplicated bindings did not match (%s != %s)" % (results[0], results[1])
+
+  if not k:
+    for f in ["bindings", "dedup_bindings"]:
+      os.system("/bin/rm %s/%s.py" % (this_dir, f))
+      os.system("/bin/rm %s/%s.pyc" % (this_dir, f))
+
+if __name__ == '__main__':
+  import_path = os.path.realpath(os.path.dirname(os.path.realpath(__file__)) + "/../../")
+  sys.path.insert(0, import_path)
+  main()
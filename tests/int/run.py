@@ -125,6 +125,37 @@ def main():
     e = True
   assert e == True, "incorrectly allowed value outside of range for sixtyfourrestricted (-43)"
 
+  for v in [(-32768, True), (-1000, True), (-999, False), (-42, True),
+            (-10, True), (0, False), (10, True), (42, True), (43, False),
+            (999, False), (1000, True), (32767, True)]:
+    passed = False
+    try:
+      u.int_container.multirestricted = v[0]
+      passed = True
+    except ValueError:
+      pass
+    assert passed == v[1], \
+      "multiple interval range gave the wrong result for %d (%s != %s)" \
+        % (v[0], passed, v[1])
+
+  # a range that restricts a type which itself has a range rejects values
+  # outside either range with a ValueError.
+  import numpy
+  from lib.yangtypes import RestrictedClassType
+  inner = RestrictedClassType(base_type=numpy.uint8, restriction_type="range",
+                                restriction_arg="1..100")
+  outer = RestrictedClassType(base_type=inner, restriction_type="range",
+                                restriction_arg="10..50")
+  for v in [(0, ValueError), (5, ValueError), (10, None), (50, None),
+            (60, ValueError), (101, ValueError), ("fish", TypeError)]:
+    raised = None
+    try:
+      outer(v[0])
+    except (TypeError, ValueError) as e:
+      raised = type(e)
+    assert raised == v[1], \
+      "nested range gave the wrong result for %s (%s != %s)" % (v[0], raised, v[1])
+
   if not k:
     os.system("/bin/rm %s/bindings.py" % this_dir)
     os.system("/bin/rm %s/bindings.pyc" % this_dir)
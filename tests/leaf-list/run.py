@@ -113,6 +113,62 @@ def main():
     assert passed == i[1], "leaf-list of union type had invalid result (%s != %s for %s)" \
       % (passed, i[1], i[0])
 
+  leaflist_instance.container.listtwo.extend(["abc", "another-valid-string"])
+  assert len(leaflist_instance.container.listtwo) == 3, \
+    "extend did not add all elements to a restricted leaflist"
+
+  passed = False
+  try:
+    leaflist_instance.container.listtwo.extend(["also-valid", "broken-string"])
+  except ValueError:
+    passed = True
+  assert passed == True, "extend added an erroneous value to the list (restricted type)"
+  assert len(leaflist_instance.container.listtwo) == 3, \
+    "a failed extend partially modified the list (%s)" % leaflist_instance.container.listtwo
+
+  # leaf-lists of integers that are stored in compact arrays
+  import numpy
+  from lib.yangtypes import TypedListType, YANGDynClass
+  compact = YANGDynClass(base=TypedListType(allowed_type=numpy.uint8, compact=True),
+                          yang_name="compact")
+  compact.append(1)
+  compact.extend([2, 3])
+  compact.extend(numpy.arange(4, 6))
+  assert compact == [1, 2, 3, 4, 5], "compact leaflist had the wrong contents (%s)" % compact
+  assert compact.get() == [1, 2, 3, 4, 5], "compact leaflist get() was incorrect (%s)" % compact.get()
+  assert list(compact.as_ndarray()) == [1, 2, 3, 4, 5], \
+    "compact leaflist was not exported correctly (%s)" % compact.as_ndarray()
+  assert compact.as_ndarray().dtype == numpy.uint8, "compact leaflist had the wrong dtype"
+
+  for i in [[256], [-1], ["fish"], [6, 300]]:
+    passed = False
+    try:
+      compact.extend(i)
+    except ValueError:
+      passed = True
+    assert passed == True, "an out of range value was added to a compact leaflist (%s)" % i
+  assert len(compact) == 5, "a failed extend modified a compact leaflist (%s)" % compact
+
+  # changing a leaf-list only by assigning an item marks its ancestors as
+  # changed, such that it is included in a filtered get()
+  assigned = leaflist()
+  assigned.container.leaflist[0] = "x"
+  assert assigned.get(filter=True) == {'container': {'leaflist': ['x']}}, \
+    "a leaf-list changed by item assignment was not in a filtered get() (%s)" % \
+      assigned.get(filter=True)
+
+  # TypedList types are cached on their allowed types, such that they do
+  # not keep a generated allowed type (e.g., a leafref) alive.
+  import gc, weakref
+  class generated_type(str):
+    pass
+  generated_list = TypedListType(allowed_type=[str, generated_type])
+  assert TypedListType(allowed_type=[str, generated_type]) is generated_list, \
+    "TypedList type was not cached on its allowed types"
+  generated_ref = weakref.ref(generated_type)
+  del generated_type, generated_list
+  gc.collect()
+  assert generated_ref() is None, "TypedList type cache kept a generated allowed type alive"
 
 
   if not k:
@@ -62,7 +62,7 @@ def main():
   test_instance.list_container.list_element[2].another_value == "aSecondDefaultValue"
 
   assert test_instance.get() == \
-    {'list-container': {'list-seven': {}, 'list-six': {}, 'list-five': {}, 'list-two': {}, 'list-three': {}, 'list-four': {},
+    {'list-container': {'list-eight': {}, 'list-seven': {}, 'list-six': {}, 'list-five': {}, 'list-two': {}, 'list-three': {}, 'list-four': {},
     'list-element': {1: {'keyval': 1, 'another-value': 'defaultValue'},
     2: {'keyval': 2, 'another-value': 'defaultValue'}}}}, \
     "incorrect get() output returned: %s" % test_instance.get()
@@ -131,6 +131,152 @@ def main():
     "a key-less list did not have the correct value set (%s %d != 10)" % \
       (x,test_instance.list_container.list_six[x].val)
 
+  # add a number of entries at once
+  added = test_instance.list_container.list_element.add_many(range(10,20))
+  assert added == range(10,20), "add_many returned incorrect keys (%s)" % added
+  assert len(test_instance.list_container.list_element) == 10, \
+    "add_many did not add the correct number of entries"
+  assert test_instance.list_container.list_element[15].keyval == 15, \
+    "add_many did not set the key of an entry"
+
+  added = test_instance.list_container.list_element.add_many([
+    {"keyval": 20, "another-value": "twenty"},
+    {"keyval": 21, "another_value": "twenty-one"}])
+  assert test_instance.list_container.list_element[20].another_value == "twenty", \
+    "add_many did not set a leaf specified by its YANG name"
+  assert test_instance.list_container.list_element[21].another_value == "twenty-one", \
+    "add_many did not set a leaf specified by its Python name"
+
+  test_instance.list_container.list_four.add_many(["aardvark 1",
+    {"valone": "beaver", "valtwo": 2}])
+  assert "beaver 2" in test_instance.list_container.list_four, \
+    "add_many did not add an entry to a multi-key list from a dict"
+
+  for entries in [[30, 31, "wrong-key-type"], [30, 31, 31], [30, 10],
+                    [{"keyval": 30}, {"keyval": 31, "missing": 1}],
+                    [{"another-value": "nokey"}]]:
+    passed = False
+    try:
+      test_instance.list_container.list_element.add_many(entries)
+    except KeyError:
+      passed = True
+    assert passed, "add_many did not raise KeyError for %s" % entries
+    assert len(test_instance.list_container.list_element) == 12, \
+      "add_many partially added entries from %s" % entries
+
+  keys = test_instance.list_container.list_six.add_many([{}, {"val": 4}])
+  assert test_instance.list_container.list_six[keys[1]].val == 4, \
+    "add_many did not set a value in a key-less list"
+  assert keys == [x+1, x+2], \
+    "key-less list entries were not given consecutive keys (%s, %s)" % (x, keys)
+
+  # only changed entries are included in filtered output
+  filtered = test_instance.list_container.list_six.get(filter=True)
+  assert filtered == {x: {'val': 10}, keys[1]: {'val': 4}}, \
+    "filtered get() of a key-less list returned incorrect entries (%s)" % filtered
+  test_instance.list_container.list_six[keys[0]]._set_val(5)
+  assert sorted(test_instance.list_container.list_six.get(filter=True).keys()) == \
+      [x, keys[0], keys[1]], "filtered get() did not include a newly changed entry"
+  test_instance.list_container.list_six.delete(x)
+  assert not x in test_instance.list_container.list_six.get(filter=True), \
+    "filtered get() included a deleted entry"
+  assert not "list-seven" in test_instance.list_container.get(filter=True), \
+    "filtered get() included an unchanged list"
+
+  # secondary indexes
+  list_element = test_instance.list_container.list_element
+  list_element.add_index("another-value")
+  for i in [10, 11, 12]:
+    list_element[i].another_value = "indexed"
+  assert sorted(list_element.find(another_value="indexed")) == [10, 11, 12], \
+    "find() on an indexed leaf returned incorrect keys (%s)" % \
+      list_element.find(another_value="indexed")
+  list_element[11].another_value = "moved"
+  assert sorted(list_element.find(another_value="indexed")) == [10, 12], \
+    "index was not updated when a leaf was changed"
+  assert list_element.find(another_value="moved") == [11], \
+    "index did not contain a changed leaf's new value"
+  list_element.delete(10)
+  assert list_element.find(another_value="indexed") == [12], \
+    "index was not updated when an entry was deleted"
+  list_element.add_many([{"keyval": 40, "another_value": "indexed"}])
+  assert sorted(list_element.find(another_value="indexed")) == [12, 40], \
+    "index was not updated when an entry was added"
+  assert list_element.find(another_value="indexed", keyval=40) == [40], \
+    "find() on an indexed and an unindexed leaf returned incorrect keys"
+
+  list_five = test_instance.list_container.list_five
+  for i in range(1,10):
+    list_five[i].adjunct = 10 - i
+  list_five.add_index("adjunct", kind="sorted")
+  assert list_five.range("adjunct", 3, 5) == [7, 6, 5], \
+    "range() on a sorted index returned incorrect keys (%s)" % \
+      list_five.range("adjunct", 3, 5)
+  list_five[1].adjunct = 4
+  assert list_five.range("adjunct", 3, 5) == [7, 1, 6, 5], \
+    "sorted index was not updated when a leaf was changed (%s)" % \
+      list_five.range("adjunct", 3, 5)
+  assert list_five.find(adjunct=4) == [1, 6], \
+    "find() on a sorted index returned incorrect keys"
+  assert list_five.range("val", 2, 3) == [2, 3], \
+    "range() on an unindexed leaf returned incorrect keys"
+
+  passed = False
+  try:
+    list_five.add_index("adjunct", kind="btree")
+  except ValueError:
+    passed = True
+  assert passed, "an index of an unknown type was created"
+
+  passed = False
+  try:
+    test_instance.list_container.list_eight.add_index("tags")
+  except ValueError:
+    passed = True
+  assert passed, "an index of a leaf-list was created"
+
+  # leaves that are unset - directly, or by setting a member of another
+  # case of a choice - are removed from indexes
+  list_eight = test_instance.list_container.list_eight
+  list_eight.add_index("port")
+  list_eight.add_index("ssid", kind="sorted")
+  for i, port in [(1, "eth0"), (2, "eth1"), (3, "eth2")]:
+    list_eight.add(i)
+    list_eight[i].port = port
+  assert list_eight.range("port", "eth1", "eth9") == [2, 3], \
+    "range() on a hash index returned incorrect keys (%s)" % \
+      list_eight.range("port", "eth1", "eth9")
+  list_eight[1].ssid = "guest"
+  assert list_eight[1].port == "", "setting a member of a case did not unset another case"
+  assert list_eight.find(port="eth0") == [], \
+    "index was not updated when a leaf was unset by a choice"
+  assert list_eight.find(ssid="guest") == [1], \
+    "index did not contain a leaf set in a new case of a choice"
+  list_eight[1].port = "eth0"
+  assert list_eight.find(ssid="guest") == [] and list_eight.find(port="eth0") == [1], \
+    "indexes were not updated when the case of a choice was switched back"
+  list_eight[2]._unset_port()
+  assert list_eight.find(port="eth1") == [], "index was not updated when a leaf was unset"
+  assert list_eight.range("port", "eth0", "eth9") == [1, 3], \
+    "range() on a hash index returned incorrect keys after a leaf was unset (%s)" % \
+      list_eight.range("port", "eth0", "eth9")
+
+  from lib.yangtypes import YANGDynClass
+  from bindings import yc_list_eight__list_container_list_eight
+  copied = YANGDynClass(list_eight[3], base=yc_list_eight__list_container_list_eight,
+                          yang_name="list-eight", is_container=True)
+  assert copied.port == "eth2" and copied.val == 3, \
+    "a list entry was not copied (%s, %s)" % (copied.port, copied.val)
+
+  from lib.yangtypes import YANGListType, YANGDynClass
+  from bindings import yc_list_six__list_container_list_six
+  uuid_list = YANGDynClass(base=YANGListType(False, yc_list_six__list_container_list_six,
+                  yang_name="list-six", is_container=True, uuid_keys=True),
+                  yang_name="list-six")
+  y = uuid_list.add()
+  assert isinstance(y, str) and len(y) == 36, \
+    "a key-less list with uuid_keys set did not use a uuid key (%s)" % y
+
   if not k:
     os.system("/bin/rm %s/bindings.py" % this_dir)
     os.system("/bin/rm %s/bindings.pyc" % this_dir)
@@ -25,10 +25,31 @@ def main():
 
   this_dir = os.path.dirname(os.path.realpath(__file__))
   os.system("%s --plugindir %s -f pybind -o %s/bindings.py %s/%s.yang" % (pyangpath, pyangbindpath, this_dir, this_dir, TESTNAME))
-
+  os.system("%s --plugindir %s -f pybind -o %s/lazy_bindings.py --lazy-children %s/%s.yang" % (pyangpath, pyangbindpath, this_dir, this_dir, TESTNAME))
 
   from bindings import openconfig_bgp_juniper
+  check_bgp(openconfig_bgp_juniper)
+
+  from lazy_bindings import openconfig_bgp_juniper as lazy_openconfig_bgp_juniper
+  check_bgp(lazy_openconfig_bgp_juniper)
 
+  bgp = lazy_openconfig_bgp_juniper()
+  unfiltered = bgp.get()
+  assert unfiltered == openconfig_bgp_juniper().get(), \
+    "unfiltered get response of an empty instance with lazy children did not match"
+  passed = False
+  try:
+    bgp._openconfig_bgp_juniper__juniper_config
+  except AttributeError:
+    passed = True
+  assert passed, "a lazy child was created by an unfiltered get"
+
+  if not k:
+    for f in ["bindings", "lazy_bindings"]:
+      os.system("/bin/rm %s/%s.py" % (this_dir, f))
+      os.system("/bin/rm %s/%s.pyc" % (this_dir, f))
+
+def check_bgp(openconfig_bgp_juniper):
   global_config = {"my_as": 2856,}
   peer_group_list = ["groupA", "groupB"]
   peers = [("1.1.1.1", "groupA", 3741), ("1.1.1.2", "groupA", 5400,),
@@ -44,6 +65,12 @@ def main():
     bgp.juniper_config.bgp.peer_group[peer[1]].neighbor.add(peer[0])
     bgp.juniper_config.bgp.peer_group[peer[1]].neighbor[peer[0]].peer_as = peer[2]
 
+  neighbors = bgp.juniper_config.bgp.peer_group["groupA"].neighbor
+  assert type(neighbors["1.1.1.1"].peer_as) is type(neighbors["1.1.1.2"].peer_as), \
+    "leaves of the same schema node did not share a type"
+  assert type(neighbors["1.1.1.1"]) is type(neighbors["1.1.1.3"]), \
+    "list entries of the same list did not share a type"
+
 
   bgp_filter_response = {'juniper-config': {'bgp': {'global': {'as': '2856'},
                             'peer-group': {'groupA': {'group-name': 'groupA',
@@ -72,9 +99,5 @@ def main():
   assert bgp.get() == bgp_unfilter_response, "unfiltered get response did not match"
   assert bgp.get(filter=True) == bgp_filter_response, "filtered get response did not match"
 
-  if not k:
-    os.system("/bin/rm %s/bindings.py" % this_dir)
-    os.system("/bin/rm %s/bindings.pyc" % this_dir)
-
 if __name__ == '__main__':
   main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python
+
+import os, sys, getopt
+
+TESTNAME="split-package"
+
+# generate bindings in this folder
+
+def main():
+  try:
+    opts, args = getopt.getopt(sys.argv[1:], "k", ["keepfiles"])
+  except getopt.GetoptError as e:
+    print str(e)
+    sys.exit(127)
+
+  k = False
+  for o, a in opts:
+    if o in ["-k", "--keepfiles"]:
+      k = True
+
+  pyangpath = os.environ.get('PYANGPATH') if os.environ.get('PYANGPATH') is not None else False
+  pyangbindpath = os.environ.get('PYANGBINDPATH') if os.environ.get('PYANGBINDPATH') is not None else False
+  assert not pyangpath == False, "could not find path to pyang"
+  assert not pyangbindpath == False, "could not resolve pyangbind directory"
+
+  this_dir = os.path.dirname(os.path.realpath(__file__))
+  os.system("%s --plugindir %s -f pybind -o %s/bindings.py %s/%s.yang" % (pyangpath, pyangbindpath, this_dir, this_dir, TESTNAME))
+  os.system("%s --plugindir %s -f pybind --split-class-dir %s/split_bindings %s/%s.yang" % (pyangpath, pyangbindpath, this_dir, this_dir, TESTNAME))
+
+  for f in ["__init__", "split_package_ipv4", "split_package_ipv6", "split_package_interface"]:
+    assert os.path.exists("%s/split_bindings/%s.py" % (this_dir, f)), \
+      "the split package did not contain the module %s" % f
+
+  import bindings
+  import split_bindings
+
+  def imported():
+    return sorted([m for m in sys.modules if m.startswith("split_bindings.") and \
+                    sys.modules[m] is not None])
+
+  assert imported() == [], \
+    "submodules of the split package were imported with the package (%s)" % imported()
+
+  s = split_bindings.split_package()
+  assert imported() == [], \
+    "submodules were imported when the root was created (%s)" % imported()
+  assert s.get(filter=True) == {}, \
+    "filtered get() of the split package was incorrect (%s)" % s.get(filter=True)
+  assert imported() == [], \
+    "submodules were imported by a filtered get() (%s)" % imported()
+
+  s.ipv4.config.address = "192.0.2.1"
+  assert imported() == ["split_bindings.split_package_ipv4"], \
+    "accessing a container imported other submodules (%s)" % imported()
+
+  try:
+    s.ipv4.config.prefix_length = 200
+    passed = False
+  except ValueError:
+    passed = True
+  assert passed, "a value outside a range was set in a split submodule"
+
+  s.interface.add("eth0")
+  s.interface["eth0"].mtu = 1500
+
+  b = bindings.split_package()
+  b.ipv4.config.address = "192.0.2.1"
+  b.interface.add("eth0")
+  b.interface["eth0"].mtu = 1500
+
+  for filter in [True, False]:
+    assert s.get(filter=filter) == b.get(filter=filter), \
+      "get(filter=%s) of the split package did not match (%s != %s)" % \
+        (filter, s.get(filter=filter), b.get(filter=filter))
+
+  if not k:
+    os.system("/bin/rm %s/bindings.py" % this_dir)
+    os.system("/bin/rm %s/bindings.pyc" % this_dir)
+    os.system("/bin/rm -r %s/split_bindings" % this_dir)
+
+if __name__ == '__main__':
+  import_path = os.path.realpath(os.path.dirname(os.path.realpath(__file__)) + "/../../")
+  sys.path.insert(0, import_path)
+  main()
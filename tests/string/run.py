@@ -93,6 +93,25 @@ def main():
           test_instance.string_container.restricted_string
   assert exception_raised == True, "exception was not raised when invalid value set"
 
+  first_type = type(test_instance.string_container.restricted_string)
+  test_instance.string_container.restricted_string = "anteater"
+  assert type(test_instance.string_container.restricted_string) is first_type, \
+        "restricted type was rebuilt when the leaf was set again"
+
+  # restricted types are cached on their base type, such that they do not
+  # keep a generated base type alive.
+  import gc, weakref
+  from lib.yangtypes import RestrictedClassType
+  class generated_string(str):
+    pass
+  RestrictedClassType(base_type=generated_string, restriction_type="pattern",
+                        restriction_arg="^a.*$")
+  generated_ref = weakref.ref(generated_string)
+  del generated_string
+  gc.collect()
+  assert generated_ref() is None, \
+        "restricted type cache kept a generated base type alive"
+
   if not k:
     os.system("/bin/rm %s/bindings.py" % this_dir)
     os.system("/bin/rm %s/bindings.pyc" % this_dir)
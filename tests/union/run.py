@@ -92,6 +92,49 @@ def main():
     "leaf with default int specified within a union (that was in a typedef) was not set correctly (%s)" % \
       u.container.u8._default
 
+  u.container.u1 = 0
+  assert u.container.u1 == 0 and isinstance(u.container.u1, numpy.int8), \
+    "union of int and string could not be set to zero (%s)" % u.container.u1
+
+  for value, valid in [(42, True), (500, False), ("192.0.2.1", True),
+                        ("2001:db8::1", True), ("not-an-address", False)]:
+    passed = True
+    try:
+      u.container.u9 = value
+    except ValueError:
+      passed = False
+    assert passed == valid, \
+      "union of a range and patterns accepted the wrong values (%s: %s != %s)" % \
+        (value, passed, valid)
+    if valid:
+      assert u.container.u9 == value, \
+        "union of a range and patterns was set incorrectly (%s != %s)" % \
+          (u.container.u9, value)
+  u.container.u9 = 42
+  assert isinstance(u.container.u9, numpy.uint16), \
+    "union member was resolved in the wrong order"
+  u.container.u9 = "2001:db8::2"
+  assert u.container.u9._restriction_arg == "[0-9a-f:]+", \
+    "union member was resolved to the wrong pattern (%s)" % \
+      u.container.u9._restriction_arg
+
+  # the cache of plans for resolving union members is bounded, such that
+  # generated member or value types are not kept indefinitely.
+  import lib.yangtypes
+  from lib.yangtypes import YANGDynClass
+  cache_size = lib.yangtypes._union_plan_cache_size
+  lib.yangtypes._union_plan_cache_size = 8
+  try:
+    for i in range(0, 20):
+      generated_string = type("generated_string_%d" % i, (str,), {})
+      assert isinstance(YANGDynClass(generated_string("xyz"), base=[numpy.int8, str],
+                          yang_name="u"), str), \
+        "union was resolved incorrectly for a value of a generated type"
+      assert len(lib.yangtypes._union_plan_cache) <= 8, \
+        "union plan cache grew beyond its maximum size"
+  finally:
+    lib.yangtypes._union_plan_cache_size = cache_size
+
   if not k:
     os.system("/bin/rm %s/bindings.py" % this_dir)
     os.system("/bin/rm %s/bindings.pyc" % this_dir)
@@ -4,10 +4,17 @@ import sys
 import os
 
 def main():
-  t1_add_retr_object_plain()       # check we can store and retrieve a basic object
-  t2_add_retr_object_with_attr()   # check we can store and retrieve an object with an attribute
-  t3_add_retr_object_hierarchy()   # check we can store and retrieve objects in a hierarchy
-  t4_retr_obj_error()              # check we get the right errors back when an object doesn't exist
+  for backend in ["native", "etree"]:
+    t1_add_retr_object_plain(YANGPathHelper(backend=backend))       # check we can store and retrieve a basic object
+    t2_add_retr_object_with_attr(YANGPathHelper(backend=backend))   # check we can store and retrieve an object with an attribute
+    t3_add_retr_object_hierarchy(YANGPathHelper(backend=backend))   # check we can store and retrieve objects in a hierarchy
+    t4_retr_obj_error(YANGPathHelper(backend=backend))              # check we get the right errors back when an object doesn't exist
+    t5_cache_invalidation(YANGPathHelper(backend=backend))          # check resolved paths are invalidated when objects change
+    t6_keyed_paths(YANGPathHelper(backend=backend))                 # check paths with keys, wildcards and parents resolve the same way
+    t9_register_subtree(YANGPathHelper(backend=backend))            # check a subtree of objects can be registered in one pass
+    t10_unregister_subtree(YANGPathHelper(backend=backend))         # check unregistering an object unregisters its subtree
+  t7_native_unsupported()          # check the native index rejects general XPath expressions
+  t8_parsed_path_cache()           # check parsed paths are cached, and the least recently used discarded
 
 class TestContainer(object):
   pass
@@ -94,6 +101,227 @@ def t4_retr_obj_error(tree=False):
     passed = True
   assert passed == True, ("setting an invalid path did not throw an XPathError")
 
+def t5_cache_invalidation(tree=False):
+  del_tree = False
+  if not tree:
+    del_tree = True
+    tree = YANGPathHelper()
+
+  tree.register("/cache", TestObject("cache"))
+  tree.register("/cache/other", TestObject("other"))
+  tree.register("/cache/foo[id=1]", TestObject("foo1"))
+  tree.register("/cache/foo[id=1]/bar", TestObject("bar1"))
+
+  for path, caller, count in [("/cache/foo", False, 1), ("/cache/foo/bar", False, 1),
+                              ("../foo", "/cache/other", 1), ("/cache", False, 1)]:
+    retr = tree.get(path, caller=caller)
+    assert len(retr) == count, ("retrieved the wrong number of objects for %s " +
+              "(%d != %d)") % (path, len(retr), count)
+  retr.append(TestObject("appended"))
+  assert len(tree.get("/cache")) == 1, "a list returned by get() was shared"
+
+  # registering below, at and above a resolved path must invalidate it
+  tree.register("/cache/foo[id=2]", TestObject("foo2"))
+  assert len(tree.get("/cache/foo")) == 2, "registering an object did not " + \
+            "invalidate a resolved path"
+  assert len(tree.get("../foo", caller="/cache/other")) == 2, "registering an " + \
+            "object did not invalidate a resolved relative path"
+  tree.register("/cache/foo[id=2]/bar", TestObject("bar2"))
+  assert len(tree.get("/cache/foo/bar")) == 2, "registering an object below a " + \
+            "resolved path did not invalidate it"
+  tree.unregister("/cache/foo[id=1]")
+  assert len(tree.get("/cache/foo/bar")) == 1, "unregistering an object above " + \
+            "a resolved path did not invalidate it"
+  assert [o.name() for o in tree.get("/cache/foo")] == ["foo2"], "unregistering " + \
+            "an object did not invalidate a resolved path"
+
+  if del_tree:
+    del tree
+
+def t6_keyed_paths(tree=False):
+  del_tree = False
+  if not tree:
+    del_tree = True
+    tree = YANGPathHelper()
+
+  tree.register("/keyed", TestObject("keyed"))
+  for i in range(0,3):
+    for j in ["a", "b"]:
+      tree.register("/keyed/entry[one='%d' two='%s']" % (i, j), TestObject("%d-%s" % (i, j)))
+      tree.register("/keyed/entry[one='%d' two='%s']/leaf" % (i, j), TestObject("leaf-%d-%s" % (i, j)))
+  tree.register("/keyed/other", TestObject("other"))
+
+  for path, caller, names in [
+          ("/keyed/entry[one='1' two='b']", False, ["1-b"]),
+          ("/keyed/entry[two=b one=1]", False, ["1-b"]),
+          ("/keyed/entry[one=2]", False, ["2-a", "2-b"]),
+          ("/keyed/entry[one=3]", False, []),
+          ("/keyed/entry", False, ["0-a", "0-b", "1-a", "1-b", "2-a", "2-b"]),
+          ("/keyed/entry[two=a]/leaf", False, ["leaf-0-a", "leaf-1-a", "leaf-2-a"]),
+          ("/keyed/*", False, ["0-a", "0-b", "1-a", "1-b", "2-a", "2-b", "other"]),
+          ("../entry[one=0 two=a]/leaf", "/keyed/other", ["leaf-0-a"]),
+          ("../../other", "/keyed/entry/leaf", ["other"]),
+          ("/keyed/entry[one=0 two=a]/leaf/..", False, ["0-a"]),
+        ]:
+    retr = tree.get(path, caller=caller)
+    assert [o.name() for o in retr] == names, ("retrieved the wrong objects for %s " +
+              "(%s != %s)") % (path, [o.name() for o in retr], names)
+
+  passed = False
+  try:
+    tree.register("/keyed/entry[one=0]/leaf", TestObject("duplicate"))
+  except XPathError:
+    passed = True
+  assert passed == True, "registering against an ambiguous path did not throw an XPathError"
+
+  tree.unregister("/keyed/entry[one=1 two=a]")
+  retr = tree.get("/keyed/entry[one=1]")
+  assert [o.name() for o in retr] == ["1-b"], "an unregistered list entry was returned"
+  assert len(tree.get("/keyed/entry/leaf")) == 5, "the children of an unregistered " + \
+            "list entry were returned"
+
+  if del_tree:
+    del tree
+
+def t7_native_unsupported():
+  tree = YANGPathHelper(backend="native")
+  tree.register("/a", TestObject("a"))
+  passed = False
+  try:
+    tree.get("//a")
+  except XPathError:
+    passed = True
+  assert passed == True, "the native index did not throw an XPathError for //"
+
+  tree = YANGPathHelper(backend="etree")
+  tree.register("/a", TestObject("a"))
+  tree.register("/a/b", TestObject("b"))
+  assert [o.name() for o in tree.get("//b")] == ["b"], "the etree backend did not resolve //"
+
+def t8_parsed_path_cache(tree=False):
+  del_tree = False
+  if not tree:
+    del_tree = True
+    tree = YANGPathHelper()
+  tree._parsed_cache_size = 4
+
+  tree.register("/parsed", TestObject("parsed"))
+  for i in range(0,3):
+    tree.register("/parsed/entry[id=%d]" % i, TestObject("entry%d" % i))
+  info = tree.parsed_path_cache_info()
+  assert info.currsize == 4 and info.maxsize == 4, ("the cache of parsed paths " +
+            "was not bounded (%s)") % (info,)
+
+  # the parent of the entries was parsed once, and found in the cache
+  # when each subsequent entry was registered.
+  assert (info.hits, info.misses) == (3, 4), ("unexpected hits and misses " +
+            "of the cache of parsed paths (%s)") % (info,)
+
+  tree.get("/parsed")
+  tree.get("/parsed/entry[id=3]")
+  info = tree.parsed_path_cache_info()
+  assert (info.hits, info.misses) == (4, 5), ("unexpected hits and misses " +
+            "of the cache of parsed paths (%s)") % (info,)
+  assert not ("/parsed/entry[id=0]", False) in tree._parsed, ("the least " +
+            "recently used parsed path was not discarded")
+  assert ("/parsed", False) in tree._parsed, ("a recently used parsed path " +
+            "was discarded")
+
+  if del_tree:
+    del tree
+
+def t9_register_subtree(tree=False):
+  del_tree = False
+  if not tree:
+    del_tree = True
+    tree = YANGPathHelper()
+
+  tree.register("/subtree", TestObject("subtree"))
+  tree.register("/subtree/existing", TestObject("existing"))
+  assert len(tree.get("/subtree/entry/leaf")) == 0, "unexpected objects in the tree"
+
+  tree.register_subtree("/subtree/entry[id=1]", [
+      ("", TestObject("entry")),
+      ("leaf", TestObject("leaf")),
+      ("child", TestObject("child")),
+      ("child/item[name=a]", TestObject("item-a")),
+      ("child/item[name=b]", TestObject("item-b")),
+      ("leaf", TestObject("leaf-replaced")),
+    ])
+  for path, names in [("/subtree/entry[id=1]", ["entry"]),
+                      ("/subtree/entry/leaf", ["leaf-replaced"]),
+                      ("/subtree/entry[id=1]/child/item", ["item-a", "item-b"]),
+                      ("/subtree/entry/child/item[name=b]", ["item-b"])]:
+    retr = tree.get(path)
+    assert [o.name() for o in retr] == names, ("retrieved the wrong objects for %s " +
+              "after registering a subtree (%s != %s)") % (path, [o.name() for o in retr], names)
+
+  # objects can be added below, or replace those at, a registered path
+  tree.register_subtree("/subtree", [("existing", TestObject("existing-replaced")),
+                                      ("entry[id=1]/child/item[name=c]", TestObject("item-c")),
+                                      ("entry[id=2]", TestObject("entry2"))])
+  for path, names in [("/subtree/existing", ["existing-replaced"]),
+                      ("/subtree/entry/child/item", ["item-a", "item-b", "item-c"]),
+                      ("/subtree/entry", ["entry", "entry2"])]:
+    retr = tree.get(path)
+    assert [o.name() for o in retr] == names, ("retrieved the wrong objects for %s " +
+              "after registering a subtree (%s != %s)") % (path, [o.name() for o in retr], names)
+
+  passed = False
+  try:
+    tree.register_subtree("/subtree/missing", [("leaf", TestObject("leaf"))])
+  except XPathError:
+    passed = True
+  assert passed == True, "registering a subtree without a root did not throw an XPathError"
+
+  if del_tree:
+    del tree
+
+def t10_unregister_subtree(tree=False):
+  del_tree = False
+  if not tree:
+    del_tree = True
+    tree = YANGPathHelper()
+
+  tree.register("/churn", TestObject("churn"))
+  assert tree.registered_count() == 1, "unexpected number of registered objects (%d != 1)" % \
+            tree.registered_count()
+  for i in range(0, 10):
+    tree.register_subtree("/churn/entry[id=%d]" % i, [
+        ("", TestObject("entry")),
+        ("leaf", TestObject("leaf")),
+        ("child", TestObject("child")),
+        ("child/item[name=a]", TestObject("item-a")),
+      ])
+  assert tree.registered_count() == 41, "unexpected number of registered objects (%d != 41)" % \
+            tree.registered_count()
+
+  removed = tree.unregister("/churn/entry[id=3]")
+  assert removed == 4, "unexpected number of unregistered objects (%d != 4)" % removed
+  assert tree.registered_count() == 37, "objects below an unregistered object remain (%d != 37)" % \
+            tree.registered_count()
+  for path in ["/churn/entry[id=3]", "/churn/entry[id=3]/leaf", "/churn/entry[id=3]/child/item"]:
+    assert len(tree.get(path)) == 0, "an unregistered object was returned for %s" % path
+  assert len(tree.get("/churn/entry/child/item")) == 9, "objects were unregistered from other entries"
+
+  # unregistering each match of a path unregisters the subtree of each
+  removed = tree.unregister("/churn/entry/child")
+  assert removed == 18, "unexpected number of unregistered objects (%d != 18)" % removed
+  tree.unregister("/churn")
+  assert tree.registered_count() == 0, "objects remain after unregistering the root (%d)" % \
+            tree.registered_count()
+
+  # the same paths can be registered again
+  tree.register("/churn", TestObject("churn"))
+  tree.register_subtree("/churn/entry[id=3]", [("", TestObject("entry")), ("leaf", TestObject("leaf"))])
+  assert [o.name() for o in tree.get("/churn/entry[id=3]/leaf")] == ["leaf"], \
+            "could not register an object at an unregistered path"
+  assert tree.registered_count() == 3, "unexpected number of registered objects (%d != 3)" % \
+            tree.registered_count()
+
+  if del_tree:
+    del tree
+
 if __name__ == '__main__':
   import_path = os.path.realpath(os.path.dirname(os.path.realpath(__file__)) + "/../../lib")
   sys.path.insert(0, import_path)
@@ -38,6 +38,12 @@ def main():
   t3_leaflist_remove(yobj, tree=yhelper)
   t4_list_remove(yobj, tree=yhelper)
 
+  for backend in ["native", "etree"]:
+    for test in [t4_list_remove, t5_leaflist_replace, t6_keyless_list_remove,
+                  t7_leaflist_extend]:
+      yhelper = YANGPathHelper(backend=backend)
+      test(ytest(path_helper=yhelper), tree=yhelper)
+
   if not k:
     os.system("/bin/rm %s/bindings.py" % this_dir)
     os.system("/bin/rm %s/bindings.pyc" % this_dir)
@@ -93,6 +99,20 @@ def t2_list(yobj,tree=False):
     assert validref == tc[1], "Reference was incorrectly set for a list" + \
       " (%s not in %s -> %s ! %s)" % (tc[0], yobj.container.t2.keys(), validref, tc[1])
 
+  # the resolution of /container/t2/keyval is cached, and must be
+  # invalidated when entries are added or removed.
+  yobj.container.t2.delete("koala")
+  yobj.container.t2.add("quokka")
+  for tc in [("koala", False), ("quokka", True), ("kanga", False)]:
+    validref = False
+    try:
+      yobj.reference.t2_ptr = tc[0]
+      validref = True
+    except ValueError:
+      pass
+    assert validref == tc[1], "Reference was incorrectly set for a list" + \
+      " after it was changed (%s not in %s -> %s ! %s)" % (tc[0], yobj.container.t2.keys(), validref, tc[1])
+
   if del_tree:
     del tree
 
@@ -162,7 +182,116 @@ def t4_list_remove(yobj, tree=False):
     new_retr = tree.get(path)
     assert len(new_retr) == 0, "An element was not correctly removed from the list (%s -> len(%s) = %d)" % (b[0], path, len(new_retr))
 
+  yobj.container.t4.add_many(["stout", "pilsner"])
+  for b in ["stout", "pilsner"]:
+    retr = tree.get("/container/t4[keyval=%s]" % b)
+    assert len(retr) == 1, "An element added by add_many() was not registered (%s -> %d != 1)" % (b, len(retr))
+
+  try:
+    yobj.container.t4.add_many(["bock", "porter"])
+  except KeyError:
+    pass
+  retr = tree.get("/container/t4[keyval=bock]")
+  assert len(retr) == 0, "An element from a failed add_many() remained registered (bock -> %d != 0)" % len(retr)
+
+  registered = tree.registered_count()
+  for entries in [["abc", "zzz"], [{"keyval": "abc", "value": "a"}, {"keyval": "zzz"}]]:
+    try:
+      yobj.container.t6.add_many(entries)
+    except KeyError:
+      pass
+    assert len(yobj.container.t6) == 0, \
+      "An element from a failed add_many() remained in the list (%s)" % yobj.container.t6.keys()
+    assert tree.registered_count() == registered, \
+      "An add_many() with an invalid key changed the number of registered objects (%d != %d)" % \
+        (tree.registered_count(), registered)
+
+  if del_tree:
+    del tree
+
+def t5_leaflist_replace(yobj, tree=False):
+  del_tree = False
+  if not tree:
+    del_tree = True
+    tree = YANGPathHelper()
+
+  registered = tree.registered_count()
+  for values in [["a", "b", "c"], ["d"], ["a", "b", "c"]]:
+    yobj.container.t1 = values
+    assert yobj.container.t1 == values, "leaf-list was not set to %s (%s)" % (values, yobj.container.t1)
+    yobj.container.t1.append("appended")
+    assert len(tree.get("/container/t1/appended")) == 1, \
+      "An element appended to a replaced leaf-list was not registered"
+
+  for b in ["d", "appended"]:
+    yobj.container.t1 = []
+    retr = tree.get("/container/t1/%s" % b)
+    assert len(retr) == 0, "An element of a replaced leaf-list remained registered (%s -> %d != 0)" % (b, len(retr))
+
+  yobj.container.t1[0] = "assigned"
+  retr = tree.get("/container/t1/assigned")
+  assert len(retr) == 1, "An element set by item assignment was not registered (%d != 1)" % len(retr)
+  yobj.container.t1.remove("assigned")
+  assert tree.registered_count() == registered, \
+    "Replacing a leaf-list changed the number of registered objects (%d != %d)" % \
+      (tree.registered_count(), registered)
+
+  if del_tree:
+    del tree
+
+def t6_keyless_list_remove(yobj, tree=False):
+  del_tree = False
+  if not tree:
+    del_tree = True
+    tree = YANGPathHelper()
+
+  added = {}
+  for b in ["ruination", "arrogant-bastard", "sculpin"]:
+    k = yobj.container.t5.add()
+    yobj.container.t5[k]._set_name(b)
+    added[b] = k
+  added["hopsickle"] = yobj.container.t5.add_many([{"name": "hopsickle"}])[0]
+
+  retr = tree.get("/container/t5/name")
+  assert len(retr) == 4, "Retrieve of the leaves of a keyless list returned the wrong number of elements (%d != 4)" % len(retr)
+
+  for b in ["arrogant-bastard", "hopsickle"]:
+    yobj.container.t5.delete(added.pop(b))
+  retr = tree.get("/container/t5/name")
+  assert sorted([str(i) for i in retr]) == sorted(added.keys()), \
+    "Deleting an entry of a keyless list did not leave its siblings registered (%s != %s)" % \
+      (sorted([str(i) for i in retr]), sorted(added.keys()))
+  for b, k in added.iteritems():
+    retr = tree.get("/container/t5[_key=%s]/name" % k)
+    assert len(retr) == 1 and retr[0] == b, "An entry of a keyless list was not registered under its key (%s)" % k
+  assert len(tree.get("/container/t5")) == 3, \
+    "The keyless list, or its entries, were not registered (%d != 3)" % len(tree.get("/container/t5"))
+
+  if del_tree:
+    del tree
 
+def t7_leaflist_extend(yobj, tree=False):
+  del_tree = False
+  if not tree:
+    del_tree = True
+    tree = YANGPathHelper()
+
+  registered = tree.registered_count()
+  yobj.container.t3.extend(["sunshine", "fat-tire"])
+  yobj.container.t3.append("ranger")
+  for b in ["sunshine", "fat-tire", "ranger"]:
+    retr = tree.get("/container/t3/%s" % b)
+    assert len(retr) == 1, "An element added to a leaf-list was not registered (%s -> %d != 1)" % (b, len(retr))
+  assert tree.registered_count() == registered + 3, \
+    "Extending a leaf-list registered the wrong number of objects (%d != %d)" % \
+      (tree.registered_count(), registered + 3)
+
+  yobj.container.t3.remove("fat-tire")
+  retr = tree.get("/container/t3/fat-tire")
+  assert len(retr) == 0, "An element added by extend() was not removed from the leaf-list (%d != 0)" % len(retr)
+
+  if del_tree:
+    del tree
 
 if __name__ == '__main__':
   import_path = os.path.realpath(os.path.dirname(os.path.realpath(__file__)) + "/../../../")